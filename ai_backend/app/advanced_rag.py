@@ -0,0 +1,141 @@
+# ============================================
+# Advanced RAG - 다중 질의 동시 검색 + 순위 융합
+# ============================================
+
+import asyncio
+import time
+from typing import Dict, List, Optional
+
+from langchain_core.documents import Document
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import PromptTemplate
+
+from app.config import (
+    ADVANCED_RAG_NUM_QUERIES,
+    RAG_QUERY_EXPANSION_MODEL,
+    RAG_TOP_K,
+    RAG_RRF_K,
+)
+from app.lexical_index import reciprocal_rank_fusion
+from app.llm_clients import get_chat_model
+
+# ============================================
+# 질의 확장 프롬프트
+# ============================================
+
+QUERY_EXPANSION_PROMPT = PromptTemplate.from_template(
+    "You are an assistant that rewrites a user question into {num_queries} different "
+    "search queries for retrieving relevant passages from a document.\n"
+    "Cover different wordings, key terms (product codes, proper nouns) and sub-questions.\n"
+    "Write the queries in the same language as the question, one per line, "
+    "without numbering or any other text.\n\n"
+    "#Question:\n{question}\n\n#Queries:\n"
+)
+
+
+def _elapsed_ms(start: float) -> float:
+    return (time.perf_counter() - start) * 1000
+
+
+def _doc_key(doc: Document) -> tuple:
+    return (
+        doc.metadata.get("source"),
+        doc.metadata.get("page"),
+        doc.page_content,
+    )
+
+
+async def expand_queries(question: str, num_queries: int = ADVANCED_RAG_NUM_QUERIES) -> List[str]:
+    """
+    질문을 여러 검색 질의로 확장
+
+    Args:
+        question: 사용자 질문
+        num_queries: 생성할 질의 수
+
+    Returns:
+        list[str]: 생성된 질의 (원래 질문 제외, 중복 제거)
+    """
+    llm = get_chat_model(RAG_QUERY_EXPANSION_MODEL, 0.0)
+    chain = QUERY_EXPANSION_PROMPT | llm | StrOutputParser()
+    text = await chain.ainvoke({"question": question, "num_queries": num_queries})
+
+    queries = []
+    for line in text.splitlines():
+        query = line.strip().lstrip("-*0123456789. ").strip()
+        if query and query != question and query not in queries:
+            queries.append(query)
+    return queries[:num_queries]
+
+
+async def multi_query_retrieve(
+    question: str,
+    retriever,
+    k: int = RAG_TOP_K,
+    num_queries: int = ADVANCED_RAG_NUM_QUERIES,
+    timings: Optional[Dict[str, float]] = None,
+) -> List[Document]:
+    """
+    다중 질의 동시 검색 후 RRF 로 융합
+
+    원래 질문 검색은 질의 확장(LLM 호출)과 동시에 시작하고,
+    확장된 질의들의 검색도 모두 동시에 실행하므로 단계를 늘려도
+    직렬 왕복 지연이 누적되지 않습니다.
+
+    Args:
+        question: 사용자 질문
+        retriever: 검색기
+        k: 반환할 문서 수
+        num_queries: 확장 질의 수
+        timings: 단계별 소요 시간(ms)을 기록할 dict (선택)
+
+    Returns:
+        list[Document]: 중복 제거 후 융합 순위 상위 k 개 문서
+    """
+    timings = timings if timings is not None else {}
+    start = time.perf_counter()
+
+    async def timed_expand() -> List[str]:
+        t = time.perf_counter()
+        try:
+            return await expand_queries(question, num_queries)
+        finally:
+            timings["query_expansion_ms"] = _elapsed_ms(t)
+
+    # 원래 질문 검색과 질의 확장 동시 실행
+    original_task = asyncio.ensure_future(retriever.ainvoke(question))
+    try:
+        sub_queries = await timed_expand()
+    except Exception as e:
+        # 질의 확장 실패 시 원래 질문만으로 진행
+        print(f"[WARN] query expansion failed: {e}")
+        sub_queries = []
+
+    # 확장 질의 동시 검색
+    t = time.perf_counter()
+    results = await asyncio.gather(
+        original_task, *(retriever.ainvoke(q) for q in sub_queries)
+    )
+    timings["retrieval_ms"] = _elapsed_ms(t)
+
+    # 중복 제거 + RRF 융합
+    t = time.perf_counter()
+    doc_ids: Dict[tuple, int] = {}
+    docs: List[Document] = []
+    rankings = []
+    for result in results:
+        ranking = []
+        for doc in result:
+            key = _doc_key(doc)
+            if key not in doc_ids:
+                doc_ids[key] = len(docs)
+                docs.append(doc)
+            ranking.append(doc_ids[key])
+        rankings.append(ranking)
+    fused = [docs[i] for i in reciprocal_rank_fusion(rankings, k=k, rrf_k=RAG_RRF_K)]
+    timings["fusion_ms"] = _elapsed_ms(t)
+
+    timings["num_queries"] = 1 + len(sub_queries)
+    timings["candidates"] = len(docs)
+    timings["context_total_ms"] = _elapsed_ms(start)
+    return fused
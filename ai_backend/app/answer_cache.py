@@ -0,0 +1,198 @@
+# ============================================
+# Answer Cache - RAG 최종 답변 시맨틱 캐시
+# ============================================
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import (
+    ANSWER_CACHE_SIMILARITY,
+    ANSWER_CACHE_TTL,
+    ANSWER_CACHE_MAX_ENTRIES,
+)
+
+# 캐시된 답변을 SSE 로 재생할 때 한 이벤트에 담을 최대 글자 수
+REPLAY_CHUNK_CHARS = 16
+
+# (문서 인덱스 키, 프롬프트 파일, 모델, RAG 모드, 파이프라인 파일, 검색 범위)
+BucketKey = Tuple[str, str, str, str, str, str]
+
+
+def make_bucket_key(
+    index_key: str,
+    prompt_file: str,
+    model: str,
+    rag_mode: str = "naive",
+    pipeline_file: Optional[str] = None,
+    scope: str = "",
+) -> BucketKey:
+    """같은 문서/프롬프트/모델/검색 범위 조합의 답변끼리만 비교하도록 묶는 키"""
+    return (index_key, prompt_file, model, rag_mode or "naive", pipeline_file or "", scope)
+
+
+def _normalize(vector) -> np.ndarray:
+    array = np.asarray(vector, dtype=np.float32).ravel()
+    norm = float(np.linalg.norm(array))
+    return array / norm if norm > 0 else array
+
+
+def split_for_replay(answer: str, chunk_chars: int = REPLAY_CHUNK_CHARS) -> List[str]:
+    """
+    캐시된 답변을 스트리밍 토큰처럼 나눔
+
+    공백 경계를 유지하며 chunk_chars 글자 안팎으로 자릅니다.
+    """
+    chunks, current = [], ""
+    for word in answer.split(" "):
+        piece = word if not current else " " + word
+        if current and len(current) + len(piece) > chunk_chars:
+            chunks.append(current)
+            piece = " " + word
+            current = ""
+        current += piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class SemanticAnswerCache:
+    """
+    (문서, 프롬프트, 모델) 단위로 질문 임베딩 -> 최종 답변을 보관하는 캐시
+
+    새 질문의 임베딩과 같은 bucket 에 저장된 질문 임베딩의 코사인 유사도가
+    threshold 이상이면 가장 유사한 답변을 반환합니다. 항목은 TTL 이 지나면
+    만료되고, 전체 항목 수가 max_entries 를 넘으면 가장 오래 사용되지 않은
+    항목부터 삭제합니다.
+    """
+
+    def __init__(
+        self,
+        threshold: float = ANSWER_CACHE_SIMILARITY,
+        ttl: float = ANSWER_CACHE_TTL,
+        max_entries: int = ANSWER_CACHE_MAX_ENTRIES,
+    ):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, dict]" = OrderedDict()
+        self._buckets: Dict[BucketKey, List[int]] = {}
+        # bucket 별 정규화된 질문 임베딩 행렬 (변경 시 다시 생성)
+        self._matrices: Dict[BucketKey, np.ndarray] = {}
+        self._next_id = 0
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _remove(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id)
+        bucket = entry["bucket"]
+        ids = self._buckets[bucket]
+        ids.remove(entry_id)
+        self._matrices.pop(bucket, None)
+        if not ids:
+            del self._buckets[bucket]
+
+    def _expire(self, now: float) -> None:
+        if self.ttl <= 0:
+            return
+        expired = [
+            entry_id for entry_id, entry in self._entries.items()
+            if now - entry["created_at"] > self.ttl
+        ]
+        for entry_id in expired:
+            self._remove(entry_id)
+        self.expirations += len(expired)
+
+    def _matrix(self, bucket: BucketKey) -> np.ndarray:
+        matrix = self._matrices.get(bucket)
+        if matrix is None:
+            matrix = np.stack([self._entries[i]["vector"] for i in self._buckets[bucket]])
+            self._matrices[bucket] = matrix
+        return matrix
+
+    def lookup(self, bucket: BucketKey, embedding) -> Optional[dict]:
+        """
+        유사한 질문의 캐시된 답변 조회
+
+        Returns:
+            {"answer", "question", "similarity"} 또는 None
+        """
+        query = _normalize(embedding)
+        with self._lock:
+            self._expire(time.time())
+            ids = self._buckets.get(bucket)
+            if ids:
+                similarities = self._matrix(bucket) @ query
+                best = int(np.argmax(similarities))
+                similarity = float(similarities[best])
+                if similarity >= self.threshold:
+                    entry_id = ids[best]
+                    entry = self._entries[entry_id]
+                    self._entries.move_to_end(entry_id)
+                    entry["hits"] += 1
+                    self.hits += 1
+                    return {
+                        "answer": entry["answer"],
+                        "question": entry["question"],
+                        "similarity": similarity,
+                    }
+            self.misses += 1
+            return None
+
+    def store(self, bucket: BucketKey, question: str, embedding, answer: str) -> None:
+        """생성이 끝난 답변 저장"""
+        if not answer or self.max_entries <= 0:
+            return
+        vector = _normalize(embedding)
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = {
+                "bucket": bucket,
+                "question": question,
+                "vector": vector,
+                "answer": answer,
+                "created_at": time.time(),
+                "hits": 0,
+            }
+            self._buckets.setdefault(bucket, []).append(entry_id)
+            self._matrices.pop(bucket, None)
+            self.stores += 1
+
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+            self._matrices.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "buckets": len(self._buckets),
+                "max_entries": self.max_entries,
+                "threshold": self.threshold,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+# 프로세스 전체에서 공유하는 답변 캐시
+answer_cache = SemanticAnswerCache()
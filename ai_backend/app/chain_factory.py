@@ -4,27 +4,51 @@
 
 import glob
 import os
+import threading
+import time
+from collections import OrderedDict
+from functools import partial
+from typing import Callable, Dict, Optional
 import yaml
 from langchain_core.prompts import (
     ChatPromptTemplate,
     MessagesPlaceholder,
     PromptTemplate,
 )
-from langchain_openai import ChatOpenAI
 from langchain_core.output_parsers import StrOutputParser
-from langchain_core.runnables import RunnableWithMessageHistory, RunnablePassthrough
-from langchain_community.document_loaders import PDFPlumberLoader
+from langchain_core.embeddings import Embeddings
+from langchain_core.runnables import (
+    RunnableWithMessageHistory,
+    RunnablePassthrough,
+    RunnableLambda,
+)
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_openai import OpenAIEmbeddings
-from langchain_community.vectorstores import FAISS
-from app.session_manager import get_session_history
+from app.session_manager import get_cached_session_history
+from app.llm_clients import get_chat_model
+from app.providers import create_provider_embeddings
+from app.embedding_cache import CachedEmbeddings
+from app.embedding_scheduler import EmbeddingScheduler
+from app.index_store import compute_index_key, load_index, load_lexical_index, save_index
+from app.pdf_loader import iter_pdf_pages
+from app.document_index import DocumentIndex
+from app.session_index import SessionIndex
+from app.advanced_rag import multi_query_retrieve
+from app.modular_rag import load_pipeline, run_pipeline
 from app.config import (
     CHATBOT_PROMPTS_DIR,
     RAG_PROMPTS_DIR,
+    RAG_PIPELINES_DIR,
+    DEFAULT_RAG_PIPELINE,
     DEFAULT_MODEL,
     DEFAULT_TEMPERATURE,
+    CHAIN_CACHE_SIZE,
     RAG_CHUNK_SIZE,
     RAG_CHUNK_OVERLAP,
+    RAG_INDEX_TYPE,
+    EMBEDDING_MODEL,
+    EMBED_BATCH_SIZE,
+    INGEST_MAX_FLUSH_CHUNKS,
+    RAG_MODES,
 )
 
 # ============================================
@@ -37,7 +61,7 @@ def get_available_prompts(prompt_type: str = "chatbot") -> list:
     사용 가능한 프롬프트 파일 목록 조회
 
     Args:
-        prompt_type: 프롬프트 타입 ("chatbot" 또는 "rag")
+        prompt_type: 프롬프트 타입 ("chatbot", "rag" 또는 "pipeline")
 
     Returns:
         list: 프롬프트 파일 경로 리스트
@@ -46,6 +70,8 @@ def get_available_prompts(prompt_type: str = "chatbot") -> list:
         prompt_dir = CHATBOT_PROMPTS_DIR
     elif prompt_type == "rag":
         prompt_dir = RAG_PROMPTS_DIR
+    elif prompt_type == "pipeline":
+        prompt_dir = RAG_PIPELINES_DIR
     else:
         raise ValueError(f"Invalid prompt type: {prompt_type}")
 
@@ -54,6 +80,39 @@ def get_available_prompts(prompt_type: str = "chatbot") -> list:
     return [file.replace("\\", "/") for file in prompt_files]
 
 
+# ============================================
+# Chatbot Chain 캐시
+# ============================================
+
+# (prompt_file, mtime, model, task, temperature) -> RunnableWithMessageHistory
+_chain_cache: "OrderedDict[tuple, RunnableWithMessageHistory]" = OrderedDict()
+_chain_cache_lock = threading.Lock()
+_chain_cache_stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+
+def get_chain_cache_stats() -> dict:
+    """
+    Chain 캐시 통계 조회
+
+    Returns:
+        dict: 캐시 크기 및 hit/miss/eviction/invalidation 카운터
+    """
+    with _chain_cache_lock:
+        return {
+            "size": len(_chain_cache),
+            "max_size": CHAIN_CACHE_SIZE,
+            **_chain_cache_stats,
+        }
+
+
+def clear_chain_cache() -> None:
+    """
+    Chain 캐시 비우기
+    """
+    with _chain_cache_lock:
+        _chain_cache.clear()
+
+
 # ============================================
 # Chatbot Chain 생성
 # ============================================
@@ -66,7 +125,10 @@ def create_chatbot_chain(
     temperature: float = DEFAULT_TEMPERATURE,
 ):
     """
-    Chatbot Chain 생성
+    Chatbot Chain 조회 (캐시 우선)
+
+    프롬프트 파일의 수정 시각을 키에 포함하므로, YAML 파일이 변경되면
+    이전 체인은 자동으로 무효화되고 새로 생성됩니다.
 
     Args:
         prompt_file: 프롬프트 파일 경로 (예: "prompts/chatbot/01-general.yaml")
@@ -74,6 +136,56 @@ def create_chatbot_chain(
         task: 역할 설정 (선택사항)
         temperature: 생성 온도
 
+    Returns:
+        RunnableWithMessageHistory: 대화 히스토리를 포함한 체인
+    """
+    mtime = os.stat(prompt_file).st_mtime_ns
+    key = (prompt_file, mtime, model, task or "", temperature)
+
+    with _chain_cache_lock:
+        chain = _chain_cache.get(key)
+        if chain is not None:
+            _chain_cache.move_to_end(key)
+            _chain_cache_stats["hits"] += 1
+            return chain
+        _chain_cache_stats["misses"] += 1
+
+    chain = _build_chatbot_chain(prompt_file, model, task, temperature)
+
+    with _chain_cache_lock:
+        # 같은 프롬프트 파일의 이전 버전(mtime 불일치) 제거
+        stale_keys = [
+            k for k in _chain_cache if k[0] == prompt_file and k[1] != mtime
+        ]
+        for k in stale_keys:
+            del _chain_cache[k]
+        _chain_cache_stats["invalidations"] += len(stale_keys)
+
+        _chain_cache[key] = chain
+        _chain_cache.move_to_end(key)
+
+        while len(_chain_cache) > CHAIN_CACHE_SIZE:
+            _chain_cache.popitem(last=False)
+            _chain_cache_stats["evictions"] += 1
+
+    return chain
+
+
+def _build_chatbot_chain(
+    prompt_file: str,
+    model: str,
+    task: str,
+    temperature: float,
+):
+    """
+    Chatbot Chain 생성 (캐시 미스 시 호출)
+
+    Args:
+        prompt_file: 프롬프트 파일 경로
+        model: LLM 모델명
+        task: 역할 설정
+        temperature: 생성 온도
+
     Returns:
         RunnableWithMessageHistory: 대화 히스토리를 포함한 체인
     """
@@ -114,8 +226,8 @@ def create_chatbot_chain(
         ]
     )
 
-    # LLM 생성
-    llm = ChatOpenAI(model=model, temperature=temperature)
+    # LLM 조회 (공유 커넥션 풀)
+    llm = get_chat_model(model, temperature)
 
     # 파서 생성
     output_parser = StrOutputParser()
@@ -126,7 +238,7 @@ def create_chatbot_chain(
     # 히스토리 포함 Chain
     chain_with_history = RunnableWithMessageHistory(
         chain,
-        get_session_history,
+        get_cached_session_history,
         input_messages_key="question",
         history_messages_key="chat_history",
     )
@@ -143,6 +255,8 @@ def create_rag_retriever(
     file_path: str,
     chunk_size: int = RAG_CHUNK_SIZE,
     chunk_overlap: int = RAG_CHUNK_OVERLAP,
+    progress: Optional[Callable[[str, int, Optional[int]], None]] = None,
+    index_type: str = RAG_INDEX_TYPE,
 ):
     """
     PDF 파일을 로드하고 벡터 검색기 생성 (RAG 1~5단계)
@@ -151,30 +265,184 @@ def create_rag_retriever(
         file_path: PDF 파일 경로
         chunk_size: 문서 분할 청크 크기
         chunk_overlap: 청크 간 중복 크기
+        progress: 단계별 진행률 콜백 (stage, done, total)
+        index_type: 벡터 인덱스 종류 ("auto", "flat", "sq8", "ivfpq")
 
     Returns:
         retriever: FAISS 기반 벡터 검색기
     """
-    # RAG 로직-1: 문서 로드
-    loader = PDFPlumberLoader(file_path)
-    docs = loader.load()
+    index = create_document_index()
+    ingest_document(file_path, index, chunk_size, chunk_overlap, progress, index_type)
+    return index.as_retriever()
+
+
+def create_embeddings() -> Embeddings:
+    """
+    RAG 로직-3: 임베딩 생성 (디스크 캐시 + 배치/동시성 스케줄러)
+
+    Provider 는 EMBEDDING_BACKEND 설정으로 선택하며, 오프라인(local) 백엔드도
+    같은 캐시/스케줄러 경로를 거치므로 부하 테스트 시 서버 동작이 동일합니다.
+    """
+    scheduler = EmbeddingScheduler(create_provider_embeddings())
+    return CachedEmbeddings(scheduler, model=EMBEDDING_MODEL)
+
+
+def create_document_index(embeddings: Optional[Embeddings] = None) -> DocumentIndex:
+    """
+    빈 DocumentIndex 생성 (RAG 로직-3: 임베딩 설정 포함)
+
+    Args:
+        embeddings: 공유할 Embeddings (없으면 새로 생성)
+
+    Returns:
+        DocumentIndex: 인제스트 전 빈 인덱스
+    """
+    return DocumentIndex(embeddings or create_embeddings())
+
+
+def create_session_index() -> SessionIndex:
+    """
+    빈 SessionIndex 생성 (세션 내 문서들이 질의 임베딩을 공유)
+
+    Returns:
+        SessionIndex: 문서가 없는 세션 인덱스
+    """
+    return SessionIndex(create_embeddings())
+
 
-    # RAG 로직-2: 문서 분할
+def ingest_document(
+    file_path: str,
+    index: DocumentIndex,
+    chunk_size: int = RAG_CHUNK_SIZE,
+    chunk_overlap: int = RAG_CHUNK_OVERLAP,
+    progress: Optional[Callable[[str, int, Optional[int]], None]] = None,
+    index_type: str = RAG_INDEX_TYPE,
+) -> DocumentIndex:
+    """
+    PDF 를 스트리밍 방식으로 인덱스에 추가 (RAG 1~4단계)
+
+    페이지 → 청크 → 임베딩 배치 → 인덱스 추가가 파이프라인으로 진행되어
+    앞쪽 페이지는 문서 전체가 끝나기 전에 검색 가능해집니다.
+    동일한 PDF 내용과 분할 설정으로 생성된 인덱스가 디스크에 있으면
+    문서 로드/분할/임베딩을 건너뛰고 저장된 인덱스를 바로 로드합니다.
+
+    Args:
+        file_path: PDF 파일 경로
+        index: 청크를 추가할 DocumentIndex (create_document_index)
+        chunk_size: 문서 분할 청크 크기
+        chunk_overlap: 청크 간 중복 크기
+        progress: 단계별 진행률 콜백 (stage, done, total)
+        index_type: 인덱싱 완료 후 적용할 벡터 인덱스 종류 (인제스트 중에는 flat)
+
+    Returns:
+        DocumentIndex: 인덱싱이 끝난 인덱스
+    """
+    report = progress or (lambda stage, done, total=None: None)
+    embeddings = index.embeddings
+
+    # 저장된 인덱스 확인 (PDF 내용 해시 + 분할 설정, 레지스트리에서 미리 계산했으면 재사용)
+    index_key = index.index_key or compute_index_key(file_path, chunk_size, chunk_overlap, EMBEDDING_MODEL)
+    index.index_key = index_key
+    loaded = load_index(index_key, embeddings)
+
+    if loaded is not None:
+        vectorstore, index_mapped = loaded
+        index.set_vectorstore(vectorstore, load_lexical_index(index_key), index_mapped)
+        index.compress(index_type)
+        index.mark_complete()
+        chunk_count = index.chunk_count
+        report("pages_parsed", 1, 1)
+        report("chunks_split", chunk_count, chunk_count)
+        report("chunks_embedded", chunk_count, chunk_count)
+        report("index_built", chunk_count, chunk_count)
+        return index
+
+    # RAG 로직-2: 문서 분할기
     text_splitter = RecursiveCharacterTextSplitter(
         chunk_size=chunk_size, chunk_overlap=chunk_overlap
     )
-    split_documents = text_splitter.split_documents(docs)
 
-    # RAG 로직-3: 임베딩 생성
-    embeddings = OpenAIEmbeddings()
+    pending = []
+    pages_done = 0
+    chunks_split = 0
+    chunks_indexed = 0
+    flush_size = EMBED_BATCH_SIZE
+
+    def estimated_total_chunks() -> Optional[int]:
+        # 진행 중에는 지금까지의 페이지당 청크 수로 전체 청크 수를 추정
+        if not index.total_pages or not pages_done:
+            return None
+        return max(chunks_split, round(chunks_split * index.total_pages / pages_done))
+
+    def flush() -> None:
+        nonlocal chunks_indexed, flush_size, pending
+        texts = [doc.page_content for doc in pending]
+
+        # RAG 로직-4: 임베딩 후 벡터 DB 에 추가
+        vectors = embeddings.embed_documents(texts)
+        index.add_embedded(texts, vectors, [doc.metadata for doc in pending], pages_done)
+
+        chunks_indexed += len(texts)
+        report("chunks_embedded", chunks_indexed, estimated_total_chunks())
+        report("index_built", chunks_indexed, estimated_total_chunks())
+        pending = []
+        flush_size = min(flush_size * 2, INGEST_MAX_FLUSH_CHUNKS)
+
+    # RAG 로직-1: 문서 로드 (페이지 범위 병렬 추출, 페이지 순서대로 처리)
+    def on_pages(done: int, total: int) -> None:
+        index.total_pages = total
+        report("pages_parsed", done, total)
+
+    for page in iter_pdf_pages(file_path, on_pages=on_pages):
+        chunks = text_splitter.split_documents([page])
+        pending.extend(chunks)
+        pages_done += 1
+        chunks_split += len(chunks)
+        report("chunks_split", chunks_split, estimated_total_chunks())
+
+        if len(pending) >= flush_size:
+            flush()
+
+    if pending:
+        flush()
+    else:
+        index.add_embedded([], [], [], pages_done)
 
-    # RAG 로직-4: 벡터 DB 생성
-    vectorstore = FAISS.from_documents(documents=split_documents, embedding=embeddings)
+    # 전체 개수 확정
+    report("chunks_split", chunks_split, chunks_split)
+    report("chunks_embedded", chunks_indexed, chunks_split)
+    index.compress(index_type)
+    report("index_built", chunks_indexed, chunks_split)
+    index.mark_complete()
 
-    # RAG 로직-5: 검색기 생성
-    retriever = vectorstore.as_retriever()
+    if index.vectorstore is not None:
+        save_index(index_key, index.vectorstore, index.lexical)
+        # 저장한 파일을 memory-map 으로 다시 열어 다른 워커와 같은 물리 메모리를 공유
+        index.remap()
 
-    return retriever
+    return index
+
+
+def load_document_index(index_key: str, embeddings: Optional[Embeddings] = None) -> Optional[DocumentIndex]:
+    """
+    다른 워커가 인제스트해 디스크에 저장한 인덱스를 읽기 전용으로 열기
+
+    Args:
+        index_key: 인덱스 키 (compute_index_key)
+        embeddings: 공유할 Embeddings (없으면 새로 생성)
+
+    Returns:
+        DocumentIndex: 인덱싱이 끝난 인덱스 (디스크에 없으면 None)
+    """
+    index = create_document_index(embeddings)
+    loaded = load_index(index_key, index.embeddings)
+    if loaded is None:
+        return None
+    vectorstore, index_mapped = loaded
+    index.index_key = index_key
+    index.set_vectorstore(vectorstore, load_lexical_index(index_key), index_mapped)
+    index.mark_complete()
+    return index
 
 
 def create_rag_chain(
@@ -182,6 +450,9 @@ def create_rag_chain(
     retriever,
     model: str = DEFAULT_MODEL,
     temperature: float = DEFAULT_TEMPERATURE,
+    rag_mode: str = "naive",
+    timings: Optional[Dict[str, float]] = None,
+    pipeline_file: Optional[str] = None,
 ):
     """
     RAG Chain 생성 (RAG 6~8단계)
@@ -191,10 +462,19 @@ def create_rag_chain(
         retriever: 벡터 검색기
         model: LLM 모델명
         temperature: 생성 온도
+        rag_mode: "naive" (단일 검색), "advanced" (다중 질의 동시 검색 + 융합)
+            또는 "modular" (파이프라인 YAML 정의에 따른 DAG 실행)
+        timings: 검색 단계별 소요 시간(ms)을 기록할 dict (선택)
+        pipeline_file: modular 모드 파이프라인 파일 경로 (기본: DEFAULT_RAG_PIPELINE)
 
     Returns:
         chain: RAG 체인
     """
+    if rag_mode not in RAG_MODES:
+        raise ValueError(f"Invalid rag mode: {rag_mode}")
+
+    timings = timings if timings is not None else {}
+
     # RAG 로직-6: 프롬프트 정의
     # YAML 파일에서 프롬프트 직접 로드
     with open(prompt_file, "r", encoding="utf-8") as f:
@@ -205,15 +485,43 @@ def create_rag_chain(
     input_vars = prompt_data.get("input_variables", ["context", "question"])
     prompt = PromptTemplate(template=template_text, input_variables=input_vars)
 
-    # RAG 로직-7: LLM 생성
-    llm = ChatOpenAI(model=model, temperature=temperature)
+    # RAG 로직-7: LLM 조회 (공유 커넥션 풀)
+    llm = get_chat_model(model, temperature)
+
+    # 문서 검색 단계
+    if rag_mode == "advanced":
+        context = RunnableLambda(
+            partial(multi_query_retrieve, retriever=retriever, timings=timings)
+        )
+    elif rag_mode == "modular":
+        # 파이프라인 정의 검증 (잘못된 정의는 스트리밍 시작 전에 오류)
+        pipeline_file = pipeline_file or DEFAULT_RAG_PIPELINE
+        load_pipeline(pipeline_file)
+        context = RunnableLambda(
+            partial(
+                run_pipeline,
+                pipeline_file=pipeline_file,
+                retriever=retriever,
+                timings=timings,
+            )
+        )
+    else:
+        context = RunnableLambda(partial(_timed_retrieve, retriever=retriever, timings=timings))
 
     # RAG 로직-8: LCEL 체인 구성
     chain = (
-        {"context": retriever, "question": RunnablePassthrough()}
+        {"context": context, "question": RunnablePassthrough()}
         | prompt
         | llm
         | StrOutputParser()
     )
 
     return chain
+
+
+async def _timed_retrieve(question: str, retriever, timings: Dict[str, float]):
+    start = time.perf_counter()
+    docs = await retriever.ainvoke(question)
+    timings["retrieval_ms"] = (time.perf_counter() - start) * 1000
+    timings["context_total_ms"] = timings["retrieval_ms"]
+    return docs
@@ -8,8 +8,15 @@ from pydantic import BaseModel
 from typing import Optional
 import json
 import asyncio
-from app.chain_factory import create_chatbot_chain, get_available_prompts
-from app.session_manager import clear_session, session_exists
+from app.chain_factory import (
+    create_chatbot_chain,
+    get_available_prompts,
+    get_chain_cache_stats,
+    clear_chain_cache,
+)
+from app.session_manager import clear_session, session_exists, get_session_history
+from app.response_cache import response_store, history_digest, make_response_key
+from app.answer_cache import split_for_replay
 
 router = APIRouter()
 
@@ -25,6 +32,7 @@ class ChatRequest(BaseModel):
     prompt_file: str
     task: Optional[str] = ""
     temperature: Optional[float] = 0.0
+    use_cache: Optional[bool] = True
 
 
 class ChatResponse(BaseModel):
@@ -34,6 +42,33 @@ class ChatResponse(BaseModel):
     role: str = "assistant"
 
 
+# ============================================
+# 응답 캐시
+# ============================================
+
+def _response_cache_key(request: ChatRequest, history) -> Optional[str]:
+    """
+    캐시 대상 요청의 캐시 키 (temperature 0 요청만, 캐시 비활성화 시 None)
+
+    Chain 이 히스토리에 이번 턴을 추가하기 전에 계산해야 합니다.
+    """
+    if response_store is None or not request.use_cache or request.temperature != 0:
+        return None
+    return make_response_key(
+        request.prompt_file,
+        request.task,
+        request.model,
+        history_digest(history.messages),
+        request.message,
+    )
+
+
+def _append_cached_turn(history, message: str, answer: str) -> None:
+    """캐시된 응답도 Chain 을 거친 것처럼 세션 히스토리에 기록"""
+    history.add_user_message(message)
+    history.add_ai_message(answer)
+
+
 # ============================================
 # API 엔드포인트
 # ============================================
@@ -54,18 +89,40 @@ async def chat_stream(request: ChatRequest):
             temperature=request.temperature
         )
 
+        # 세션 히스토리 로드/갱신 (저장소 I/O 는 이벤트 루프 밖에서)
+        history = await asyncio.to_thread(get_session_history, request.session_id)
+
+        # 응답 캐시 조회
+        cache_key = _response_cache_key(request, history)
+        cached = None
+        if cache_key is not None:
+            cached = await asyncio.to_thread(response_store.get, cache_key)
+            if cached is not None:
+                _append_cached_turn(history, request.message, cached)
+
         # 스트리밍 응답 생성
         async def generate():
             try:
+                if cached is not None:
+                    for chunk in split_for_replay(cached):
+                        yield f"data: {json.dumps({'token': chunk})}\n\n"
+                    yield "data: [DONE]\n\n"
+                    return
+
                 config = {"configurable": {"session_id": request.session_id}}
 
                 # astream을 사용한 비동기 스트리밍
+                answer = []
                 async for chunk in chain.astream(
                     {"question": request.message},
                     config=config
                 ):
+                    answer.append(chunk)
                     yield f"data: {json.dumps({'token': chunk})}\n\n"
 
+                if cache_key is not None:
+                    await asyncio.to_thread(response_store.put, cache_key, "".join(answer))
+
                 # 스트리밍 종료 신호
                 yield "data: [DONE]\n\n"
 
@@ -104,6 +161,21 @@ async def chat_message(request: ChatRequest):
             temperature=request.temperature
         )
 
+        # 세션 히스토리 로드/갱신 (저장소 I/O 는 이벤트 루프 밖에서)
+        history = await asyncio.to_thread(get_session_history, request.session_id)
+
+        # 응답 캐시 조회
+        cache_key = _response_cache_key(request, history)
+        if cache_key is not None:
+            cached = await asyncio.to_thread(response_store.get, cache_key)
+            if cached is not None:
+                _append_cached_turn(history, request.message, cached)
+                return ChatResponse(
+                    session_id=request.session_id,
+                    message=cached,
+                    role="assistant"
+                )
+
         # 응답 생성
         config = {"configurable": {"session_id": request.session_id}}
         response = await chain.ainvoke(
@@ -111,6 +183,9 @@ async def chat_message(request: ChatRequest):
             config=config
         )
 
+        if cache_key is not None:
+            await asyncio.to_thread(response_store.put, cache_key, response)
+
         return ChatResponse(
             session_id=request.session_id,
             message=response,
@@ -133,6 +208,43 @@ async def list_prompts():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/cache/stats")
+async def chain_cache_stats():
+    """
+    Chain 캐시 통계 조회
+    """
+    return get_chain_cache_stats()
+
+
+@router.delete("/cache/chains")
+async def clear_chains():
+    """
+    컴파일된 Chatbot Chain 캐시 비우기 (다음 요청에서 다시 생성)
+    """
+    clear_chain_cache()
+    return {"message": "Chain cache cleared"}
+
+
+@router.get("/cache/responses")
+async def response_cache_stats():
+    """
+    temperature 0 응답 캐시 통계 조회
+    """
+    if response_store is None:
+        return {"backend": "none"}
+    return await asyncio.to_thread(response_store.stats)
+
+
+@router.delete("/cache/responses")
+async def clear_response_cache():
+    """
+    temperature 0 응답 캐시 비우기
+    """
+    if response_store is not None:
+        await asyncio.to_thread(response_store.clear)
+    return {"message": "Response cache cleared"}
+
+
 @router.delete("/session/{session_id}")
 async def delete_session(session_id: str):
     """
@@ -140,7 +252,7 @@ async def delete_session(session_id: str):
 
     특정 세션의 대화 히스토리를 삭제합니다.
     """
-    success = clear_session(session_id)
+    success = await asyncio.to_thread(clear_session, session_id)
 
     if success:
         return {"message": "Session cleared successfully", "session_id": session_id}
@@ -153,5 +265,18 @@ async def check_session(session_id: str):
     """
     세션 존재 여부 확인
     """
-    exists = session_exists(session_id)
+    exists = await asyncio.to_thread(session_exists, session_id)
     return {"session_id": session_id, "exists": exists}
+
+
+@router.get("/session/{session_id}/history")
+async def get_history_status(session_id: str):
+    """
+    세션 히스토리 상태 조회
+
+    프롬프트에 원문으로 들어가는 최근 메시지 수/토큰 수와 요약 상태를 반환합니다.
+    """
+    if not await asyncio.to_thread(session_exists, session_id):
+        raise HTTPException(status_code=404, detail="Session not found")
+    history = await asyncio.to_thread(get_session_history, session_id)
+    return {"session_id": session_id, **history.status()}
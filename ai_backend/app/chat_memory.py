@@ -0,0 +1,368 @@
+# ============================================
+# Chat Memory - 토큰 예산 기반 대화 히스토리
+# ============================================
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Sequence
+
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+
+from app.config import (
+    HISTORY_TOKEN_BUDGET,
+    HISTORY_SUMMARY_ENABLED,
+    HISTORY_SUMMARY_MODEL,
+    HISTORY_SUMMARY_MAX_TOKENS,
+    HISTORY_SUMMARY_WORKERS,
+)
+from app.llm_clients import get_chat_model
+
+# 메시지 1개당 역할/구분자 오버헤드 (OpenAI 채팅 포맷 기준 근사치)
+_MESSAGE_OVERHEAD_TOKENS = 4
+
+# 메시지 객체 1개의 본문 외 메모리 (BaseMessage 필드/딕셔너리, tracemalloc 실측 약 830B)
+_MESSAGE_OVERHEAD_BYTES = 800
+
+SUMMARY_PREFIX = "이전 대화 요약:\n"
+
+_SUMMARY_INSTRUCTION = (
+    "다음은 사용자와 AI 어시스턴트의 기존 대화 요약과 그 이후 이어진 대화입니다.\n"
+    "이후 대화를 이어가는 데 필요한 사실, 사용자의 요구사항과 선호, 결정된 사항을 빠짐없이 "
+    "유지하여 기존 요약을 갱신한 하나의 요약을 작성하세요.\n"
+    "요약은 대화에 사용된 언어로, 약 {max_tokens} 토큰 이내로 작성하고 요약 본문만 출력하세요."
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    토크나이저 없이 계산하는 토큰 수 근사치
+
+    ASCII 는 약 4글자당 1토큰, 한글 등 그 외 문자는 글자당 1토큰으로 계산합니다
+    (cl100k 기준 한국어는 음절당 1토큰 안팎). 예산 판단용이므로 약간 크게 잡습니다.
+    """
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+
+def _content(message: BaseMessage) -> str:
+    return message.content if isinstance(message.content, str) else str(message.content)
+
+
+def message_tokens(message: BaseMessage) -> int:
+    return estimate_tokens(_content(message)) + _MESSAGE_OVERHEAD_TOKENS
+
+
+def message_nbytes(message: BaseMessage) -> int:
+    """메시지가 차지하는 메모리 근사치 (본문 UTF-8 크기 + 객체 오버헤드)"""
+    return len(_content(message).encode("utf-8")) + _MESSAGE_OVERHEAD_BYTES
+
+
+# ============================================
+# 요약 실행기 (프로세스 전역)
+# ============================================
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_stats = {
+    "scheduled": 0,
+    "completed": 0,
+    "failed": 0,
+    "in_flight": 0,
+    "folded_messages": 0,
+    "total_ms": 0.0,
+}
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=HISTORY_SUMMARY_WORKERS, thread_name_prefix="history-summary"
+            )
+        return _executor
+
+
+def _format_transcript(messages: Sequence[BaseMessage]) -> str:
+    lines = []
+    for message in messages:
+        role = "사용자" if isinstance(message, HumanMessage) else "AI"
+        lines.append(f"{role}: {message.content}")
+    return "\n".join(lines)
+
+
+def summarize_messages(summary: str, messages: Sequence[BaseMessage]) -> str:
+    """
+    기존 요약 + 새로 접을 대화로 갱신된 요약 생성 (동기, 요약 스레드에서 호출)
+    """
+    llm = get_chat_model(HISTORY_SUMMARY_MODEL, 0.0)
+    prompt = [
+        SystemMessage(content=_SUMMARY_INSTRUCTION.format(max_tokens=HISTORY_SUMMARY_MAX_TOKENS)),
+        HumanMessage(content=(
+            f"[기존 요약]\n{summary or '(없음)'}\n\n"
+            f"[이어진 대화]\n{_format_transcript(messages)}"
+        )),
+    ]
+    return str(llm.invoke(prompt).content).strip()
+
+
+# ============================================
+# 히스토리
+# ============================================
+
+
+class WindowedChatHistory(BaseChatMessageHistory):
+    """
+    최근 대화는 토큰 예산 안에서 원문 그대로, 그 이전 대화는 요약 하나로 유지하는 히스토리
+
+    messages (Chain 에 주입되는 값) 는 [요약 SystemMessage] + 예산 안에 들어가는
+    최근 메시지로, 프롬프트 크기가 대화 길이와 무관하게 제한됩니다.
+    턴이 추가되어 예산을 넘으면 창 밖 메시지를 백그라운드 스레드에서 요약에 접으므로
+    사용자의 응답 지연에는 영향을 주지 않습니다. 요약이 끝나기 전에 다음 질문이
+    들어오면 창 밖 메시지는 잠시 프롬프트에서 빠지고, 요약이 끝나면 요약으로 반영됩니다.
+
+    on_resize 가 설정되어 있으면 보관 중인 바이트 수가 바뀔 때마다 변화량을 전달합니다
+    (세션 저장소의 메모리 예산 계산용, 히스토리 lock 을 놓은 뒤 호출).
+
+    on_change 가 설정되어 있으면 상태 변경을 순서대로 작업 튜플로 전달합니다
+    (영속 저장소 기록용, 히스토리 lock 을 보유한 채 호출되므로 큐에 넣기만 해야 함).
+        ("append", messages)  메시지 추가
+        ("fold", summary, base)  요약 갱신, 절대 위치 base 이전 메시지 삭제
+        ("clear",)  전체 삭제
+    """
+
+    def __init__(
+        self,
+        token_budget: int = HISTORY_TOKEN_BUDGET,
+        summarize: bool = HISTORY_SUMMARY_ENABLED,
+    ):
+        self.token_budget = token_budget
+        self.summarize = summarize
+        self.summary = ""
+        # 아직 요약에 접히지 않은 메시지와 메시지별 토큰 수
+        self._messages: List[BaseMessage] = []
+        self._tokens: List[int] = []
+        self._lock = threading.Lock()
+        self._summarizing = False
+        # 요약에 접혀 사라진 메시지 수 (= self._messages[0] 의 대화 내 절대 위치)
+        self._base = 0
+        # clear()/restore() 시 증가 (진행 중이던 요약 결과 폐기용)
+        self._generation = 0
+        self._nbytes = 0
+        self.on_resize: Optional[Callable[[int], None]] = None
+        self.on_change: Optional[Callable[[tuple], None]] = None
+
+    # ----------------------------------------
+    # 창 계산
+    # ----------------------------------------
+
+    def _window_start(self) -> int:
+        # 호출자가 self._lock 보유. 예산 안에 들어가는 가장 긴 꼬리 구간의 시작 위치
+        if self.token_budget <= 0:
+            return 0
+        used = 0
+        start = len(self._messages)
+        while start > 0 and used + self._tokens[start - 1] <= self.token_budget:
+            start -= 1
+            used += self._tokens[start]
+        # 답변만 남는 일이 없도록 사용자 메시지에서 시작
+        while start < len(self._messages) and not isinstance(self._messages[start], HumanMessage):
+            start += 1
+        return start
+
+    @property
+    def messages(self) -> List[BaseMessage]:
+        with self._lock:
+            window = self._messages[self._window_start():]
+            summary = self.summary
+        if summary:
+            return [SystemMessage(content=SUMMARY_PREFIX + summary), *window]
+        return list(window)
+
+    @property
+    def prompt_tokens(self) -> int:
+        """messages 가 프롬프트에 차지하는 토큰 수 (근사치)"""
+        with self._lock:
+            tokens = sum(self._tokens[self._window_start():])
+            if self.summary:
+                tokens += estimate_tokens(SUMMARY_PREFIX + self.summary) + _MESSAGE_OVERHEAD_TOKENS
+            return tokens
+
+    # ----------------------------------------
+    # 추가 / 초기화
+    # ----------------------------------------
+
+    @property
+    def nbytes(self) -> int:
+        """보관 중인 메시지와 요약의 메모리 근사치"""
+        with self._lock:
+            return self._nbytes
+
+    def _set_nbytes(self) -> int:
+        # 호출자가 self._lock 보유. 다시 계산한 뒤 변화량 반환
+        nbytes = sum(message_nbytes(m) for m in self._messages) + len(self.summary.encode("utf-8"))
+        delta = nbytes - self._nbytes
+        self._nbytes = nbytes
+        return delta
+
+    def _notify(self, delta: int) -> None:
+        if delta and self.on_resize is not None:
+            self.on_resize(delta)
+
+    def _journal(self, op: tuple) -> None:
+        # 호출자가 self._lock 보유
+        if self.on_change is not None:
+            self.on_change(op)
+
+    def add_messages(self, messages: Sequence[BaseMessage]) -> None:
+        messages = list(messages)
+        with self._lock:
+            for message in messages:
+                self._messages.append(message)
+                self._tokens.append(message_tokens(message))
+            if messages:
+                self._journal(("append", messages))
+            self._fold_overflow()
+            delta = self._set_nbytes()
+        self._notify(delta)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._messages.clear()
+            self._tokens.clear()
+            self.summary = ""
+            self._base = 0
+            self._generation += 1
+            self._summarizing = False
+            self._journal(("clear",))
+            delta = self._set_nbytes()
+        self._notify(delta)
+
+    def restore(self, summary: str, base: int, messages: Sequence[BaseMessage]) -> None:
+        """
+        영속 저장소에서 읽은 상태로 교체 (on_change 로 다시 기록하지 않음)
+
+        진행 중이던 요약 결과는 폐기하고, 불러온 대화가 예산을 넘으면 다시 요약합니다.
+        """
+        with self._lock:
+            self.summary = summary
+            self._base = base
+            self._messages = list(messages)
+            self._tokens = [message_tokens(m) for m in self._messages]
+            self._generation += 1
+            self._summarizing = False
+            self._fold_overflow()
+            delta = self._set_nbytes()
+        self._notify(delta)
+
+    def detach(self, keep_journal: bool = False) -> None:
+        """
+        세션 저장소에서 빠질 때 호출 (콜백 해제, 진행 중인 요약 결과 폐기)
+
+        keep_journal=True 이면 on_change 는 유지하여, 메모리에서 빠진 뒤 끝나는
+        진행 중인 턴의 메시지도 영속 저장소에 기록되게 합니다.
+        """
+        with self._lock:
+            self.on_resize = None
+            if not keep_journal:
+                self.on_change = None
+            self._generation += 1
+            self._summarizing = False
+
+    def _fold_overflow(self) -> None:
+        # 호출자가 self._lock 보유. 창 밖 메시지를 요약에 접거나 (요약 비활성 시) 버림
+        start = self._window_start()
+        if start == 0:
+            return
+        if not self.summarize:
+            del self._messages[:start]
+            del self._tokens[:start]
+            self._base += start
+            self._journal(("fold", self.summary, self._base))
+            return
+        if self._summarizing:
+            # 진행 중인 요약이 끝나면 다시 확인
+            return
+        self._summarizing = True
+        snapshot = (self._generation, self.summary, list(self._messages[:start]))
+        with _executor_lock:
+            _stats["scheduled"] += 1
+            _stats["in_flight"] += 1
+        _get_executor().submit(self._run_summary, *snapshot)
+
+    def _run_summary(self, generation: int, summary: str, folded: List[BaseMessage]) -> None:
+        start = time.perf_counter()
+        try:
+            new_summary = summarize_messages(summary, folded)
+        except Exception as e:
+            print(f"[WARN] history summary failed: {e}")
+            new_summary = None
+
+        with _executor_lock:
+            _stats["in_flight"] -= 1
+            _stats["total_ms"] += (time.perf_counter() - start) * 1000
+            if new_summary is None:
+                _stats["failed"] += 1
+            else:
+                _stats["completed"] += 1
+                _stats["folded_messages"] += len(folded)
+
+        delta = 0
+        with self._lock:
+            # 폐기된 요약이면 _summarizing 은 clear()/restore() 에서 이미 해제됨
+            if generation != self._generation:
+                return
+            self._summarizing = False
+            if new_summary is not None:
+                self.summary = new_summary
+                del self._messages[:len(folded)]
+                del self._tokens[:len(folded)]
+                self._base += len(folded)
+                self._journal(("fold", self.summary, self._base))
+                delta = self._set_nbytes()
+                # 요약하는 동안 추가된 턴으로 다시 넘쳤으면 이어서 요약
+                self._fold_overflow()
+            # 실패 시 메시지는 그대로 두고 다음 턴 추가 때 다시 시도
+        self._notify(delta)
+
+    def status(self) -> dict:
+        with self._lock:
+            start = self._window_start()
+            return {
+                "messages": len(self._messages),
+                "window_messages": len(self._messages) - start,
+                "window_tokens": sum(self._tokens[start:]),
+                "token_budget": self.token_budget,
+                "summary_tokens": estimate_tokens(self.summary),
+                "summarizing": self._summarizing,
+                "bytes": self._nbytes,
+            }
+
+
+def get_history_stats() -> dict:
+    """
+    히스토리 요약 실행기 상태 조회
+    """
+    with _executor_lock:
+        completed = _stats["completed"] + _stats["failed"]
+        return {
+            "token_budget": HISTORY_TOKEN_BUDGET,
+            "summary_enabled": HISTORY_SUMMARY_ENABLED,
+            "summary_model": HISTORY_SUMMARY_MODEL,
+            **{k: v for k, v in _stats.items() if k != "total_ms"},
+            "avg_summary_ms": round(_stats["total_ms"] / completed, 1) if completed else 0.0,
+        }
+
+
+def shutdown_history_summarizer() -> None:
+    """
+    요약 실행기 종료 (서버 종료 시 호출, 대기 중인 요약은 취소)
+    """
+    global _executor
+    with _executor_lock:
+        executor = _executor
+        _executor = None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
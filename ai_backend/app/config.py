@@ -16,6 +16,7 @@ load_dotenv(dotenv_path=env_path)
 # ============================================
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
 LANGSMITH_API_KEY = os.getenv("LANGSMITH_API_KEY")
 
 # ============================================
@@ -42,6 +43,85 @@ AVAILABLE_MODELS = [
 DEFAULT_MODEL = "gpt-4.1"
 DEFAULT_TEMPERATURE = 0.0
 
+# ============================================
+# Provider 백엔드 설정
+# ============================================
+
+# LLM 백엔드: "openai" (ChatOpenAI) 또는 "fake" (오프라인 부하 테스트용 스트리밍 모델)
+LLM_BACKEND = os.getenv("LLM_BACKEND", "openai")
+
+# fake LLM: 첫 토큰까지 지연(ms), 초당 토큰 수, 응답 토큰 수
+FAKE_LLM_TTFT_MS = float(os.getenv("FAKE_LLM_TTFT_MS", "300"))
+FAKE_LLM_TOKENS_PER_SEC = float(os.getenv("FAKE_LLM_TOKENS_PER_SEC", "50"))
+FAKE_LLM_RESPONSE_TOKENS = int(os.getenv("FAKE_LLM_RESPONSE_TOKENS", "64"))
+
+# 임베딩 백엔드: "openai" (OpenAIEmbeddings) 또는 "local" (해싱 기반 TF 임베딩, API 호출 없음)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "openai")
+LOCAL_EMBEDDING_DIM = int(os.getenv("LOCAL_EMBEDDING_DIM", "1536"))
+
+# ============================================
+# LLM 클라이언트 풀 설정
+# ============================================
+
+# 프로세스 전체에서 공유하는 HTTP 커넥션 풀 크기
+LLM_POOL_MAX_CONNECTIONS = int(os.getenv("LLM_POOL_MAX_CONNECTIONS", "100"))
+LLM_POOL_MAX_KEEPALIVE = int(os.getenv("LLM_POOL_MAX_KEEPALIVE", "20"))
+LLM_POOL_KEEPALIVE_EXPIRY = float(os.getenv("LLM_POOL_KEEPALIVE_EXPIRY", "60"))
+LLM_REQUEST_TIMEOUT = float(os.getenv("LLM_REQUEST_TIMEOUT", "120"))
+
+# 서버 시작 시 미리 열어둘 커넥션 수 (0이면 사전 연결 안 함)
+LLM_WARMUP_CONNECTIONS = int(os.getenv("LLM_WARMUP_CONNECTIONS", "4"))
+# 사전 연결 요청 제한 시간 (초, Provider 가 응답하지 않아도 서버 시작이 지연되지 않도록 짧게)
+LLM_WARMUP_TIMEOUT = float(os.getenv("LLM_WARMUP_TIMEOUT", "5"))
+
+# ============================================
+# Chain 캐시 설정
+# ============================================
+
+# 컴파일된 Chatbot Chain 최대 보관 개수 (LRU)
+CHAIN_CACHE_SIZE = int(os.getenv("CHAIN_CACHE_SIZE", "32"))
+
+# ============================================
+# 대화 히스토리 설정
+# ============================================
+
+# 프롬프트에 원문 그대로 넣을 최근 대화의 최대 토큰 수 (0 이면 제한 없음)
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "2000"))
+
+# 창 밖으로 밀려난 대화를 요약으로 접을지 여부 (false 면 단순히 버림)
+HISTORY_SUMMARY_ENABLED = os.getenv("HISTORY_SUMMARY_ENABLED", "true").lower() == "true"
+
+# 요약 모델, 요약 길이 목표 (토큰), 요약 작업 스레드 수
+HISTORY_SUMMARY_MODEL = os.getenv("HISTORY_SUMMARY_MODEL", "gpt-4o-mini")
+HISTORY_SUMMARY_MAX_TOKENS = int(os.getenv("HISTORY_SUMMARY_MAX_TOKENS", "400"))
+HISTORY_SUMMARY_WORKERS = int(os.getenv("HISTORY_SUMMARY_WORKERS", "2"))
+
+# 세션 유휴 만료 시간 (초, 0 이면 만료 없음)
+SESSION_TTL = float(os.getenv("SESSION_TTL", "7200"))
+
+# 전체 세션 히스토리 메모리 예산 (bytes, 초과 시 가장 오래 사용되지 않은 세션부터 제거)
+SESSION_MAX_BYTES = int(os.getenv("SESSION_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# 만료 세션 정리 주기 (초)
+SESSION_SWEEP_INTERVAL = float(os.getenv("SESSION_SWEEP_INTERVAL", "60"))
+
+# 대화 히스토리 영속 저장소: "memory" (프로세스 메모리만), "sqlite" (디스크), "redis"
+# sqlite/redis 를 쓰면 여러 워커/재시작 사이에서 세션이 이어집니다
+HISTORY_BACKEND = os.getenv("HISTORY_BACKEND", "memory")
+HISTORY_REDIS_URL = os.getenv("HISTORY_REDIS_URL", "redis://localhost:6379/0")
+HISTORY_REDIS_PREFIX = os.getenv("HISTORY_REDIS_PREFIX", "sm-ai:history:")
+
+# 히스토리 쓰기 묶음 주기 (초) / 한 번에 기록할 최대 작업 수
+HISTORY_FLUSH_INTERVAL = float(os.getenv("HISTORY_FLUSH_INTERVAL", "0.05"))
+HISTORY_FLUSH_MAX_BATCH = int(os.getenv("HISTORY_FLUSH_MAX_BATCH", "256"))
+
+# 마지막 기록 후 저장된 히스토리를 보관하는 기간 (초, 0 이면 무기한)
+HISTORY_RETENTION = float(os.getenv("HISTORY_RETENTION", str(7 * 24 * 3600)))
+
+# temperature 0 채팅 응답 캐시 저장소: "none" (비활성화), "memory" (LRU), "sqlite" (디스크)
+RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "none")
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "10000"))
+
 # ============================================
 # RAG 설정
 # ============================================
@@ -49,17 +129,153 @@ DEFAULT_TEMPERATURE = 0.0
 RAG_CHUNK_SIZE = 1000
 RAG_CHUNK_OVERLAP = 50
 
+# 검색 방식: "hybrid" (BM25 + 벡터, RRF 융합) 또는 "dense" (벡터만)
+RAG_RETRIEVAL_MODE = os.getenv("RAG_RETRIEVAL_MODE", "hybrid")
+
+# 최종 반환 청크 수 / 융합 전 각 검색기에서 가져올 후보 수
+RAG_TOP_K = int(os.getenv("RAG_TOP_K", "4"))
+RAG_FETCH_K = int(os.getenv("RAG_FETCH_K", "20"))
+
+# Reciprocal Rank Fusion 상수 및 BM25 파라미터
+RAG_RRF_K = int(os.getenv("RAG_RRF_K", "60"))
+BM25_K1 = float(os.getenv("BM25_K1", "1.5"))
+BM25_B = float(os.getenv("BM25_B", "0.75"))
+
+# RAG 모드 ("naive", "advanced", "modular")
+RAG_MODES = ["naive", "advanced", "modular"]
+
+# Advanced RAG: 확장 질의 수 및 질의 확장에 사용할 모델
+ADVANCED_RAG_NUM_QUERIES = int(os.getenv("ADVANCED_RAG_NUM_QUERIES", "3"))
+RAG_QUERY_EXPANSION_MODEL = os.getenv("RAG_QUERY_EXPANSION_MODEL", "gpt-4o-mini")
+
+# Modular RAG: stage 결과 캐시 최대 개수 (LRU)
+MODULAR_RAG_STAGE_CACHE_SIZE = int(os.getenv("MODULAR_RAG_STAGE_CACHE_SIZE", "512"))
+
+# 벡터 인덱스 종류: "auto" (청크 수로 선택), "flat" (float32), "sq8" (int8 스칼라 양자화), "ivfpq"
+RAG_INDEX_TYPE = os.getenv("RAG_INDEX_TYPE", "auto")
+
+# "auto" 일 때 이 청크 수 이상이면 sq8 / ivfpq 로 압축
+INDEX_SQ8_MIN_CHUNKS = int(os.getenv("INDEX_SQ8_MIN_CHUNKS", "2000"))
+INDEX_IVFPQ_MIN_CHUNKS = int(os.getenv("INDEX_IVFPQ_MIN_CHUNKS", "50000"))
+
+# IVF-PQ: 검색 시 조회할 클러스터 수 / 서브벡터당 차원 수 (PQ 코드 = 차원 / 이 값 bytes)
+INDEX_IVF_NPROBE = int(os.getenv("INDEX_IVF_NPROBE", "16"))
+INDEX_PQ_DIMS_PER_CODE = int(os.getenv("INDEX_PQ_DIMS_PER_CODE", "8"))
+
+# 인덱싱이 끝난 문서 인덱스의 메모리 예산 (bytes, 0 이면 제한 없음)
+# 초과 시 가장 오래 사용되지 않은 인덱스를 메모리에서 내리고 (디스크 인덱스 유지) 다음 질의 때 다시 로드
+RAG_INDEX_MEMORY_BUDGET = int(os.getenv("RAG_INDEX_MEMORY_BUDGET", str(1024 * 1024 * 1024)))
+
+# 세션 -> 문서 인덱스 목록 저장소: "memory" (워커 프로세스별) 또는 "sqlite" (워커 간 공유)
+# sqlite 면 어느 워커로 요청이 가도 세션의 문서를 찾아 디스크 인덱스를 읽기 전용으로 엽니다
+RAG_SESSION_CATALOG = os.getenv("RAG_SESSION_CATALOG", "memory")
+
+# 임베딩 모델 (캐시 키에 포함, local 백엔드는 OpenAI 임베딩 캐시와 섞이지 않도록 별도 이름)
+EMBEDDING_MODEL = (
+    os.getenv("EMBEDDING_MODEL", "text-embedding-ada-002")
+    if EMBEDDING_BACKEND == "openai"
+    else f"local-hashing-{LOCAL_EMBEDDING_DIM}"
+)
+
+# 청크 임베딩 디스크 캐시 최대 크기 (bytes, 초과 시 오래된 항목부터 삭제)
+EMBEDDING_CACHE_MAX_BYTES = int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+# 질의 임베딩 메모리 캐시 크기 (답변 캐시 조회와 검색이 같은 임베딩을 재사용)
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "256"))
+
+# RAG 답변 시맨틱 캐시: (문서 해시, 프롬프트, 모델) 단위로 질문 임베딩 유사도가
+# 임계값 이상이면 저장된 답변을 재생 (TTL 초, 최대 항목 수)
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+ANSWER_CACHE_SIMILARITY = float(os.getenv("ANSWER_CACHE_SIMILARITY", "0.95"))
+ANSWER_CACHE_TTL = int(os.getenv("ANSWER_CACHE_TTL", "3600"))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "1000"))
+
+# ============================================
+# RAG 인제스트 실행 설정
+# ============================================
+
+# PDF 페이지 추출 프로세스 수 (기본: CPU 코어 수)
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", str(os.cpu_count() or 1)))
+
+# 이 페이지 수 미만의 PDF는 프로세스 풀 없이 직접 추출
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "16"))
+
+# 문서 인제스트 전용 스레드 수 (이벤트 루프와 분리)
+INGEST_MAX_WORKERS = int(os.getenv("INGEST_MAX_WORKERS", "2"))
+
+# 실행 중 + 대기 중 인제스트 작업 최대 개수 (초과 시 503)
+INGEST_MAX_PENDING = int(os.getenv("INGEST_MAX_PENDING", "8"))
+
+# 보관할 완료/실패 인제스트 작업 수 (초과 시 오래된 작업부터 삭제)
+INGEST_JOB_HISTORY = int(os.getenv("INGEST_JOB_HISTORY", "200"))
+
+# 임베딩 요청 배치 최대 청크 수 / 최대 토큰 수 (추정치 기준)
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "128"))
+EMBED_MAX_BATCH_TOKENS = int(os.getenv("EMBED_MAX_BATCH_TOKENS", "100000"))
+
+# 스트리밍 인제스트 시 한 번에 임베딩/인덱싱할 최대 청크 수
+# (첫 묶음은 EMBED_BATCH_SIZE 로 시작해 두 배씩 늘림 → 첫 페이지가 빨리 검색 가능)
+INGEST_MAX_FLUSH_CHUNKS = int(os.getenv("INGEST_MAX_FLUSH_CHUNKS", "1024"))
+
+# 동시에 진행할 임베딩 요청 수 상한 (429 발생 시 자동으로 줄였다가 다시 늘림)
+EMBED_MAX_IN_FLIGHT = int(os.getenv("EMBED_MAX_IN_FLIGHT", "4"))
+
+# 429/5xx 재시도 횟수 및 기본 대기 시간 (초, 지수 백오프)
+EMBED_MAX_RETRIES = int(os.getenv("EMBED_MAX_RETRIES", "6"))
+EMBED_BACKOFF_BASE = float(os.getenv("EMBED_BACKOFF_BASE", "1.0"))
+
+# 이벤트 루프 지연 측정 주기 (초) 및 통계 보관 샘플 수
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", "0.1"))
+LOOP_LAG_WINDOW = int(os.getenv("LOOP_LAG_WINDOW", "600"))
+
+# ============================================
+# 운영 서버 실행 설정 (python -m app.server)
+# ============================================
+
+# 바인딩 주소 / 포트 / listen backlog
+SERVER_HOST = os.getenv("SERVER_HOST", "0.0.0.0")
+SERVER_PORT = int(os.getenv("SERVER_PORT", "8000"))
+SERVER_BACKLOG = int(os.getenv("SERVER_BACKLOG", "2048"))
+
+# 워커 프로세스 수 (0 이면 CPU 코어 수)
+# 2 이상이면 HISTORY_BACKEND 와 RAG_SESSION_CATALOG 를 워커 간 공유 저장소로 설정해야 세션이 이어집니다
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", "1"))
+
+# 이벤트 루프 ("auto", "uvloop", "asyncio") / HTTP 파서 ("auto", "httptools", "h11")
+# "auto" 면 uvloop / httptools 가 설치되어 있을 때 사용
+SERVER_LOOP = os.getenv("SERVER_LOOP", "auto")
+SERVER_HTTP = os.getenv("SERVER_HTTP", "auto")
+
+# fork 전에 무거운 라이브러리를 마스터에서 미리 import (워커들이 copy-on-write 로 공유)
+SERVER_PRELOAD = os.getenv("SERVER_PRELOAD", "true").lower() == "true"
+
+# 종료 시 진행 중인 요청 (SSE 스트림 포함) 을 기다리는 최대 시간 (초)
+SERVER_GRACEFUL_TIMEOUT = float(os.getenv("SERVER_GRACEFUL_TIMEOUT", "30"))
+
+# keep-alive 유휴 연결 유지 시간 (초)
+SERVER_KEEPALIVE_TIMEOUT = int(os.getenv("SERVER_KEEPALIVE_TIMEOUT", "5"))
+
+# 로그 레벨 / access log 출력 여부
+SERVER_LOG_LEVEL = os.getenv("SERVER_LOG_LEVEL", "info")
+SERVER_ACCESS_LOG = os.getenv("SERVER_ACCESS_LOG", "true").lower() == "true"
+
 # ============================================
 # 경로 설정
 # ============================================
 
-CACHE_DIR = ".cache"
+CACHE_DIR = os.getenv("CACHE_DIR", ".cache")
 FILES_DIR = os.path.join(CACHE_DIR, "files")
 EMBEDDINGS_DIR = os.path.join(CACHE_DIR, "embeddings")
+INDEXES_DIR = os.path.join(CACHE_DIR, "indexes")
+RESPONSE_CACHE_PATH = os.path.join(CACHE_DIR, "responses.sqlite3")
+RAG_SESSION_CATALOG_PATH = os.path.join(CACHE_DIR, "rag_sessions.sqlite3")
+HISTORY_SQLITE_PATH = os.getenv("HISTORY_SQLITE_PATH", os.path.join(CACHE_DIR, "history.sqlite3"))
 
 PROMPTS_DIR = "/prompts"
 CHATBOT_PROMPTS_DIR = os.path.join(PROMPTS_DIR, "chatbot")
 RAG_PROMPTS_DIR = os.path.join(PROMPTS_DIR, "rag")
+RAG_PIPELINES_DIR = os.path.join(RAG_PROMPTS_DIR, "pipelines")
+DEFAULT_RAG_PIPELINE = "prompts/rag/pipelines/01-rewrite-hybrid.yaml"
 
 # ============================================
 # API 설정
@@ -0,0 +1,467 @@
+# ============================================
+# Document Index - 점진적으로 채워지는 문서 벡터 인덱스
+# ============================================
+
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import faiss
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+from langchain_community.vectorstores import FAISS
+
+from app.config import RAG_RETRIEVAL_MODE, RAG_TOP_K, RAG_FETCH_K, RAG_RRF_K, RAG_INDEX_TYPE
+from app.index_store import MappedDocstore, index_exists, load_index, load_lexical_index, save_index
+from app.lexical_index import BM25Index, CorpusStats, MappedBM25Index, reciprocal_rank_fusion
+from app.vector_index import build_index, choose_index_type, detect_index_type, index_nbytes
+
+# docstore 청크 1개의 본문 외 메모리 (Document + 메타데이터 + id 매핑, tracemalloc 실측 약 810B)
+_DOCUMENT_OVERHEAD_BYTES = 800
+
+
+class DocumentIndex:
+    """
+    인제스트 중에도 검색 가능한 FAISS 벡터스토어 + BM25 역색인
+
+    인제스트 스레드가 임베딩 배치를 추가하는 동안 질의 스레드가 검색할 수 있도록
+    FAISS 인덱스/docstore 접근을 lock 으로 보호하고, 인덱싱 진행 상태를 함께 보관합니다.
+    BM25 문서 id 는 FAISS 인덱스 내 위치와 같습니다.
+
+    인덱싱이 끝난 인덱스는 spill() 로 메모리에서 내리고 (디스크 인덱스만 유지)
+    reload() 로 다시 올릴 수 있습니다. 내려간 동안에도 상태 조회는 가능하지만
+    검색하려면 먼저 reload() 해야 합니다 (IndexMemoryCache 가 관리).
+
+    디스크에서 연 인덱스 (mapped) 는 벡터/청크/BM25 배열을 memory-map 으로 읽기 전용
+    사용하므로, 같은 인덱스를 연 워커 프로세스들이 물리 메모리 한 벌을 공유합니다.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        vectorstore: Optional[FAISS] = None,
+        lexical: Optional[BM25Index] = None,
+    ):
+        self.embeddings = embeddings
+        self.vectorstore = vectorstore
+        self.index_key: Optional[str] = None
+        self.lexical = lexical or BM25Index()
+        self.total_pages: Optional[int] = None
+        self.indexed_pages = 0
+        self.complete = vectorstore is not None
+        self._lock = threading.RLock()
+        # 위치별 페이지 번호 (0부터) 및 페이지 범위별 bitmap 캐시
+        self._pages: List[int] = []
+        self._pages_array: Optional[np.ndarray] = None
+        self._page_masks: Dict[Tuple[Optional[int], Optional[int]], np.ndarray] = {}
+        # 메모리에서 내린 동안 보관하는 상태 (chunk 수, 인덱스 종류, 벡터 바이트, 거리 방향)
+        self._spilled: Optional[dict] = None
+        # 벡터 인덱스가 디스크 파일에 mapping 되어 있는지 (compress 로 재구성되면 False)
+        self._index_mapped = False
+        if vectorstore is not None:
+            self._pages = self._pages_from_docstore()
+
+    @property
+    def chunk_count(self) -> int:
+        with self._lock:
+            if self._spilled is not None:
+                return self._spilled["chunk_count"]
+            return self.vectorstore.index.ntotal if self.vectorstore is not None else 0
+
+    @property
+    def resident(self) -> bool:
+        """검색 데이터가 메모리에 올라와 있는지 여부"""
+        with self._lock:
+            return self._spilled is None
+
+    @property
+    def mapped(self) -> bool:
+        """청크 데이터를 디스크 파일에서 memory-map 으로 읽는지 여부"""
+        with self._lock:
+            return self.vectorstore is not None and isinstance(self.vectorstore.docstore, MappedDocstore)
+
+    def set_vectorstore(
+        self,
+        vectorstore: FAISS,
+        lexical: Optional[BM25Index] = None,
+        index_mapped: bool = False,
+    ) -> None:
+        """
+        저장된 인덱스 연결 (BM25 역색인이 없으면 docstore 텍스트로 재구성)
+
+        index_mapped 는 load_index 가 벡터 인덱스를 실제로 memory-map 했는지 여부이며,
+        nbytes() 가 메모리 예산에서 벡터 크기를 제외할지 결정합니다.
+        """
+        with self._lock:
+            self.vectorstore = vectorstore
+            self._index_mapped = index_mapped
+            if lexical is None:
+                lexical = BM25Index.from_texts(
+                    [self._document_at(i).page_content for i in range(vectorstore.index.ntotal)]
+                )
+            self.lexical = lexical
+            self._pages = self._pages_from_docstore()
+            self._invalidate_masks()
+
+    def _pages_from_docstore(self):
+        # 호출자가 self._lock 보유
+        docstore = self.vectorstore.docstore
+        if isinstance(docstore, MappedDocstore):
+            return docstore.pages
+        return [
+            int(self._document_at(i).metadata.get("page", 0))
+            for i in range(self.vectorstore.index.ntotal)
+        ]
+
+    def _invalidate_masks(self) -> None:
+        # 호출자가 self._lock 보유
+        self._pages_array = None
+        self._page_masks.clear()
+
+    def add_embedded(
+        self,
+        texts: List[str],
+        vectors: List[List[float]],
+        metadatas: List[dict],
+        indexed_pages: Optional[int] = None,
+    ) -> None:
+        """
+        임베딩이 끝난 청크를 인덱스에 추가
+
+        Args:
+            texts: 청크 텍스트
+            vectors: 청크 임베딩
+            metadatas: 청크 메타데이터
+            indexed_pages: 추가 후 인덱싱이 끝난 페이지 수
+        """
+        with self._lock:
+            if texts:
+                if self.vectorstore is None:
+                    self.vectorstore = FAISS.from_embeddings(
+                        text_embeddings=list(zip(texts, vectors)),
+                        embedding=self.embeddings,
+                        metadatas=metadatas,
+                    )
+                else:
+                    self.vectorstore.add_embeddings(
+                        text_embeddings=list(zip(texts, vectors)),
+                        metadatas=metadatas,
+                    )
+                self.lexical.add(texts)
+                self._pages.extend(int(m.get("page", 0)) for m in metadatas)
+                self._invalidate_masks()
+            if indexed_pages is not None:
+                self.indexed_pages = indexed_pages
+
+    def mark_complete(self) -> None:
+        with self._lock:
+            self.complete = True
+            if self.total_pages is None:
+                self.total_pages = self._total_pages_from_metadata()
+            self.indexed_pages = self.total_pages
+
+    def compress(self, index_type: str = RAG_INDEX_TYPE) -> str:
+        """
+        인제스트가 끝난 flat 인덱스를 지정한 종류로 압축
+
+        인제스트 중에는 학습이 필요 없는 flat 인덱스로 바로 검색 가능하게 두고,
+        전체 청크 수가 정해진 뒤 sq8 / ivfpq 로 재구성합니다. 학습은 lock 밖에서
+        수행하므로 압축 중에도 기존 인덱스로 검색할 수 있습니다.
+
+        Args:
+            index_type: INDEX_TYPES 중 하나 ("auto" 면 청크 수로 선택)
+
+        Returns:
+            str: 적용된 인덱스 종류
+        """
+        with self._lock:
+            if self.vectorstore is None:
+                return "flat"
+            flat = self.vectorstore.index
+            current = detect_index_type(flat)
+            target = choose_index_type(flat.ntotal, index_type)
+            if current != "flat" or target == "flat":
+                return current
+            count = flat.ntotal
+            vectors = flat.reconstruct_n(0, count)
+
+        compressed = build_index(vectors, target, flat.metric_type)
+
+        with self._lock:
+            # 압축 중 추가된 벡터가 있으면 이어서 추가
+            if flat.ntotal > count:
+                compressed.add(flat.reconstruct_n(count, flat.ntotal - count))
+            self.vectorstore.index = compressed
+            self._index_mapped = False
+        return target
+
+    def nbytes(self) -> int:
+        """
+        프로세스 메모리에 올라와 있는 검색 데이터 크기 근사치
+
+        벡터 인덱스 + docstore 청크 본문/메타데이터 + BM25 역색인의 합이며,
+        memory-map 된 부분 (mapped_nbytes, 워커 간 공유되는 페이지 캐시) 은 제외합니다.
+        """
+        with self._lock:
+            if self.vectorstore is None or self._spilled is not None:
+                return 0
+            docstore = self.vectorstore.docstore
+            if isinstance(docstore, MappedDocstore):
+                texts = 0
+            else:
+                texts = sum(
+                    len(doc.page_content.encode("utf-8")) + _DOCUMENT_OVERHEAD_BYTES
+                    for doc in docstore._dict.values()
+                )
+            vectors = 0 if self._index_mapped else index_nbytes(self.vectorstore.index)
+            return vectors + texts + self.lexical.nbytes()
+
+    def mapped_nbytes(self) -> int:
+        """memory-map 으로 읽는 디스크 파일 크기 (워커 간 공유)"""
+        with self._lock:
+            if self.vectorstore is None or self._spilled is not None:
+                return 0
+            total = 0
+            docstore = self.vectorstore.docstore
+            if isinstance(docstore, MappedDocstore):
+                total += docstore.mapped_nbytes()
+            if isinstance(self.lexical, MappedBM25Index):
+                total += self.lexical.mapped_nbytes()
+            if self._index_mapped:
+                total += index_nbytes(self.vectorstore.index)
+            return total
+
+    def spill(self) -> bool:
+        """
+        검색 데이터를 메모리에서 내림 (인덱싱이 끝난 인덱스만, 디스크에 없으면 먼저 저장)
+
+        Returns:
+            bool: 내렸으면 True
+        """
+        with self._lock:
+            if not self.complete or self.index_key is None or self.vectorstore is None:
+                return False
+            if self._spilled is not None:
+                return False
+            if not index_exists(self.index_key):
+                save_index(self.index_key, self.vectorstore, self.lexical)
+            index = self.vectorstore.index
+            self._spilled = {
+                "chunk_count": index.ntotal,
+                "index_type": detect_index_type(index),
+                "vector_bytes": index_nbytes(index),
+                "lower_distance_is_better": index.metric_type != faiss.METRIC_INNER_PRODUCT,
+            }
+            self.vectorstore = None
+            self.lexical = BM25Index()
+            self._invalidate_masks()
+            return True
+
+    def remap(self) -> bool:
+        """
+        저장된 디스크 인덱스를 memory-map 으로 다시 열어 인제스트 중 만든 메모리 사본 해제
+
+        Returns:
+            bool: 교체했으면 True
+        """
+        with self._lock:
+            if self._spilled is not None or self.index_key is None or self.mapped:
+                return False
+            loaded = load_index(self.index_key, self.embeddings)
+            if loaded is None:
+                return False
+            vectorstore, index_mapped = loaded
+            self.set_vectorstore(vectorstore, load_lexical_index(self.index_key), index_mapped)
+            return True
+
+    def reload(self) -> bool:
+        """
+        spill() 로 내린 검색 데이터를 디스크에서 다시 로드
+
+        Returns:
+            bool: 로드했으면 True (이미 메모리에 있으면 False)
+        """
+        with self._lock:
+            if self._spilled is None:
+                return False
+            loaded = load_index(self.index_key, self.embeddings)
+            if loaded is None:
+                raise FileNotFoundError(f"Spilled index '{self.index_key}' is missing on disk")
+            vectorstore, index_mapped = loaded
+            self._spilled = None
+            self.set_vectorstore(vectorstore, load_lexical_index(self.index_key), index_mapped)
+            return True
+
+    def _total_pages_from_metadata(self) -> int:
+        # 저장된 인덱스를 로드한 경우 청크 메타데이터에서 페이지 수 복원
+        if self.vectorstore is None:
+            return self.indexed_pages
+        docstore = self.vectorstore.docstore
+        if isinstance(docstore, MappedDocstore):
+            return docstore.total_pages or self.indexed_pages
+        for doc in docstore._dict.values():
+            if "total_pages" in doc.metadata:
+                return doc.metadata["total_pages"]
+        return self.indexed_pages
+
+    def _document_at(self, position: int) -> Document:
+        # 호출자가 self._lock 보유
+        doc_id = self.vectorstore.index_to_docstore_id[position]
+        return self.vectorstore.docstore.search(doc_id)
+
+    def documents_at(self, positions: List[int]) -> List[Document]:
+        with self._lock:
+            return [self._document_at(p) for p in positions]
+
+    @property
+    def lower_distance_is_better(self) -> bool:
+        with self._lock:
+            if self._spilled is not None:
+                return self._spilled["lower_distance_is_better"]
+            return self.vectorstore is None or self.vectorstore.index.metric_type != faiss.METRIC_INNER_PRODUCT
+
+    def page_mask(self, page_start: Optional[int] = None, page_end: Optional[int] = None) -> np.ndarray:
+        """
+        페이지 범위에 속한 청크 위치 bitmap (bool 배열, 청크 추가 전까지 캐시)
+
+        Args:
+            page_start: 시작 페이지 (0부터, 포함, None 이면 처음부터)
+            page_end: 끝 페이지 (0부터, 포함, None 이면 끝까지)
+        """
+        key = (page_start, page_end)
+        with self._lock:
+            mask = self._page_masks.get(key)
+            if mask is None:
+                if self._pages_array is None:
+                    self._pages_array = np.asarray(self._pages, dtype=np.int32)
+                mask = np.ones(len(self._pages_array), dtype=bool)
+                if page_start is not None:
+                    mask &= self._pages_array >= page_start
+                if page_end is not None:
+                    mask &= self._pages_array <= page_end
+                self._page_masks[key] = mask
+            return mask
+
+    def _search_params(self, mask: Optional[np.ndarray]) -> Optional[faiss.SearchParameters]:
+        # 호출자가 self._lock 보유
+        if mask is None:
+            return None
+        index = self.vectorstore.index
+        # mask 는 lock 밖에서 만들어질 수 있으므로 그 사이 추가된 청크는 제외 (BM25 와 동일)
+        keep = np.zeros(index.ntotal, dtype=bool)
+        keep[: min(len(mask), index.ntotal)] = mask[: index.ntotal]
+        bitmap = np.packbits(keep, bitorder="little")
+        # IDSelectorBitmap 은 bitmap 크기를 bytes 로 받음
+        selector = faiss.IDSelectorBitmap(len(bitmap), faiss.swig_ptr(bitmap))
+        # selector 가 bitmap 메모리를 참조하므로 검색이 끝날 때까지 유지
+        selector.bitmap_array = bitmap
+        if isinstance(index, faiss.IndexIVF):
+            return faiss.SearchParametersIVF(sel=selector, nprobe=index.nprobe)
+        return faiss.SearchParameters(sel=selector)
+
+    def dense_search(
+        self,
+        embedding: List[float],
+        k: int,
+        mask: Optional[np.ndarray] = None,
+    ) -> Tuple[List[float], List[int]]:
+        """
+        벡터 검색 (mask 가 주어지면 해당 위치만 검색)
+
+        Returns:
+            (거리, 위치) 리스트 - 거리 순으로 정렬
+        """
+        with self._lock:
+            if self.vectorstore is None or k <= 0:
+                return [], []
+            query = np.asarray([embedding], dtype=np.float32)
+            if self.vectorstore._normalize_L2:
+                query /= np.linalg.norm(query, axis=1, keepdims=True)
+            params = self._search_params(mask)
+            k = min(k, self.vectorstore.index.ntotal)
+            distances, positions = self.vectorstore.index.search(query, k, params=params)
+            hits = [(float(d), int(p)) for d, p in zip(distances[0], positions[0]) if p >= 0]
+            return [d for d, _ in hits], [p for _, p in hits]
+
+    def lexical_scores(self, query: str, corpus: Optional[CorpusStats] = None) -> np.ndarray:
+        """BM25 점수 (위치 순서, corpus 통계 기준)"""
+        return self.lexical.scores(query, corpus)
+
+    def similarity_search(
+        self,
+        query: str,
+        k: int = RAG_TOP_K,
+        mode: str = RAG_RETRIEVAL_MODE,
+        mask: Optional[np.ndarray] = None,
+    ) -> List[Document]:
+        """
+        질의 검색 (질의 임베딩은 lock 밖에서 계산)
+
+        Args:
+            query: 질의
+            k: 반환할 청크 수
+            mode: "hybrid" (BM25 + 벡터 RRF 융합) 또는 "dense"
+            mask: 검색 대상 청크 위치 bitmap (page_mask)
+
+        Returns:
+            list[Document]: 상위 k 개 청크
+        """
+        if self.chunk_count == 0:
+            return []
+        embedding = self.embeddings.embed_query(query)
+
+        with self._lock:
+            if mode != "hybrid":
+                _, positions = self.dense_search(embedding, k, mask)
+                return [self._document_at(p) for p in positions]
+
+            fetch_k = max(k, RAG_FETCH_K)
+            _, dense = self.dense_search(embedding, fetch_k, mask)
+            positions = reciprocal_rank_fusion(
+                [dense, self.lexical.search(query, fetch_k, mask)],
+                k=k,
+                rrf_k=RAG_RRF_K,
+            )
+            return [self._document_at(p) for p in positions]
+
+    def status(self) -> dict:
+        """
+        인덱싱 진행 상태
+        """
+        with self._lock:
+            if self._spilled is not None:
+                index_type = self._spilled["index_type"]
+                vector_bytes = self._spilled["vector_bytes"]
+            elif self.vectorstore is not None:
+                index_type = detect_index_type(self.vectorstore.index)
+                vector_bytes = index_nbytes(self.vectorstore.index)
+            else:
+                index_type, vector_bytes = None, 0
+            return {
+                "complete": self.complete,
+                "indexed_pages": self.indexed_pages,
+                "total_pages": self.total_pages,
+                "indexed_chunks": self.chunk_count,
+                "index_type": index_type,
+                "vector_bytes": vector_bytes,
+                "resident": self._spilled is None,
+                "mapped": self.mapped,
+                "mapped_bytes": self.mapped_nbytes(),
+            }
+
+    def as_retriever(self, k: int = RAG_TOP_K) -> "DocumentIndexRetriever":
+        return DocumentIndexRetriever(index=self, k=k)
+
+
+class DocumentIndexRetriever(BaseRetriever):
+    """DocumentIndex 검색기 (인덱싱 중에도 현재까지 추가된 청크에서 검색)"""
+
+    index: Any
+    k: int = RAG_TOP_K
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        return self.index.similarity_search(query, k=self.k)
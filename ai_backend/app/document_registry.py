@@ -0,0 +1,122 @@
+# ============================================
+# Document Registry - 세션 간 공유되는 문서 인덱스
+# ============================================
+
+import threading
+import time
+from typing import Callable, Optional, Tuple
+
+from app.document_index import DocumentIndex
+from app.index_cache import index_cache
+
+
+class DocumentRegistry:
+    """
+    인덱스 키(PDF 내용 해시 + 분할/임베딩 설정) -> 공유 DocumentIndex
+
+    같은 PDF 를 여러 세션이 올려도 인덱스는 하나만 만들고, 각 세션은 참조만
+    보관합니다. 공유 인덱스는 인제스트가 끝난 뒤 읽기 전용으로 사용되며,
+    참조하는 세션이 하나도 없으면 메모리에서 제거됩니다 (디스크 인덱스는 유지되어
+    다시 올리면 임베딩 없이 로드됩니다). 참조 중인 인덱스의 메모리 예산은
+    IndexMemoryCache 가 관리합니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def acquire(
+        self,
+        index_key: str,
+        factory: Callable[[], DocumentIndex],
+    ) -> Tuple[dict, bool]:
+        """
+        공유 인덱스 참조 획득 (없으면 factory 로 생성하여 등록)
+
+        Returns:
+            (entry, created): created 가 True 이면 호출자가 인제스트를 시작해야 함
+        """
+        with self._lock:
+            entry = self._entries.get(index_key)
+            if entry is not None:
+                entry["refs"] += 1
+                self.hits += 1
+                return entry, False
+
+            index = factory()
+            index.index_key = index_key
+            entry = {
+                "index_key": index_key,
+                "index": index,
+                "refs": 1,
+                "job_id": None,
+                "future": None,
+                "created_at": time.time(),
+            }
+            self._entries[index_key] = entry
+            self.misses += 1
+            return entry, True
+
+    def release(self, index_key: Optional[str]) -> None:
+        """
+        참조 반환 (마지막 참조이면 레지스트리에서 제거)
+        """
+        if index_key is None:
+            return
+        with self._lock:
+            entry = self._entries.get(index_key)
+            if entry is None:
+                return
+            entry["refs"] -= 1
+            if entry["refs"] <= 0:
+                del self._entries[index_key]
+                self.evictions += 1
+                index_cache.forget(index_key)
+
+    def discard(self, index_key: str) -> None:
+        """
+        참조 수와 관계없이 제거 (인제스트 실패 시, 다음 업로드가 다시 시도하도록)
+        """
+        with self._lock:
+            self._entries.pop(index_key, None)
+        index_cache.forget(index_key)
+
+    def get(self, index_key: str) -> Optional[dict]:
+        with self._lock:
+            return self._entries.get(index_key)
+
+    def stats(self) -> dict:
+        """
+        공유 문서 수, 참조 수, 중복 제거 횟수 및 문서별 상태
+        """
+        with self._lock:
+            entries = list(self._entries.values())
+            counters = {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+        documents = [
+            {
+                "index_key": entry["index_key"],
+                "refs": entry["refs"],
+                "job_id": entry["job_id"],
+                **entry["index"].status(),
+            }
+            for entry in entries
+        ]
+        return {
+            "documents": len(documents),
+            "references": sum(d["refs"] for d in documents),
+            "vector_bytes": sum(d["vector_bytes"] for d in documents),
+            "mapped_bytes": sum(d["mapped_bytes"] for d in documents),
+            **counters,
+            "entries": documents,
+        }
+
+
+# 프로세스 전체에서 공유하는 문서 레지스트리
+document_registry = DocumentRegistry()
@@ -0,0 +1,225 @@
+# ============================================
+# Embedding Cache - 청크 단위 임베딩 디스크 캐시
+# ============================================
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from app.config import EMBEDDINGS_DIR, EMBEDDING_CACHE_MAX_BYTES, QUERY_EMBEDDING_CACHE_SIZE
+
+# 캐시 파일 확장자 (float32 little-endian 원시 바이트)
+_ENTRY_SUFFIX = ".f32"
+
+# 용량 초과 시 최대 크기의 이 비율까지 정리
+_EVICT_TARGET_RATIO = 0.9
+
+# ============================================
+# 디스크 저장소
+# ============================================
+
+
+class EmbeddingDiskStore:
+    """
+    hash(model, text) -> float32 벡터 파일 저장소
+
+    각 항목은 `<cache_dir>/<hash[:2]>/<hash>.f32` 에 헤더 없이 float32 원시
+    바이트로 저장됩니다. 파일 mtime을 최근 사용 시각으로 사용하여
+    용량 초과 시 가장 오래 사용되지 않은 항목부터 삭제합니다.
+    """
+
+    def __init__(self, cache_dir: str = EMBEDDINGS_DIR, max_bytes: int = EMBEDDING_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total_bytes: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(model: str, text: str) -> str:
+        return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key + _ENTRY_SUFFIX)
+
+    def _iter_entries(self):
+        if not os.path.isdir(self.cache_dir):
+            return
+        for shard in os.scandir(self.cache_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(_ENTRY_SUFFIX):
+                    yield entry
+
+    def _ensure_total(self) -> int:
+        if self._total_bytes is None:
+            self._total_bytes = sum(e.stat().st_size for e in self._iter_entries())
+        return self._total_bytes
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """
+        캐시된 벡터 조회 (hit 시 최근 사용 시각 갱신)
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return np.frombuffer(data, dtype="<f4")
+
+    def put(self, key: str, vector) -> None:
+        """
+        벡터 저장 후 필요 시 용량 정리
+        """
+        data = np.asarray(vector, dtype="<f4").tobytes()
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+
+        with self._lock:
+            total = self._ensure_total()
+            if os.path.exists(path):
+                total -= os.path.getsize(path)
+            os.replace(tmp_path, path)
+            self._total_bytes = total + len(data)
+
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        # 호출자가 self._lock 보유
+        entries = sorted(self._iter_entries(), key=lambda e: e.stat().st_mtime)
+        target = int(self.max_bytes * _EVICT_TARGET_RATIO)
+        for entry in entries:
+            if self._total_bytes <= target:
+                break
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+            except FileNotFoundError:
+                continue
+            self._total_bytes -= size
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "bytes": self._ensure_total(),
+                "max_bytes": self.max_bytes,
+            }
+
+
+_store: Optional[EmbeddingDiskStore] = None
+_store_lock = threading.Lock()
+
+
+def get_embedding_store() -> EmbeddingDiskStore:
+    """
+    프로세스 공용 임베딩 디스크 저장소 조회
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = EmbeddingDiskStore()
+        return _store
+
+
+# ============================================
+# 캐시 적용 Embeddings
+# ============================================
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    청크 임베딩 캐시를 적용한 Embeddings 래퍼
+
+    캐시에 없는 텍스트만 underlying 임베딩 모델로 요청하며,
+    동일 배치 내 중복 텍스트도 한 번만 요청합니다. 질의 임베딩은 최근 것만
+    메모리에 보관하여 같은 질문을 연달아 임베딩하지 않습니다.
+    """
+
+    def __init__(self, underlying: Embeddings, model: str, store: Optional[EmbeddingDiskStore] = None):
+        self.underlying = underlying
+        self.model = model
+        self.store = store or get_embedding_store()
+        self._query_cache: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._query_lock = threading.Lock()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [self.store.make_key(self.model, text) for text in texts]
+        vectors: List[Optional[List[float]]] = [None] * len(texts)
+
+        # 캐시 조회 및 미스 텍스트 수집 (중복 제거)
+        pending = {}
+        for i, key in enumerate(keys):
+            if key in pending:
+                pending[key].append(i)
+                continue
+            cached = self.store.get(key)
+            if cached is not None:
+                vectors[i] = cached.tolist()
+            else:
+                pending[key] = [i]
+
+        if pending:
+            missing_keys = list(pending)
+            missing_texts = [texts[pending[key][0]] for key in missing_keys]
+            embedded = self.underlying.embed_documents(missing_texts)
+
+            for key, vector in zip(missing_keys, embedded):
+                self.store.put(key, vector)
+                for i in pending[key]:
+                    vectors[i] = list(vector)
+
+        return vectors
+
+    def _get_query(self, text: str) -> Optional[List[float]]:
+        with self._query_lock:
+            vector = self._query_cache.get(text)
+            if vector is not None:
+                self._query_cache.move_to_end(text)
+            return vector
+
+    def _put_query(self, text: str, vector: List[float]) -> None:
+        with self._query_lock:
+            self._query_cache[text] = vector
+            self._query_cache.move_to_end(text)
+            while len(self._query_cache) > QUERY_EMBEDDING_CACHE_SIZE:
+                self._query_cache.popitem(last=False)
+
+    def embed_query(self, text: str) -> List[float]:
+        vector = self._get_query(text)
+        if vector is None:
+            vector = self.underlying.embed_query(text)
+            self._put_query(text, vector)
+        return vector
+
+    async def aembed_query(self, text: str) -> List[float]:
+        vector = self._get_query(text)
+        if vector is None:
+            vector = await self.underlying.aembed_query(text)
+            self._put_query(text, vector)
+        return vector
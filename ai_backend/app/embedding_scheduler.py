@@ -0,0 +1,235 @@
+# ============================================
+# Embedding Scheduler - 배치/동시성 제어 임베딩 요청
+# ============================================
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+from app.config import (
+    EMBED_BATCH_SIZE,
+    EMBED_MAX_BATCH_TOKENS,
+    EMBED_MAX_IN_FLIGHT,
+    EMBED_MAX_RETRIES,
+    EMBED_BACKOFF_BASE,
+)
+
+# ============================================
+# 토큰 추정
+# ============================================
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    토큰 수 추정 (UTF-8 바이트 / 3)
+
+    한국어 1글자(3 bytes) ≈ 1 토큰, 영어 약 4글자 ≈ 1 토큰이므로
+    배치 예산 계산에는 약간 보수적인 값이 됩니다.
+    """
+    return max(1, len(text.encode("utf-8")) // 3)
+
+
+def make_batches(
+    texts: List[str],
+    max_batch_size: int = EMBED_BATCH_SIZE,
+    max_batch_tokens: int = EMBED_MAX_BATCH_TOKENS,
+) -> List[List[int]]:
+    """
+    토큰 예산과 개수 제한에 맞춰 텍스트 인덱스를 배치로 묶기
+
+    Returns:
+        list[list[int]]: 입력 순서를 유지한 인덱스 배치 리스트
+    """
+    batches, current, current_tokens = [], [], 0
+    for i, text in enumerate(texts):
+        tokens = estimate_tokens(text)
+        if current and (
+            len(current) >= max_batch_size or current_tokens + tokens > max_batch_tokens
+        ):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(i)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+# ============================================
+# 적응형 동시성 제한 (프로세스 전역)
+# ============================================
+
+
+class _AdaptiveLimiter:
+    """
+    동시 요청 수 제한 (AIMD)
+
+    429 응답을 받으면 허용 동시 요청 수를 절반으로 줄이고,
+    요청이 성공할 때마다 1씩 늘려 max_limit 까지 회복합니다.
+    Provider 의 rate limit 은 API 키 단위이므로 모든 인제스트 작업이 공유합니다.
+    """
+
+    def __init__(self, max_limit: int):
+        self.max_limit = max(1, max_limit)
+        self.limit = self.max_limit
+        self.active = 0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self.active >= self.limit:
+                self._cond.wait()
+            self.active += 1
+
+    def release(self) -> None:
+        with self._cond:
+            self.active -= 1
+            self._cond.notify_all()
+
+    def on_success(self) -> None:
+        with self._cond:
+            if self.limit < self.max_limit:
+                self.limit += 1
+                self._cond.notify_all()
+
+    def on_rate_limited(self) -> None:
+        with self._cond:
+            self.limit = max(1, self.limit // 2)
+
+
+_limiter = _AdaptiveLimiter(EMBED_MAX_IN_FLIGHT)
+_stats_lock = threading.Lock()
+_stats = {
+    "requests": 0,
+    "chunks": 0,
+    "tokens": 0,
+    "rate_limited": 0,
+    "retries": 0,
+    "last_run": None,
+}
+
+
+def get_embedding_scheduler_stats() -> dict:
+    """
+    임베딩 스케줄러 누적 통계 및 마지막 실행 처리량 조회
+    """
+    with _stats_lock:
+        return {
+            **_stats,
+            "in_flight": _limiter.active,
+            "in_flight_limit": _limiter.limit,
+            "max_in_flight": _limiter.max_limit,
+        }
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+# ============================================
+# 스케줄링 Embeddings
+# ============================================
+
+
+class EmbeddingScheduler(Embeddings):
+    """
+    배치/동시성/백오프를 적용한 Embeddings 래퍼
+
+    청크를 토큰 예산 기준 배치로 묶어 여러 배치를 동시에 요청하고,
+    429/5xx 응답은 지수 백오프로 재시도합니다. underlying 임베딩 클라이언트는
+    자체 재시도를 끄고(max_retries=0) 사용하는 것을 전제로 합니다.
+    """
+
+    def __init__(
+        self,
+        underlying: Embeddings,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+    ):
+        self.underlying = underlying
+        self.on_progress = on_progress
+
+    def _call(self, func: Callable, *args):
+        for attempt in range(EMBED_MAX_RETRIES + 1):
+            _limiter.acquire()
+            try:
+                result = func(*args)
+            except Exception as e:
+                error = e
+            else:
+                _limiter.on_success()
+                return result
+            finally:
+                _limiter.release()
+
+            status = _status_code(error)
+            retryable = status == 429 or (status is not None and status >= 500)
+            if not retryable or attempt == EMBED_MAX_RETRIES:
+                raise error
+
+            with _stats_lock:
+                _stats["retries"] += 1
+                if status == 429:
+                    _stats["rate_limited"] += 1
+            if status == 429:
+                _limiter.on_rate_limited()
+
+            # 슬롯을 반환한 상태에서 대기
+            delay = _retry_after(error) or EMBED_BACKOFF_BASE * (2 ** attempt)
+            time.sleep(delay * (0.5 + random.random()))
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+
+        started = time.perf_counter()
+        batches = make_batches(texts)
+        vectors: List[Optional[List[float]]] = [None] * len(texts)
+        done = 0
+        total_tokens = sum(estimate_tokens(t) for t in texts)
+
+        def run(batch: List[int]):
+            return batch, self._call(self.underlying.embed_documents, [texts[i] for i in batch])
+
+        workers = min(len(batches), _limiter.max_limit)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="embed") as pool:
+            for future in as_completed([pool.submit(run, b) for b in batches]):
+                batch, embedded = future.result()
+                for i, vector in zip(batch, embedded):
+                    vectors[i] = vector
+                done += len(batch)
+                if self.on_progress:
+                    self.on_progress(done, len(texts))
+
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        with _stats_lock:
+            _stats["requests"] += len(batches)
+            _stats["chunks"] += len(texts)
+            _stats["tokens"] += total_tokens
+            _stats["last_run"] = {
+                "chunks": len(texts),
+                "batches": len(batches),
+                "tokens": total_tokens,
+                "seconds": elapsed,
+                "chunks_per_s": len(texts) / elapsed,
+                "tokens_per_s": total_tokens / elapsed,
+            }
+
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._call(self.underlying.embed_query, text)
@@ -0,0 +1,614 @@
+# ============================================
+# History Backend - 대화 히스토리 영속 저장소
+# ============================================
+
+import abc
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+
+from app.config import (
+    HISTORY_BACKEND,
+    HISTORY_SQLITE_PATH,
+    HISTORY_REDIS_URL,
+    HISTORY_REDIS_PREFIX,
+    HISTORY_FLUSH_INTERVAL,
+    HISTORY_FLUSH_MAX_BATCH,
+    HISTORY_RETENTION,
+)
+
+HISTORY_BACKENDS = ["memory", "sqlite", "redis"]
+
+# 다른 워커가 먼저 기록하여 메모리 사본이 뒤처진 세션 표시
+_STALE = -1
+
+# load() 전에 이 세션의 대기 작업 기록을 기다리는 최대 시간 (초)
+_LOAD_FLUSH_TIMEOUT = 5.0
+
+# 기록 실패 시 재시도 간격 (초, 실패가 이어지면 두 배씩 늘림)
+_RETRY_MIN_DELAY = 0.5
+_RETRY_MAX_DELAY = 10.0
+
+# 만료된 히스토리 정리 주기 (초, sqlite)
+_PURGE_INTERVAL = 600
+
+
+def _dump(message: BaseMessage) -> str:
+    return json.dumps(message_to_dict(message), ensure_ascii=False)
+
+
+def _load(rows: List[str]) -> List[BaseMessage]:
+    return messages_from_dict([json.loads(row) for row in rows])
+
+
+class HistoryBackend(abc.ABC):
+    """
+    세션 히스토리 영속 저장소 (write-behind)
+
+    WindowedChatHistory 의 변경 작업 (append / fold / clear) 을 큐에 넣기만 하고
+    백그라운드 스레드가 flush_interval 동안 모인 작업을 트랜잭션 (sqlite) 또는
+    파이프라인 (redis) 하나로 기록하므로, 턴마다 추가되는 지연은 큐 삽입뿐입니다.
+
+    히스토리는 세션을 처음 사용할 때 load() 로 읽어 오고, 세션마다 기록할 때마다
+    증가하는 revision 을 기억해 두었다가 is_current() 로 다른 워커가 그 사이에
+    기록했는지 확인합니다 (뒤처졌으면 세션 저장소가 다시 load).
+    """
+
+    backend = ""
+
+    def __init__(
+        self,
+        flush_interval: float = HISTORY_FLUSH_INTERVAL,
+        max_batch: int = HISTORY_FLUSH_MAX_BATCH,
+        retention: float = HISTORY_RETENTION,
+    ):
+        self.flush_interval = flush_interval
+        self.max_batch = max(1, max_batch)
+        self.retention = retention
+        self._cond = threading.Condition()
+        self._queue: "deque[Tuple[str, tuple]]" = deque()
+        # 세션별 아직 기록되지 않은 작업 수
+        self._pending: Dict[str, int] = {}
+        # 세션별 마지막으로 확인한 revision (메모리에 올라와 있는 세션만)
+        self._revisions: Dict[str, int] = {}
+        self._enqueued = 0
+        self._completed = 0
+        self._flush_waiters = 0
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {
+            "batches": 0,
+            "written_ops": 0,
+            "failures": 0,
+            "dropped_ops": 0,
+            "max_batch_ops": 0,
+            "write_ms": 0.0,
+            "loads": 0,
+            "load_ms": 0.0,
+            "stale_reloads": 0,
+        }
+
+    # ----------------------------------------
+    # 저장소별 구현
+    # ----------------------------------------
+
+    @abc.abstractmethod
+    def _write(self, batch: List[Tuple[str, tuple]]) -> List[Tuple[str, Optional[int], int]]:
+        """
+        작업 묶음 기록
+
+        Returns:
+            list[(session_id, 이전 revision, 새 revision)]: 기록 순서대로.
+            이전 revision 이 None 이면 (삭제) 비교 없이 새 값으로 설정
+        """
+
+    @abc.abstractmethod
+    def _read(self, session_id: str) -> Optional[dict]:
+        """{"summary", "base", "messages" (직렬화된 문자열), "revision"} 또는 None"""
+
+    @abc.abstractmethod
+    def _read_revision(self, session_id: str) -> Optional[int]:
+        """저장된 revision 또는 None (저장된 적 없음)"""
+
+    def _close(self) -> None:
+        pass
+
+    # ----------------------------------------
+    # 쓰기 큐
+    # ----------------------------------------
+
+    def enqueue(self, session_id: str, op: tuple) -> None:
+        """변경 작업 추가 (히스토리 lock 안에서 호출되므로 블로킹하지 않음)"""
+        with self._cond:
+            if self._closed:
+                self._stats["dropped_ops"] += 1
+                return
+            self._queue.append((session_id, op))
+            self._pending[session_id] = self._pending.get(session_id, 0) + 1
+            self._enqueued += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+                self._thread.start()
+            if len(self._queue) == 1 or len(self._queue) >= self.max_batch:
+                self._cond.notify_all()
+
+    def delete(self, session_id: str) -> None:
+        """저장된 히스토리 삭제 예약"""
+        self.enqueue(session_id, ("clear",))
+
+    @staticmethod
+    def _coalesce(batch: List[Tuple[str, tuple]]) -> List[Tuple[str, tuple]]:
+        # fold 는 절대 위치 기준이라 같은 세션의 마지막 fold 만 기록해도 결과가 같음
+        # (사이에 clear 가 있으면 그 앞의 fold 는 유지)
+        result = []
+        later_fold = set()
+        for session_id, op in reversed(batch):
+            if op[0] == "fold":
+                if session_id in later_fold:
+                    continue
+                later_fold.add(session_id)
+            elif op[0] == "clear":
+                later_fold.discard(session_id)
+            result.append((session_id, op))
+        result.reverse()
+        return result
+
+    def _take_batch(self) -> Optional[List[Tuple[str, tuple]]]:
+        with self._cond:
+            while not self._queue and not self._closed:
+                self._cond.wait()
+            if not self._queue:
+                return None
+            # 첫 작업 이후 flush_interval 동안 더 모아서 한 번에 기록
+            deadline = time.monotonic() + self.flush_interval
+            while len(self._queue) < self.max_batch and not self._closed and not self._flush_waiters:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            count = min(len(self._queue), self.max_batch)
+            return [self._queue.popleft() for _ in range(count)]
+
+    def _run(self) -> None:
+        backoff = _RETRY_MIN_DELAY
+        while True:
+            batch = self._take_batch()
+            if batch is None:
+                return
+            start = time.perf_counter()
+            try:
+                results = self._write(self._coalesce(batch))
+                backoff = _RETRY_MIN_DELAY
+            except Exception as e:
+                print(f"[WARN] history write failed ({len(batch)} ops), retry in {backoff:.1f}s: {e}")
+                with self._cond:
+                    self._stats["failures"] += 1
+                    closed = self._closed
+                    if not closed:
+                        # 순서를 유지한 채 되돌려 두고 잠시 뒤 다시 시도
+                        self._queue.extendleft(reversed(batch))
+                if not closed:
+                    time.sleep(backoff)
+                    backoff = min(backoff * 2, _RETRY_MAX_DELAY)
+                    continue
+                with self._cond:
+                    self._stats["dropped_ops"] += len(batch)
+                results = []
+            elapsed_ms = (time.perf_counter() - start) * 1000
+
+            with self._cond:
+                for session_id, _ in batch:
+                    remaining = self._pending.get(session_id, 0) - 1
+                    if remaining > 0:
+                        self._pending[session_id] = remaining
+                    else:
+                        self._pending.pop(session_id, None)
+                for session_id, prev, new in results:
+                    known = self._revisions.get(session_id)
+                    if known is None:
+                        continue
+                    # 직전에 확인한 revision 에서 이어서 기록했으면 메모리 사본이 최신
+                    self._revisions[session_id] = new if prev is None or prev == known else _STALE
+                self._completed += len(batch)
+                self._stats["batches"] += 1
+                self._stats["written_ops"] += len(batch)
+                self._stats["max_batch_ops"] = max(self._stats["max_batch_ops"], len(batch))
+                self._stats["write_ms"] += elapsed_ms
+                self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        지금까지 추가된 작업이 모두 기록될 때까지 대기
+
+        Returns:
+            bool: 시간 안에 기록이 끝났는지 여부
+        """
+        with self._cond:
+            target = self._enqueued
+            if self._completed >= target:
+                return True
+            self._flush_waiters += 1
+            self._cond.notify_all()
+            try:
+                return self._cond.wait_for(lambda: self._completed >= target, timeout)
+            finally:
+                self._flush_waiters -= 1
+
+    def has_pending(self, session_id: str) -> bool:
+        with self._cond:
+            return session_id in self._pending
+
+    # ----------------------------------------
+    # 읽기
+    # ----------------------------------------
+
+    def load(self, session_id: str) -> Optional[dict]:
+        """
+        저장된 히스토리 읽기 (이 세션의 기록 대기 작업이 있으면 먼저 기록)
+
+        Returns:
+            dict: {"summary", "base", "messages"} 또는 None (저장된 적 없음)
+        """
+        if self.has_pending(session_id):
+            self.flush(_LOAD_FLUSH_TIMEOUT)
+        start = time.perf_counter()
+        state = self._read(session_id)
+        with self._cond:
+            self._revisions[session_id] = state["revision"] if state else 0
+            self._stats["loads"] += 1
+            self._stats["load_ms"] += (time.perf_counter() - start) * 1000
+        if state is None:
+            return None
+        return {
+            "summary": state["summary"],
+            "base": state["base"],
+            "messages": _load(state["messages"]),
+        }
+
+    def is_current(self, session_id: str) -> bool:
+        """
+        메모리 사본이 저장소와 같은지 (다른 워커가 이후에 기록하지 않았는지) 확인
+        """
+        with self._cond:
+            if session_id in self._pending:
+                # 이 워커가 기록할 작업이 남아 있으면 메모리 사본이 더 최신
+                return True
+            known = self._revisions.get(session_id)
+        if known is not None and known != _STALE and (self._read_revision(session_id) or 0) == known:
+            return True
+        with self._cond:
+            self._stats["stale_reloads"] += 1
+        return False
+
+    def exists(self, session_id: str) -> bool:
+        return self.has_pending(session_id) or self._read_revision(session_id) is not None
+
+    def forget(self, session_id: str) -> None:
+        """메모리에서 빠진 세션의 revision 추적 중단 (저장된 히스토리는 유지)"""
+        with self._cond:
+            self._revisions.pop(session_id, None)
+
+    # ----------------------------------------
+    # 종료 / 통계
+    # ----------------------------------------
+
+    def close(self, timeout: float = 10.0) -> None:
+        """남은 작업을 기록한 뒤 종료 (서버 종료 시 호출)"""
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        self._close()
+
+    def stats(self) -> dict:
+        with self._cond:
+            batches = self._stats["batches"]
+            loads = self._stats["loads"]
+            return {
+                "backend": self.backend,
+                "queued_ops": len(self._queue),
+                "pending_sessions": len(self._pending),
+                "tracked_sessions": len(self._revisions),
+                **{k: v for k, v in self._stats.items() if k not in ("write_ms", "load_ms")},
+                "avg_batch_ops": round(self._stats["written_ops"] / batches, 1) if batches else 0.0,
+                "avg_write_ms": round(self._stats["write_ms"] / batches, 2) if batches else 0.0,
+                "avg_load_ms": round(self._stats["load_ms"] / loads, 2) if loads else 0.0,
+            }
+
+
+class SQLiteHistoryBackend(HistoryBackend):
+    """
+    임베디드 SQLite 저장소 (WAL)
+
+    메시지는 세션별 절대 위치 (seq) 를 키로 한 줄씩 추가만 하고, 요약에 접힌
+    메시지는 fold 작업에서 base 이전 seq 를 지웁니다. 같은 파일을 여러 워커가
+    함께 사용할 수 있습니다.
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, path: str = HISTORY_SQLITE_PATH, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " session_id TEXT PRIMARY KEY,"
+            " summary TEXT NOT NULL DEFAULT '',"
+            " base INTEGER NOT NULL DEFAULT 0,"
+            " next_seq INTEGER NOT NULL DEFAULT 0,"
+            " revision INTEGER NOT NULL DEFAULT 0,"
+            " updated_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS messages ("
+            " session_id TEXT NOT NULL,"
+            " seq INTEGER NOT NULL,"
+            " message TEXT NOT NULL,"
+            " PRIMARY KEY (session_id, seq)) WITHOUT ROWID"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions (updated_at)")
+        self._conn.commit()
+        self._last_purge = 0.0
+
+    def _write(self, batch):
+        now = time.time()
+        results = []
+        with self._lock, self._conn:
+            conn = self._conn
+            # 이번 묶음에서 수정한 세션 -> 기록 전 revision
+            touched: Dict[str, int] = {}
+            for session_id, op in batch:
+                kind = op[0]
+                if kind == "clear":
+                    conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+                    conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+                    touched.pop(session_id, None)
+                    results.append((session_id, None, 0))
+                    continue
+                if session_id not in touched:
+                    conn.execute(
+                        "INSERT OR IGNORE INTO sessions (session_id, updated_at) VALUES (?, ?)",
+                        (session_id, now),
+                    )
+                    touched[session_id] = conn.execute(
+                        "SELECT revision FROM sessions WHERE session_id = ?", (session_id,)
+                    ).fetchone()[0]
+                if kind == "append":
+                    next_seq = conn.execute(
+                        "SELECT next_seq FROM sessions WHERE session_id = ?", (session_id,)
+                    ).fetchone()[0]
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO messages (session_id, seq, message) VALUES (?, ?, ?)",
+                        [(session_id, next_seq + i, _dump(m)) for i, m in enumerate(op[1])],
+                    )
+                    conn.execute(
+                        "UPDATE sessions SET next_seq = ? WHERE session_id = ?",
+                        (next_seq + len(op[1]), session_id),
+                    )
+                elif kind == "fold":
+                    _, summary, base = op
+                    # 다른 워커가 이미 더 뒤까지 접었으면 무시
+                    updated = conn.execute(
+                        "UPDATE sessions SET summary = ?, base = ? WHERE session_id = ? AND base <= ?",
+                        (summary, base, session_id, base),
+                    ).rowcount
+                    if updated:
+                        conn.execute(
+                            "DELETE FROM messages WHERE session_id = ? AND seq < ?", (session_id, base)
+                        )
+            for session_id, prev in touched.items():
+                conn.execute(
+                    "UPDATE sessions SET revision = revision + 1, updated_at = ? WHERE session_id = ?",
+                    (now, session_id),
+                )
+                results.append((session_id, prev, prev + 1))
+
+            if self.retention > 0 and now - self._last_purge >= _PURGE_INTERVAL:
+                self._last_purge = now
+                cutoff = now - self.retention
+                conn.execute(
+                    "DELETE FROM messages WHERE session_id IN ("
+                    " SELECT session_id FROM sessions WHERE updated_at < ?)",
+                    (cutoff,),
+                )
+                conn.execute("DELETE FROM sessions WHERE updated_at < ?", (cutoff,))
+        return results
+
+    def _read(self, session_id):
+        with self._lock:
+            # 두 SELECT 가 같은 스냅샷을 보도록 읽기 트랜잭션으로 묶음
+            self._conn.execute("BEGIN")
+            try:
+                row = self._conn.execute(
+                    "SELECT summary, base, revision FROM sessions WHERE session_id = ?", (session_id,)
+                ).fetchone()
+                if row is None:
+                    return None
+                messages = [
+                    r[0] for r in self._conn.execute(
+                        "SELECT message FROM messages WHERE session_id = ? ORDER BY seq", (session_id,)
+                    )
+                ]
+            finally:
+                self._conn.commit()
+        return {"summary": row[0], "base": row[1], "messages": messages, "revision": row[2]}
+
+    def _read_revision(self, session_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT revision FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class RedisHistoryBackend(HistoryBackend):
+    """
+    Redis 저장소
+
+    세션마다 {prefix}{session_id}: 아래 messages (리스트), summary, base, revision 키를
+    사용합니다. append/clear 는 한 묶음을 MULTI 파이프라인 하나로 보내고, 드물게 발생하는
+    fold 는 다른 워커와 겹치지 않도록 base 키를 WATCH 하는 트랜잭션으로 처리합니다.
+    모든 키는 마지막 기록 후 retention 초 뒤 만료됩니다.
+    """
+
+    backend = "redis"
+
+    def __init__(self, url: str = HISTORY_REDIS_URL, prefix: str = HISTORY_REDIS_PREFIX, **kwargs):
+        super().__init__(**kwargs)
+        import redis
+
+        self._redis = redis
+        self.url = url
+        self.prefix = prefix
+        # 응답 형식을 redis-py 버전과 무관하게 RESP2 로 고정
+        self._client = redis.Redis.from_url(url, decode_responses=True, protocol=2)
+
+    def _keys(self, session_id: str) -> Tuple[str, str, str, str]:
+        key = f"{self.prefix}{session_id}:"
+        return key + "messages", key + "summary", key + "base", key + "revision"
+
+    def _touch(self, pipe, session_id: str) -> None:
+        # revision 증가 + 만료 갱신 (revision 은 파이프라인 결과에서 읽음)
+        keys = self._keys(session_id)
+        pipe.incr(keys[3])
+        if self.retention > 0:
+            for key in keys:
+                pipe.expire(key, int(self.retention))
+
+    def _write(self, batch):
+        results = []
+        segment: List[Tuple[str, tuple]] = []
+        for session_id, op in batch:
+            if op[0] == "fold":
+                results.extend(self._write_segment(segment))
+                segment = []
+                results.extend(self._write_fold(session_id, op[1], op[2]))
+            else:
+                segment.append((session_id, op))
+        results.extend(self._write_segment(segment))
+        return results
+
+    def _write_segment(self, segment):
+        if not segment:
+            return []
+        pipe = self._client.pipeline(transaction=True)
+        results = []
+        touched: List[str] = []
+        for session_id, op in segment:
+            keys = self._keys(session_id)
+            if op[0] == "clear":
+                if session_id in touched:
+                    touched.remove(session_id)
+                pipe.delete(*keys)
+                results.append((session_id, None, 0))
+            else:
+                pipe.rpush(keys[0], *[_dump(m) for m in op[1]])
+                if session_id not in touched:
+                    touched.append(session_id)
+        revision_at = {}
+        for session_id in touched:
+            revision_at[session_id] = len(pipe)
+            self._touch(pipe, session_id)
+        replies = pipe.execute()
+        for session_id, position in revision_at.items():
+            new = int(replies[position])
+            results.append((session_id, new - 1, new))
+        return results
+
+    def _write_fold(self, session_id, summary, base):
+        keys = self._keys(session_id)
+        with self._client.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    pipe.watch(keys[2])
+                    current = int(pipe.get(keys[2]) or 0)
+                    if base < current:
+                        # 다른 워커가 이미 더 뒤까지 접음
+                        pipe.unwatch()
+                        return []
+                    pipe.multi()
+                    if base > current:
+                        pipe.ltrim(keys[0], base - current, -1)
+                    pipe.set(keys[1], summary)
+                    pipe.set(keys[2], base)
+                    position = len(pipe)
+                    self._touch(pipe, session_id)
+                    new = int(pipe.execute()[position])
+                    return [(session_id, new - 1, new)]
+                except self._redis.WatchError:
+                    continue
+
+    def _read(self, session_id):
+        keys = self._keys(session_id)
+        pipe = self._client.pipeline(transaction=True)
+        pipe.get(keys[1])
+        pipe.get(keys[2])
+        pipe.lrange(keys[0], 0, -1)
+        pipe.get(keys[3])
+        summary, base, messages, revision = pipe.execute()
+        if revision is None:
+            return None
+        return {
+            "summary": summary or "",
+            "base": int(base or 0),
+            "messages": messages,
+            "revision": int(revision),
+        }
+
+    def _read_revision(self, session_id):
+        revision = self._client.get(self._keys(session_id)[3])
+        return int(revision) if revision is not None else None
+
+    def _close(self):
+        self._client.close()
+
+
+def create_history_backend(backend: str = HISTORY_BACKEND) -> Optional[HistoryBackend]:
+    """
+    설정된 종류의 히스토리 영속 저장소 생성
+
+    Returns:
+        HistoryBackend 또는 None ("memory" 인 경우, 프로세스 메모리에만 보관)
+    """
+    if backend not in HISTORY_BACKENDS:
+        raise ValueError(
+            f"Invalid HISTORY_BACKEND '{backend}'. "
+            f"Choose one of {HISTORY_BACKENDS}"
+        )
+    if backend == "sqlite":
+        return SQLiteHistoryBackend()
+    if backend == "redis":
+        return RedisHistoryBackend()
+    return None
+
+
+# 프로세스 전체에서 공유하는 히스토리 저장소 (memory 인 경우 None)
+history_backend = create_history_backend()
+
+
+def close_history_backend() -> None:
+    """
+    남은 히스토리 기록을 마치고 저장소 연결 종료 (서버 종료 시 요약 실행기 종료 후 호출)
+    """
+    if history_backend is not None:
+        history_backend.close()
@@ -0,0 +1,173 @@
+# ============================================
+# Index Cache - 문서 인덱스 메모리 예산 관리
+# ============================================
+
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Iterable, List
+
+from app.config import RAG_INDEX_MEMORY_BUDGET
+from app.document_index import DocumentIndex
+
+# reload 지연 통계 보관 샘플 수
+_RELOAD_WINDOW = 256
+
+
+class IndexMemoryCache:
+    """
+    인덱싱이 끝난 DocumentIndex 를 메모리 예산 안에서 LRU 로 유지
+
+    메모리에 올라와 있는 인덱스 크기의 합이 max_bytes 를 넘으면 가장 오래 사용되지
+    않은 인덱스부터 spill() 하여 디스크 인덱스만 남기고, 다음 질의에서 acquire() 할 때
+    다시 로드합니다. 검색 중인 인덱스는 acquire() ~ release() 동안 고정되어 내려가지
+    않습니다. 문서 인덱스는 세션 간 공유되므로 세션이 아니라 인덱스 키 단위로 관리합니다.
+    """
+
+    def __init__(self, max_bytes: int = RAG_INDEX_MEMORY_BUDGET):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # index_key -> {"index", "bytes" (메모리에 있을 때 크기), "pins"}
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self._resident_bytes = 0
+        self.spills = 0
+        self.reloads = 0
+        self.spilled_bytes = 0
+        self._reload_ms = deque(maxlen=_RELOAD_WINDOW)
+
+    def track(self, index: DocumentIndex) -> None:
+        """
+        인덱싱이 끝난 인덱스를 관리 대상에 추가 (이미 있으면 크기만 갱신)
+        """
+        if index.index_key is None or not index.complete:
+            return
+        nbytes = index.nbytes()
+        with self._lock:
+            entry = self._entries.get(index.index_key)
+            if entry is None:
+                entry = {"index": index, "bytes": 0, "pins": 0}
+                self._entries[index.index_key] = entry
+            elif entry["index"] is not index:
+                return
+            if index.resident:
+                self._resident_bytes += nbytes - entry["bytes"]
+                entry["bytes"] = nbytes
+            self._entries.move_to_end(index.index_key)
+            to_spill = self._select_spills()
+        self._spill(to_spill)
+
+    def forget(self, index_key: str) -> None:
+        """관리 대상에서 제거 (문서 레지스트리에서 인덱스가 제거될 때)"""
+        with self._lock:
+            entry = self._entries.pop(index_key, None)
+            if entry is not None and entry["index"].resident:
+                self._resident_bytes -= entry["bytes"]
+
+    def acquire(self, indexes: Iterable[DocumentIndex]) -> List[str]:
+        """
+        검색에 사용할 인덱스 고정 (내려가 있으면 디스크에서 다시 로드, 블로킹)
+
+        Returns:
+            list[str]: 고정한 인덱스 키 (release 에 전달)
+        """
+        pinned, to_reload = [], []
+        with self._lock:
+            for index in indexes:
+                entry = self._entries.get(index.index_key) if index.index_key else None
+                if entry is None or entry["index"] is not index:
+                    continue
+                entry["pins"] += 1
+                self._entries.move_to_end(index.index_key)
+                pinned.append(index.index_key)
+                if not index.resident:
+                    to_reload.append(index)
+
+        for index in to_reload:
+            start = time.perf_counter()
+            if not index.reload():
+                # 다른 요청이 먼저 로드함
+                continue
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            nbytes = index.nbytes()
+            with self._lock:
+                self.reloads += 1
+                self._reload_ms.append(elapsed_ms)
+                entry = self._entries.get(index.index_key)
+                if entry is not None and entry["index"] is index:
+                    entry["bytes"] = nbytes
+                    self._resident_bytes += nbytes
+
+        with self._lock:
+            to_spill = self._select_spills()
+        self._spill(to_spill)
+        return pinned
+
+    def release(self, index_keys: Iterable[str]) -> None:
+        """acquire 로 고정한 인덱스 해제 (예산 초과 상태면 이 시점에 내림)"""
+        with self._lock:
+            for key in index_keys:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry["pins"] = max(0, entry["pins"] - 1)
+            to_spill = self._select_spills()
+        self._spill(to_spill)
+
+    def _select_spills(self) -> List[dict]:
+        # 호출자가 self._lock 보유. 예산 안으로 들어올 때까지 고정되지 않은 LRU 인덱스 선택
+        if self.max_bytes <= 0 or self._resident_bytes <= self.max_bytes:
+            return []
+        selected = []
+        excess = self._resident_bytes - self.max_bytes
+        for entry in self._entries.values():
+            if excess <= 0:
+                break
+            if entry["pins"] or not entry["index"].resident or entry.get("spilling"):
+                continue
+            entry["spilling"] = True
+            selected.append(entry)
+            excess -= entry["bytes"]
+        return selected
+
+    def _spill(self, entries: List[dict]) -> None:
+        for entry in entries:
+            index = entry["index"]
+            # 고정 확인과 spill 을 같은 lock 안에서 수행해야 그 사이에 acquire 한
+            # (메모리에 있다고 보고 reload 하지 않은) 인덱스를 내리지 않음.
+            # 인덱싱이 끝난 인덱스는 이미 디스크에 있으므로 spill 은 참조 해제만 함
+            with self._lock:
+                entry["spilling"] = False
+                # 선택 이후 다른 요청이 고정했으면 건너뜀
+                if entry["pins"]:
+                    continue
+                spilled = index.spill()
+                if spilled and self._entries.get(index.index_key) is entry:
+                    self._resident_bytes -= entry["bytes"]
+                    self.spills += 1
+                    self.spilled_bytes += entry["bytes"]
+
+    def stats(self) -> dict:
+        """
+        메모리에 있는 인덱스 크기, spill/reload 횟수 및 reload 지연 (ms)
+        """
+        with self._lock:
+            entries = list(self._entries.values())
+            reload_ms = sorted(self._reload_ms)
+            resident = [e for e in entries if e["index"].resident]
+            return {
+                "max_bytes": self.max_bytes,
+                "resident_bytes": self._resident_bytes,
+                "indexes": len(entries),
+                "resident": len(resident),
+                "spilled": len(entries) - len(resident),
+                "pinned": sum(1 for e in entries if e["pins"]),
+                "spills": self.spills,
+                "spilled_bytes": self.spilled_bytes,
+                "reloads": self.reloads,
+                "reload_avg_ms": round(sum(reload_ms) / len(reload_ms), 2) if reload_ms else 0.0,
+                "reload_p95_ms": round(reload_ms[min(len(reload_ms) - 1, int(len(reload_ms) * 0.95))], 2) if reload_ms else 0.0,
+                "reload_max_ms": round(reload_ms[-1], 2) if reload_ms else 0.0,
+            }
+
+
+# 프로세스 전체에서 공유하는 문서 인덱스 메모리 캐시
+index_cache = IndexMemoryCache()
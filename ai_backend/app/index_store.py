@@ -0,0 +1,419 @@
+# ============================================
+# Index Store - FAISS 인덱스 디스크 저장/로드
+# ============================================
+
+import hashlib
+import json
+import mmap
+import os
+import pickle
+import shutil
+import threading
+from typing import Any, List, Optional, Tuple
+
+import faiss
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_community.docstore.base import Docstore
+from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
+
+from app.config import INDEXES_DIR
+from app.lexical_index import BM25Index, MappedBM25Index
+from app.vector_index import configure_search
+
+# FAISS.save_local 과 동일한 파일명 사용
+_INDEX_FILE = "index.faiss"
+_DOCSTORE_FILE = "index.pkl"
+_LEXICAL_FILE = "lexical.pkl"
+
+# memory-map 형식 (청크 본문/메타데이터/페이지 + CSR BM25), manifest 가 있으면 이 형식
+_MANIFEST_FILE = "manifest.json"
+_TEXTS_FILE = "texts.bin"
+_TEXT_OFFSETS_FILE = "texts.offsets.npy"
+_METADATA_FILE = "metadata.bin"
+_METADATA_OFFSETS_FILE = "metadata.offsets.npy"
+_PAGES_FILE = "pages.npy"
+_TERMS_FILE = "lexical.terms.json"
+_POSTING_INDPTR_FILE = "lexical.indptr.npy"
+_POSTING_IDS_FILE = "lexical.ids.npy"
+_POSTING_TFS_FILE = "lexical.tfs.npy"
+_DOC_LENGTHS_FILE = "lexical.lengths.npy"
+_FORMAT_VERSION = 2
+
+# flat / sq8 코드를 복사 없이 파일에 직접 mapping (IO_FLAG_MMAP 은 IVF 목록만 mapping)
+_MMAP_FLAT_CODES = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP)
+
+_lock = threading.Lock()
+
+# ============================================
+# 인덱스 키
+# ============================================
+
+
+def compute_index_key(
+    file_path: str,
+    chunk_size: int,
+    chunk_overlap: int,
+    embedding_model: str,
+) -> str:
+    """
+    PDF 내용 해시 + 분할/임베딩 설정으로 인덱스 키 생성
+
+    파일명이 달라도 내용이 같으면 같은 키가 생성되고,
+    청크 설정이나 임베딩 모델이 바뀌면 다른 키가 생성됩니다.
+
+    Args:
+        file_path: PDF 파일 경로
+        chunk_size: 문서 분할 청크 크기
+        chunk_overlap: 청크 간 중복 크기
+        embedding_model: 임베딩 모델명
+
+    Returns:
+        str: sha256 hex 키
+    """
+    h = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(block)
+    return _finish_index_key(h, chunk_size, chunk_overlap, embedding_model)
+
+
+def compute_content_index_key(
+    content: bytes,
+    chunk_size: int,
+    chunk_overlap: int,
+    embedding_model: str,
+) -> str:
+    """
+    메모리에 있는 PDF 내용으로 인덱스 키 생성 (compute_index_key 와 같은 키)
+
+    업로드 요청에서 파일을 디스크에 쓰기 전에 키를 계산할 때 사용합니다.
+
+    Returns:
+        str: sha256 hex 키
+    """
+    return _finish_index_key(hashlib.sha256(content), chunk_size, chunk_overlap, embedding_model)
+
+
+def _finish_index_key(h, chunk_size: int, chunk_overlap: int, embedding_model: str) -> str:
+    h.update(f"\0{chunk_size}\0{chunk_overlap}\0{embedding_model}".encode("utf-8"))
+    return h.hexdigest()
+
+
+def _index_dir(key: str) -> str:
+    return os.path.join(INDEXES_DIR, key)
+
+
+# ============================================
+# memory-map 파일
+# ============================================
+
+
+def _map_array(path: str) -> np.ndarray:
+    """읽기 전용 memory-map 배열 (빈 배열은 mapping 할 수 없으므로 일반 로드)"""
+    try:
+        return np.load(path, mmap_mode="r")
+    except ValueError:
+        return np.load(path)
+
+
+def _map_bytes(path: str):
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _write_blob(data_path: str, offsets_path: str, items: List[bytes]) -> None:
+    offsets = np.zeros(len(items) + 1, dtype=np.int64)
+    with open(data_path, "wb") as f:
+        for i, item in enumerate(items):
+            f.write(item)
+            offsets[i + 1] = offsets[i] + len(item)
+    np.save(offsets_path, offsets)
+
+
+class _PositionIds:
+    """FAISS 위치 -> docstore id (memory-map docstore 는 위치를 그대로 id 로 사용)"""
+
+    def __init__(self, count: int):
+        self._count = count
+
+    def __getitem__(self, position: int) -> int:
+        if not 0 <= position < self._count:
+            raise KeyError(position)
+        return int(position)
+
+    def get(self, position: int, default=None):
+        return int(position) if 0 <= position < self._count else default
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, position) -> bool:
+        return isinstance(position, (int, np.integer)) and 0 <= position < self._count
+
+    def __iter__(self):
+        return iter(range(self._count))
+
+    def keys(self):
+        return range(self._count)
+
+    def values(self):
+        return range(self._count)
+
+    def items(self):
+        return ((i, i) for i in range(self._count))
+
+
+class MappedDocstore(Docstore):
+    """
+    청크 본문/메타데이터를 memory-map 파일에서 필요할 때만 읽는 읽기 전용 docstore
+
+    본문은 UTF-8 을 이어 붙인 파일 + 위치별 offset 배열로 저장되며, search() 는
+    검색 결과로 선택된 청크만 Document 로 만듭니다. 여러 워커 프로세스가 같은 파일을
+    열면 OS 페이지 캐시의 한 벌을 공유합니다.
+    """
+
+    def __init__(self, index_dir: str, manifest: dict):
+        self.total_pages = manifest.get("total_pages")
+        self._texts = _map_bytes(os.path.join(index_dir, _TEXTS_FILE))
+        self._text_offsets = _map_array(os.path.join(index_dir, _TEXT_OFFSETS_FILE))
+        self._metadata = _map_bytes(os.path.join(index_dir, _METADATA_FILE))
+        self._metadata_offsets = _map_array(os.path.join(index_dir, _METADATA_OFFSETS_FILE))
+        self.pages = _map_array(os.path.join(index_dir, _PAGES_FILE))
+
+    def __len__(self) -> int:
+        return len(self._text_offsets) - 1
+
+    def text(self, position: int) -> str:
+        start, end = self._text_offsets[position], self._text_offsets[position + 1]
+        return bytes(self._texts[start:end]).decode("utf-8")
+
+    def search(self, search: Any) -> Document:
+        position = int(search)
+        start, end = self._metadata_offsets[position], self._metadata_offsets[position + 1]
+        metadata = json.loads(bytes(self._metadata[start:end]))
+        return Document(id=str(position), page_content=self.text(position), metadata=metadata)
+
+    def add(self, texts: dict) -> None:
+        raise TypeError("MappedDocstore is read-only")
+
+    def delete(self, ids: List) -> None:
+        raise TypeError("MappedDocstore is read-only")
+
+    def mapped_nbytes(self) -> int:
+        return (
+            len(self._texts) + len(self._metadata)
+            + self._text_offsets.nbytes + self._metadata_offsets.nbytes + self.pages.nbytes
+        )
+
+
+def _write_mapped(index_dir: str, vectorstore: FAISS, lexical: Optional[BM25Index]) -> None:
+    # 청크 본문/메타데이터/페이지 + BM25 CSR 배열 + manifest 기록
+    count = vectorstore.index.ntotal
+    docs = [
+        vectorstore.docstore.search(vectorstore.index_to_docstore_id[i]) for i in range(count)
+    ]
+    _write_blob(
+        os.path.join(index_dir, _TEXTS_FILE),
+        os.path.join(index_dir, _TEXT_OFFSETS_FILE),
+        [doc.page_content.encode("utf-8") for doc in docs],
+    )
+    _write_blob(
+        os.path.join(index_dir, _METADATA_FILE),
+        os.path.join(index_dir, _METADATA_OFFSETS_FILE),
+        [json.dumps(doc.metadata, ensure_ascii=False, default=str).encode("utf-8") for doc in docs],
+    )
+    np.save(
+        os.path.join(index_dir, _PAGES_FILE),
+        np.asarray([int(doc.metadata.get("page", 0)) for doc in docs], dtype=np.int32),
+    )
+
+    if lexical is None or len(lexical) != count:
+        lexical = BM25Index.from_texts([doc.page_content for doc in docs])
+    terms = list(lexical.postings)
+    lengths = [len(lexical.postings[term][0]) for term in terms]
+    indptr = np.zeros(len(terms) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=indptr[1:])
+    ids = np.fromiter(
+        (i for term in terms for i in lexical.postings[term][0]), dtype=np.int32, count=int(indptr[-1])
+    )
+    tfs = np.fromiter(
+        (tf for term in terms for tf in lexical.postings[term][1]), dtype=np.float32, count=int(indptr[-1])
+    )
+    with open(os.path.join(index_dir, _TERMS_FILE), "w", encoding="utf-8") as f:
+        json.dump(terms, f, ensure_ascii=False)
+    np.save(os.path.join(index_dir, _POSTING_INDPTR_FILE), indptr)
+    np.save(os.path.join(index_dir, _POSTING_IDS_FILE), ids)
+    np.save(os.path.join(index_dir, _POSTING_TFS_FILE), tfs)
+    np.save(os.path.join(index_dir, _DOC_LENGTHS_FILE), np.asarray(lexical.doc_lengths, dtype=np.float32))
+
+    total_pages = next((doc.metadata["total_pages"] for doc in docs if "total_pages" in doc.metadata), None)
+    manifest = {
+        "format": _FORMAT_VERSION,
+        "chunks": count,
+        "total_pages": total_pages,
+        "normalize_L2": bool(vectorstore._normalize_L2),
+        "distance_strategy": str(vectorstore.distance_strategy.value),
+    }
+    with open(os.path.join(index_dir, _MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+
+
+# ============================================
+# 저장 / 로드
+# ============================================
+
+
+def index_exists(key: str) -> bool:
+    """
+    저장된 인덱스 존재 여부 확인 (memory-map 형식 또는 이전 pickle 형식)
+    """
+    index_dir = _index_dir(key)
+    return os.path.exists(os.path.join(index_dir, _INDEX_FILE)) and (
+        os.path.exists(os.path.join(index_dir, _MANIFEST_FILE))
+        or os.path.exists(os.path.join(index_dir, _DOCSTORE_FILE))
+    )
+
+
+def save_index(key: str, vectorstore: FAISS, lexical: Optional[BM25Index] = None) -> str:
+    """
+    FAISS 벡터스토어 (및 BM25 역색인) 를 디스크에 저장
+
+    벡터 인덱스는 FAISS 파일로, 청크 본문/메타데이터와 BM25 역색인은 memory-map 으로
+    열 수 있는 배열 파일로 기록합니다 (load_index 참고).
+    임시 디렉토리에 먼저 기록한 뒤 rename 하므로, 저장 중 다른 요청 (또는 다른 워커) 이
+    반쯤 쓰인 인덱스를 읽는 일이 없습니다.
+
+    Args:
+        key: 인덱스 키 (compute_index_key)
+        vectorstore: 저장할 FAISS 벡터스토어
+        lexical: 함께 저장할 BM25 역색인 (선택)
+
+    Returns:
+        str: 저장된 인덱스 디렉토리 경로
+    """
+    index_dir = _index_dir(key)
+    tmp_dir = f"{index_dir}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    os.makedirs(tmp_dir, exist_ok=True)
+    faiss.write_index(vectorstore.index, os.path.join(tmp_dir, _INDEX_FILE))
+    _write_mapped(tmp_dir, vectorstore, lexical)
+
+    with _lock:
+        if index_exists(key):
+            # 동일 내용이 이미 저장되어 있음
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        else:
+            shutil.rmtree(index_dir, ignore_errors=True)
+            try:
+                os.replace(tmp_dir, index_dir)
+            except OSError:
+                # 다른 워커가 같은 인덱스를 먼저 저장함
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                if not index_exists(key):
+                    raise
+
+    return index_dir
+
+
+def _read_faiss_index(path: str) -> Tuple[faiss.Index, bool]:
+    """
+    flat / sq8 은 코드 배열을, IVF 계열은 역색인 목록을 파일에 직접 mapping
+
+    Returns:
+        (index, mapped): mapped 는 벡터 데이터가 실제로 파일에 mapping 되었는지 여부.
+        IO_FLAG_MMAP_IFC 가 없는 faiss 에서는 flat / sq8 코드가 메모리에 복사되고,
+        mmap 읽기에 실패하면 일반 읽기로 전체를 메모리에 올림
+    """
+    try:
+        index = faiss.read_index(path, _MMAP_FLAT_CODES | faiss.IO_FLAG_READ_ONLY)
+        if isinstance(index, faiss.IndexIVF):
+            if _MMAP_FLAT_CODES != faiss.IO_FLAG_MMAP:
+                index = faiss.read_index(path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+            return index, True
+        return index, _MMAP_FLAT_CODES != faiss.IO_FLAG_MMAP
+    except RuntimeError:
+        return faiss.read_index(path), False
+
+
+def load_index(key: str, embeddings: Embeddings) -> Optional[Tuple[FAISS, bool]]:
+    """
+    저장된 FAISS 벡터스토어 로드 (읽기 전용)
+
+    벡터 인덱스와 청크 본문/메타데이터는 memory-map 으로 열어 프로세스 메모리에
+    복사하지 않으므로, 같은 인덱스를 여는 여러 워커가 OS 페이지 캐시의 한 벌을
+    공유합니다. mmap 을 지원하지 않는 인덱스 타입이면 일반 읽기로, 이전 pickle 형식
+    docstore 는 그대로 로드합니다.
+
+    Args:
+        key: 인덱스 키 (compute_index_key)
+        embeddings: 질의 임베딩에 사용할 Embeddings
+
+    Returns:
+        (FAISS, bool) | None: 벡터스토어와 벡터 인덱스가 실제로 memory-map 되었는지 여부
+        (저장된 인덱스가 없으면 None)
+    """
+    if not index_exists(key):
+        return None
+
+    index_dir = _index_dir(key)
+    index_path = os.path.join(index_dir, _INDEX_FILE)
+
+    index, index_mapped = _read_faiss_index(index_path)
+    index = configure_search(index)
+
+    manifest_path = os.path.join(index_dir, _MANIFEST_FILE)
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        vectorstore = FAISS(
+            embedding_function=embeddings,
+            index=index,
+            docstore=MappedDocstore(index_dir, manifest),
+            index_to_docstore_id=_PositionIds(index.ntotal),
+            normalize_L2=manifest.get("normalize_L2", False),
+            distance_strategy=DistanceStrategy(manifest["distance_strategy"]),
+        )
+        return vectorstore, index_mapped
+
+    # 이전 형식. 서버가 직접 저장한 파일만 읽으므로 pickle 로드 허용
+    with open(os.path.join(index_dir, _DOCSTORE_FILE), "rb") as f:
+        docstore, index_to_docstore_id = pickle.load(f)
+
+    vectorstore = FAISS(
+        embedding_function=embeddings,
+        index=index,
+        docstore=docstore,
+        index_to_docstore_id=index_to_docstore_id,
+    )
+    return vectorstore, index_mapped
+
+
+def load_lexical_index(key: str) -> Optional[BM25Index]:
+    """
+    저장된 BM25 역색인 로드 (memory-map 형식이면 읽기 전용 MappedBM25Index)
+
+    Returns:
+        BM25Index | None: 저장되지 않은 경우 None (이전 버전에서 저장된 인덱스)
+    """
+    index_dir = _index_dir(key)
+    if os.path.exists(os.path.join(index_dir, _TERMS_FILE)):
+        with open(os.path.join(index_dir, _TERMS_FILE), encoding="utf-8") as f:
+            terms = json.load(f)
+        return MappedBM25Index(
+            terms,
+            _map_array(os.path.join(index_dir, _POSTING_INDPTR_FILE)),
+            _map_array(os.path.join(index_dir, _POSTING_IDS_FILE)),
+            _map_array(os.path.join(index_dir, _POSTING_TFS_FILE)),
+            _map_array(os.path.join(index_dir, _DOC_LENGTHS_FILE)),
+        )
+
+    path = os.path.join(index_dir, _LEXICAL_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        return pickle.load(f)
@@ -0,0 +1,111 @@
+# ============================================
+# Ingest Executor - 문서 인제스트 전용 실행기
+# ============================================
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from app.config import INGEST_MAX_WORKERS, INGEST_MAX_PENDING
+
+
+class IngestQueueFullError(Exception):
+    """대기 중인 인제스트 작업이 INGEST_MAX_PENDING 을 초과한 경우"""
+
+
+# ============================================
+# 실행기 (프로세스 전역)
+# ============================================
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(INGEST_MAX_PENDING)
+_stats = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0, "in_flight": 0}
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=INGEST_MAX_WORKERS, thread_name_prefix="rag-ingest"
+            )
+        return _executor
+
+
+def _on_done(future) -> None:
+    with _executor_lock:
+        _stats["in_flight"] -= 1
+        if future.cancelled() or future.exception() is not None:
+            _stats["failed"] += 1
+        else:
+            _stats["completed"] += 1
+    _slots.release()
+
+
+def submit_ingest(func: Callable, *args, **kwargs) -> asyncio.Future:
+    """
+    동기 인제스트 함수를 전용 스레드 풀에 제출
+
+    PDF 파싱, 임베딩 요청, FAISS 빌드 등 블로킹 작업이 이벤트 루프를
+    점유하지 않도록 합니다. 한도 초과 여부는 제출 시점에 즉시 판단하며,
+    작업 슬롯은 대기 중인 쪽이 취소되더라도 실제 작업이 끝날 때 반환됩니다.
+
+    Args:
+        func: 실행할 동기 함수
+        *args, **kwargs: 함수 인자
+
+    Returns:
+        asyncio.Future: 실행 중인 이벤트 루프에 연결된 결과 Future
+
+    Raises:
+        IngestQueueFullError: 대기 작업 수가 한도를 초과한 경우
+    """
+    if not _slots.acquire(blocking=False):
+        with _executor_lock:
+            _stats["rejected"] += 1
+        raise IngestQueueFullError(
+            f"Too many pending ingestion jobs (limit: {INGEST_MAX_PENDING})"
+        )
+
+    try:
+        future = _get_executor().submit(functools.partial(func, *args, **kwargs))
+    except BaseException:
+        _slots.release()
+        raise
+
+    with _executor_lock:
+        _stats["submitted"] += 1
+        _stats["in_flight"] += 1
+    future.add_done_callback(_on_done)
+
+    return asyncio.wrap_future(future)
+
+
+def get_ingest_stats() -> dict:
+    """
+    인제스트 실행기 상태 조회
+    """
+    with _executor_lock:
+        return {
+            "max_workers": INGEST_MAX_WORKERS,
+            "max_pending": INGEST_MAX_PENDING,
+            **_stats,
+        }
+
+
+def shutdown_ingest_executor() -> None:
+    """
+    실행기 종료 (서버 종료 시 호출, 진행 중 작업은 완료까지 대기하므로 블로킹)
+
+    이벤트 루프에서는 asyncio.to_thread 로 호출해야 대기 중에도 다른 종료 처리와
+    인제스트 완료 처리가 진행됩니다.
+    """
+    global _executor
+    with _executor_lock:
+        executor = _executor
+        _executor = None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,189 @@
+# ============================================
+# Ingest Jobs - 비동기 인제스트 작업 상태 관리
+# ============================================
+
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, Optional
+
+from app.config import INGEST_JOB_HISTORY
+from app.session_catalog import session_catalog
+
+# 인제스트 단계 (진행 순서)
+INGEST_STAGES = ["pages_parsed", "chunks_split", "chunks_embedded", "index_built"]
+
+# 다른 워커가 조회할 진행률을 SessionCatalog 에 기록하는 최소 간격 (초)
+_PUBLISH_INTERVAL = 0.5
+
+# ============================================
+# 작업 저장소 (메모리 기반, RAG_SESSION_CATALOG=sqlite 면 워커 간 공유 사본 기록)
+# ============================================
+
+job_store: Dict[str, dict] = {}
+_lock = threading.Lock()
+# job_id -> 마지막으로 공유 사본을 기록한 시각
+_published_at: Dict[str, float] = {}
+
+
+def _publish(snapshot: dict, prune: bool = False) -> None:
+    if session_catalog is None:
+        return
+    try:
+        session_catalog.put_job(snapshot)
+        if prune:
+            session_catalog.prune_jobs(INGEST_JOB_HISTORY)
+    except sqlite3.Error as e:
+        # 공유 사본 기록 실패는 이 워커의 작업 진행에 영향 없음
+        print(f"[WARN] ingest job publish failed for {snapshot['job_id']}: {e}")
+
+
+def create_job(session_id: str, filename: str) -> dict:
+    """
+    인제스트 작업 생성
+
+    Args:
+        session_id: 세션 ID
+        filename: 업로드 파일명
+
+    Returns:
+        dict: 작업 정보 (복사본)
+    """
+    job_id = uuid.uuid4().hex
+    job = {
+        "job_id": job_id,
+        "session_id": session_id,
+        "filename": filename,
+        "status": "queued",
+        "stages": {stage: {"done": 0, "total": None} for stage in INGEST_STAGES},
+        "error": None,
+        "created_at": time.time(),
+        "finished_at": None,
+    }
+    with _lock:
+        job_store[job_id] = job
+        _prune()
+        _published_at[job_id] = time.time()
+        snapshot = _snapshot(job)
+    _publish(snapshot)
+    return snapshot
+
+
+def create_completed_job(session_id: str, filename: str) -> dict:
+    """
+    이미 인덱싱이 끝난 문서를 재사용하는 업로드용 완료 상태 작업 생성
+
+    Returns:
+        dict: 작업 정보 (복사본)
+    """
+    now = time.time()
+    job = {
+        "job_id": uuid.uuid4().hex,
+        "session_id": session_id,
+        "filename": filename,
+        "status": "completed",
+        "stages": {stage: {"done": 1, "total": 1} for stage in INGEST_STAGES},
+        "error": None,
+        "created_at": now,
+        "finished_at": now,
+    }
+    with _lock:
+        job_store[job["job_id"]] = job
+        _prune()
+        snapshot = _snapshot(job)
+    _publish(snapshot, prune=True)
+    return snapshot
+
+
+def get_job(job_id: str) -> Optional[dict]:
+    """
+    작업 상태 조회
+
+    Returns:
+        dict | None: 작업 정보 (복사본, 전체 진행률 포함)
+    """
+    with _lock:
+        job = job_store.get(job_id)
+        if job:
+            return _snapshot(job)
+    # 다른 워커에서 실행 중인 작업
+    if session_catalog is not None:
+        try:
+            return session_catalog.get_job(job_id)
+        except sqlite3.Error as e:
+            print(f"[WARN] ingest job lookup failed for {job_id}: {e}")
+    return None
+
+
+def set_job_status(job_id: str, status: str, error: Optional[str] = None) -> None:
+    """
+    작업 상태 변경 (queued / running / completed / failed)
+    """
+    with _lock:
+        job = job_store.get(job_id)
+        if job is None:
+            return
+        job["status"] = status
+        job["error"] = error
+        finished = status in ("completed", "failed")
+        if finished:
+            job["finished_at"] = time.time()
+            _published_at.pop(job_id, None)
+        else:
+            _published_at[job_id] = time.time()
+        snapshot = _snapshot(job)
+    _publish(snapshot, prune=finished)
+
+
+def make_progress_callback(job_id: str):
+    """
+    create_rag_retriever 에 전달할 진행률 콜백 생성
+
+    Returns:
+        Callable[[str, int, Optional[int]], None]: (stage, done, total)
+    """
+
+    def progress(stage: str, done: int, total: Optional[int] = None) -> None:
+        snapshot = None
+        with _lock:
+            job = job_store.get(job_id)
+            if job is None or stage not in job["stages"]:
+                return
+            job["stages"][stage]["done"] = done
+            if total is not None:
+                job["stages"][stage]["total"] = total
+            now = time.time()
+            if session_catalog is not None and now - _published_at.get(job_id, 0.0) >= _PUBLISH_INTERVAL:
+                _published_at[job_id] = now
+                snapshot = _snapshot(job)
+        if snapshot is not None:
+            _publish(snapshot)
+
+    return progress
+
+
+def _snapshot(job: dict) -> dict:
+    snapshot = {**job, "stages": {k: dict(v) for k, v in job["stages"].items()}}
+    snapshot["progress"] = _overall_progress(job)
+    return snapshot
+
+
+def _overall_progress(job: dict) -> float:
+    if job["status"] == "completed":
+        return 1.0
+    fractions = []
+    for stage in job["stages"].values():
+        total = stage["total"]
+        fractions.append(min(1.0, stage["done"] / total) if total else 0.0)
+    return sum(fractions) / len(fractions)
+
+
+def _prune() -> None:
+    # 호출자가 _lock 보유
+    finished = [j for j in job_store.values() if j["finished_at"] is not None]
+    overflow = len(finished) - INGEST_JOB_HISTORY
+    if overflow > 0:
+        finished.sort(key=lambda j: j["finished_at"])
+        for job in finished[:overflow]:
+            del job_store[job["job_id"]]
@@ -0,0 +1,307 @@
+# ============================================
+# Lexical Index - BM25 역색인 (하이브리드 검색용)
+# ============================================
+
+import math
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from app.config import BM25_K1, BM25_B
+
+# 영문/숫자/한글 토큰 (SM-105, v1.2 같은 코드는 하나의 토큰으로 유지)
+_TOKEN_PATTERN = re.compile(r"[0-9a-z가-힣]+(?:[-_./][0-9a-z가-힣]+)*")
+_PART_PATTERN = re.compile(r"[0-9a-z가-힣]+")
+_HANGUL_PATTERN = re.compile(r"^[가-힣]+$")
+
+# 메모리 근사치 계산용 (term 당 키 문자열/딕셔너리/리스트 2개, posting 당 리스트 항목 2개 + int 객체)
+_TERM_OVERHEAD_BYTES = 260
+_POSTING_BYTES = 44
+
+
+class CorpusStats(NamedTuple):
+    """BM25 IDF/평균 길이 계산용 코퍼스 통계"""
+    n_docs: int
+    total_length: int
+    df: Dict[str, int]
+
+    @classmethod
+    def merge(cls, stats: Iterable["CorpusStats"]) -> "CorpusStats":
+        """여러 역색인의 통계를 하나의 코퍼스로 합산"""
+        n_docs, total_length, df = 0, 0, Counter()
+        for item in stats:
+            n_docs += item.n_docs
+            total_length += item.total_length
+            df.update(item.df)
+        return cls(n_docs, total_length, dict(df))
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    BM25 용 토큰화
+
+    - 소문자 변환 후 영문/숫자/한글 연속 구간을 토큰으로 사용
+    - 제품 코드처럼 구분자(-_./)로 이어진 토큰은 전체와 각 부분을 모두 포함
+      (2글자 이하 영문 부분은 제외)
+    - 조사가 붙는 한국어 어절은 글자 bigram 을 추가하여 부분 일치 허용
+      (예: "사운드마인드의" → "사운", "운드", ..., "드의")
+    """
+    tokens = []
+    for match in _TOKEN_PATTERN.findall(text.lower()):
+        tokens.append(match)
+        parts = _PART_PATTERN.findall(match)
+        if len(parts) > 1:
+            # "sm" 처럼 짧은 접두어는 거의 모든 코드에 걸리므로 제외
+            tokens.extend(p for p in parts if len(p) > 2 or p.isdigit())
+        for part in parts:
+            if len(part) > 2 and _HANGUL_PATTERN.match(part):
+                tokens.extend(part[i:i + 2] for i in range(len(part) - 1))
+    return tokens
+
+
+class BM25Index:
+    """
+    점진적으로 추가 가능한 BM25 역색인
+
+    문서 id 는 추가 순서(0, 1, 2, ...)이며 FAISS 인덱스 내 위치와 일치하도록
+    DocumentIndex 가 같은 순서로 추가합니다. 질의 점수는 term 별 posting 배열에
+    대해 NumPy 로 한 번에 계산합니다.
+    """
+
+    def __init__(self, k1: float = BM25_K1, b: float = BM25_B):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Tuple[List[int], List[int]]] = {}
+        self.doc_lengths: List[int] = []
+        self._total_length = 0
+        self._arrays: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._lengths_array: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def nbytes(self) -> int:
+        """역색인이 차지하는 메모리 근사치 (posting 목록 + NumPy 배열 캐시)"""
+        with self._lock:
+            postings = sum(len(ids) for ids, _ in self.postings.values())
+            cached = sum(ids.nbytes + tfs.nbytes for ids, tfs in self._arrays.values())
+            return (
+                len(self.postings) * _TERM_OVERHEAD_BYTES
+                + postings * _POSTING_BYTES
+                + len(self.doc_lengths) * 8
+                + cached
+            )
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        state["_arrays"] = {}
+        state["_lengths_array"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_texts(cls, texts: List[str]) -> "BM25Index":
+        index = cls()
+        index.add(texts)
+        return index
+
+    def add(self, texts: List[str]) -> None:
+        """
+        문서 추가 (id 는 기존 문서 수부터 순서대로 부여)
+        """
+        with self._lock:
+            for text in texts:
+                doc_id = len(self.doc_lengths)
+                tokens = tokenize(text)
+                for term, tf in Counter(tokens).items():
+                    ids, tfs = self.postings.setdefault(term, ([], []))
+                    ids.append(doc_id)
+                    tfs.append(tf)
+                self.doc_lengths.append(len(tokens))
+                self._total_length += len(tokens)
+            self._arrays.clear()
+            self._lengths_array = None
+
+    def _term_arrays(self, term: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        # 호출자가 self._lock 보유
+        arrays = self._arrays.get(term)
+        if arrays is None:
+            posting = self.postings.get(term)
+            if posting is None:
+                return None
+            arrays = (
+                np.asarray(posting[0], dtype=np.int64),
+                np.asarray(posting[1], dtype=np.float32),
+            )
+            self._arrays[term] = arrays
+        return arrays
+
+    def corpus_stats(self, query: str) -> CorpusStats:
+        """
+        질의 term 의 문서 빈도와 전체 문서 수/길이
+
+        여러 역색인을 하나의 코퍼스처럼 점수 매길 때 각 역색인의 값을 합산해
+        scores(corpus=...) 에 넘깁니다.
+        """
+        with self._lock:
+            df = {
+                term: len(self.postings[term][0])
+                for term in set(tokenize(query))
+                if term in self.postings
+            }
+            return CorpusStats(len(self.doc_lengths), self._total_length, df)
+
+    def scores(self, query: str, corpus: Optional[CorpusStats] = None) -> np.ndarray:
+        """
+        전체 문서의 BM25 점수
+
+        Args:
+            query: 질의
+            corpus: IDF/평균 길이 계산에 사용할 코퍼스 통계 (없으면 이 역색인 기준)
+
+        Returns:
+            np.ndarray: 길이 len(self) 의 점수 배열
+        """
+        with self._lock:
+            n_docs = len(self)
+            scores = np.zeros(n_docs, dtype=np.float32)
+            if n_docs == 0:
+                return scores
+
+            total_docs = corpus.n_docs if corpus is not None else n_docs
+            total_length = corpus.total_length if corpus is not None else self._total_length
+
+            if self._lengths_array is None:
+                self._lengths_array = np.asarray(self.doc_lengths, dtype=np.float32)
+            avg_length = total_length / total_docs or 1.0
+            norm = self.k1 * (1 - self.b + self.b * self._lengths_array / avg_length)
+
+            for term in set(tokenize(query)):
+                arrays = self._term_arrays(term)
+                if arrays is None:
+                    continue
+                ids, tfs = arrays
+                df = corpus.df.get(term, len(ids)) if corpus is not None else len(ids)
+                idf = math.log((total_docs - df + 0.5) / (df + 0.5) + 1)
+                scores[ids] += idf * tfs * (self.k1 + 1) / (tfs + norm[ids])
+            return scores
+
+    def search(
+        self,
+        query: str,
+        k: int,
+        mask: Optional[np.ndarray] = None,
+        corpus: Optional[CorpusStats] = None,
+    ) -> List[int]:
+        """
+        BM25 상위 k 개 문서 id (점수 0 인 문서 제외, 점수 내림차순)
+
+        Args:
+            mask: 검색 대상 문서 bool 배열 (False 인 문서 제외)
+            corpus: 코퍼스 통계 (scores 참고)
+        """
+        scores = self.scores(query, corpus)
+        if mask is not None:
+            # 마스크 계산 이후 추가된 문서는 제외
+            keep = np.zeros(scores.size, dtype=bool)
+            keep[: min(len(mask), scores.size)] = mask[: scores.size]
+            scores[~keep] = 0
+        if k <= 0 or not scores.size:
+            return []
+        k = min(k, scores.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [int(i) for i in top if scores[i] > 0]
+
+
+class MappedBM25Index(BM25Index):
+    """
+    디스크 배열을 memory-map 으로 연 읽기 전용 BM25 역색인
+
+    posting 은 CSR 형식 (term 별 구간 indptr + 문서 id / tf 배열) 으로 저장되어
+    term 배열을 복사 없이 그대로 사용하므로, 여러 워커 프로세스가 같은 파일을 열면
+    OS 페이지 캐시의 한 벌을 공유합니다. 프로세스마다 보관하는 것은 term -> 행 번호
+    사전뿐입니다. 문서를 추가할 수 없습니다.
+    """
+
+    def __init__(
+        self,
+        terms: List[str],
+        indptr: np.ndarray,
+        ids: np.ndarray,
+        tfs: np.ndarray,
+        lengths: np.ndarray,
+        k1: float = BM25_K1,
+        b: float = BM25_B,
+    ):
+        super().__init__(k1, b)
+        self._rows = {term: row for row, term in enumerate(terms)}
+        self._indptr = indptr
+        self._ids = ids
+        self._tfs = tfs
+        self.doc_lengths = lengths
+        self._lengths_array = lengths
+        self._total_length = int(lengths.sum())
+
+    def nbytes(self) -> int:
+        """프로세스 메모리에 있는 term 사전 크기 (memory-map 된 배열 제외)"""
+        return len(self._rows) * _TERM_OVERHEAD_BYTES
+
+    def mapped_nbytes(self) -> int:
+        """memory-map 된 posting / 문서 길이 배열 크기"""
+        return self._indptr.nbytes + self._ids.nbytes + self._tfs.nbytes + self.doc_lengths.nbytes
+
+    def add(self, texts: List[str]) -> None:
+        raise TypeError("MappedBM25Index is read-only")
+
+    def __getstate__(self):
+        raise TypeError("MappedBM25Index is backed by memory-mapped files and cannot be pickled")
+
+    def _term_arrays(self, term: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        row = self._rows.get(term)
+        if row is None:
+            return None
+        start, end = self._indptr[row], self._indptr[row + 1]
+        return self._ids[start:end], self._tfs[start:end]
+
+    def corpus_stats(self, query: str) -> CorpusStats:
+        df = {}
+        for term in set(tokenize(query)):
+            row = self._rows.get(term)
+            if row is not None:
+                df[term] = int(self._indptr[row + 1] - self._indptr[row])
+        return CorpusStats(len(self.doc_lengths), self._total_length, df)
+
+
+def reciprocal_rank_fusion(rankings: List[List[int]], k: int, rrf_k: int) -> List[int]:
+    """
+    Reciprocal Rank Fusion: score(d) = Σ 1 / (rrf_k + rank(d))
+
+    Args:
+        rankings: 문서 id 순위 리스트들 (앞쪽이 상위)
+        k: 반환할 문서 수
+        rrf_k: 순위 완화 상수 (보통 60)
+
+    Returns:
+        list[int]: 융합 점수 상위 k 개 문서 id
+    """
+    ranked = [np.asarray(r, dtype=np.int64) for r in rankings if len(r)]
+    if not ranked:
+        return []
+    ids = np.concatenate(ranked)
+    contrib = np.concatenate(
+        [1.0 / (rrf_k + np.arange(1, len(r) + 1, dtype=np.float64)) for r in ranked]
+    )
+    unique_ids, inverse = np.unique(ids, return_inverse=True)
+    fused = np.zeros(len(unique_ids), dtype=np.float64)
+    np.add.at(fused, inverse, contrib)
+    order = np.argsort(-fused, kind="stable")[:k]
+    return [int(unique_ids[i]) for i in order]
@@ -0,0 +1,184 @@
+# ============================================
+# LLM Clients - 공유 LLM 클라이언트 및 HTTP 커넥션 풀
+# ============================================
+
+import asyncio
+import threading
+from typing import Dict, Optional, Tuple
+
+import httpx
+from langchain_core.language_models.chat_models import BaseChatModel
+
+from app.config import (
+    OPENAI_API_KEY,
+    OPENAI_BASE_URL,
+    LLM_POOL_MAX_CONNECTIONS,
+    LLM_POOL_MAX_KEEPALIVE,
+    LLM_POOL_KEEPALIVE_EXPIRY,
+    LLM_REQUEST_TIMEOUT,
+    LLM_WARMUP_CONNECTIONS,
+    LLM_WARMUP_TIMEOUT,
+    LLM_BACKEND,
+)
+from app.providers import create_chat_model, uses_remote_llm
+
+# ============================================
+# 클라이언트 저장소 (프로세스 전역)
+# ============================================
+
+_http_client: Optional[httpx.Client] = None
+_http_async_client: Optional[httpx.AsyncClient] = None
+_chat_models: Dict[Tuple[str, float], BaseChatModel] = {}
+_lock = threading.Lock()
+
+# ============================================
+# HTTP 커넥션 풀
+# ============================================
+
+
+def _pool_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=LLM_POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_POOL_MAX_KEEPALIVE,
+        keepalive_expiry=LLM_POOL_KEEPALIVE_EXPIRY,
+    )
+
+
+def get_http_clients() -> Tuple[httpx.Client, httpx.AsyncClient]:
+    """
+    공유 HTTP 클라이언트 조회 (없으면 생성)
+
+    모든 모델이 동일한 커넥션 풀을 사용하므로 요청마다
+    TCP/TLS 연결을 새로 맺지 않습니다.
+
+    Returns:
+        tuple: (동기 클라이언트, 비동기 클라이언트)
+    """
+    global _http_client, _http_async_client
+
+    with _lock:
+        if _http_client is None:
+            _http_client = httpx.Client(
+                limits=_pool_limits(), timeout=LLM_REQUEST_TIMEOUT
+            )
+        if _http_async_client is None:
+            _http_async_client = httpx.AsyncClient(
+                limits=_pool_limits(), timeout=LLM_REQUEST_TIMEOUT
+            )
+        return _http_client, _http_async_client
+
+
+# ============================================
+# LLM 클라이언트 레지스트리
+# ============================================
+
+
+def get_chat_model(model: str, temperature: float) -> BaseChatModel:
+    """
+    (모델, 온도)별 공유 채팅 모델 조회 (LLM_BACKEND 설정에 따라 생성)
+
+    Args:
+        model: LLM 모델명
+        temperature: 생성 온도
+
+    Returns:
+        BaseChatModel: 공유 커넥션 풀을 사용하는 LLM 클라이언트 (fake 백엔드는 풀 미사용)
+    """
+    key = (model, float(temperature))
+    llm = _chat_models.get(key)
+    if llm is not None:
+        return llm
+
+    http_client, http_async_client = get_http_clients()
+
+    with _lock:
+        llm = _chat_models.get(key)
+        if llm is None:
+            llm = create_chat_model(
+                model,
+                temperature,
+                http_client=http_client,
+                http_async_client=http_async_client,
+            )
+            _chat_models[key] = llm
+        return llm
+
+
+def get_llm_client_stats() -> dict:
+    """
+    LLM 클라이언트 레지스트리 상태 조회
+
+    Returns:
+        dict: 등록된 모델 목록 및 커넥션 풀 설정
+    """
+    return {
+        "backend": LLM_BACKEND,
+        "models": [
+            {"model": model, "temperature": temperature}
+            for model, temperature in _chat_models
+        ],
+        "pool": {
+            "max_connections": LLM_POOL_MAX_CONNECTIONS,
+            "max_keepalive_connections": LLM_POOL_MAX_KEEPALIVE,
+            "keepalive_expiry": LLM_POOL_KEEPALIVE_EXPIRY,
+        },
+    }
+
+
+# ============================================
+# 시작/종료 처리
+# ============================================
+
+
+async def warmup_llm_clients(
+    connections: int = LLM_WARMUP_CONNECTIONS,
+    timeout: float = LLM_WARMUP_TIMEOUT,
+) -> int:
+    """
+    커넥션 풀 사전 연결 (서버 시작 시 호출)
+
+    Provider에 가벼운 요청을 동시에 보내 keep-alive 커넥션을 미리 열어두어
+    첫 요청의 TLS 핸드셰이크 지연을 없앱니다. 요청마다 LLM_WARMUP_TIMEOUT 을 적용하며,
+    실패하거나 시간이 초과되어도 서버 시작은 계속됩니다.
+
+    Args:
+        connections: 미리 열어둘 커넥션 수
+        timeout: 사전 연결 요청 제한 시간 (초)
+
+    Returns:
+        int: 성공한 사전 연결 수
+    """
+    if connections <= 0 or not uses_remote_llm():
+        return 0
+
+    _, http_async_client = get_http_clients()
+    headers = {"Authorization": f"Bearer {OPENAI_API_KEY}"} if OPENAI_API_KEY else {}
+
+    async def _ping() -> bool:
+        try:
+            await http_async_client.get(f"{OPENAI_BASE_URL}/models", headers=headers, timeout=timeout)
+            return True
+        except httpx.HTTPError as e:
+            print(f"[WARN] LLM connection warmup failed: {type(e).__name__} {e}")
+            return False
+
+    results = await asyncio.gather(*(_ping() for _ in range(connections)))
+    return sum(results)
+
+
+async def close_llm_clients() -> None:
+    """
+    공유 HTTP 클라이언트 종료 (서버 종료 시 호출)
+    """
+    global _http_client, _http_async_client
+
+    with _lock:
+        http_client, http_async_client = _http_client, _http_async_client
+        _http_client = None
+        _http_async_client = None
+        _chat_models.clear()
+
+    if http_async_client is not None:
+        await http_async_client.aclose()
+    if http_client is not None:
+        http_client.close()
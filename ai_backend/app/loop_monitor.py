@@ -0,0 +1,69 @@
+# ============================================
+# Loop Monitor - 이벤트 루프 지연 측정
+# ============================================
+
+import asyncio
+from collections import deque
+from typing import Optional
+
+from app.config import LOOP_LAG_INTERVAL, LOOP_LAG_WINDOW
+
+
+class LoopLagMonitor:
+    """
+    주기적으로 sleep 하고 예정 시각보다 늦게 깨어난 시간을 기록하여
+    이벤트 루프가 블로킹된 정도를 측정합니다.
+    """
+
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL, window: int = LOOP_LAG_WINDOW):
+        self.interval = interval
+        self.samples = deque(maxlen=window)
+        self.max_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - start - self.interval)
+            self.samples.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        """
+        지연 통계 (단위: ms)
+
+        Returns:
+            dict: 최근 값, 평균, p99, 최근 윈도우 최대값, 서버 시작 이후 최대값
+        """
+        samples = sorted(self.samples)
+        if not samples:
+            return {"samples": 0, "interval_ms": self.interval * 1000}
+
+        p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+        return {
+            "samples": len(samples),
+            "interval_ms": self.interval * 1000,
+            "last_ms": self.samples[-1] * 1000,
+            "avg_ms": sum(samples) / len(samples) * 1000,
+            "p99_ms": p99 * 1000,
+            "window_max_ms": samples[-1] * 1000,
+            "max_ms": self.max_lag * 1000,
+        }
+
+
+loop_lag_monitor = LoopLagMonitor()
@@ -2,16 +2,51 @@
 # SM-AI Backend - FastAPI Application
 # ============================================
 
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import CORS_ORIGINS, API_PREFIX
+from app.llm_clients import warmup_llm_clients, close_llm_clients, get_llm_client_stats
+from app.loop_monitor import loop_lag_monitor
+from app.ingest_executor import get_ingest_stats, shutdown_ingest_executor
+from app.pdf_loader import shutdown_pdf_pool
+from app.embedding_scheduler import get_embedding_scheduler_stats
+from app.chat_memory import get_history_stats, shutdown_history_summarizer
+from app.session_manager import session_store, get_session_stats
+from app.history_backend import close_history_backend
+from app.session_catalog import close_session_catalog
+from app.server import get_server_stats
 import os
 
+# ============================================
+# 시작/종료 처리
+# ============================================
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """서버 시작 시 LLM 커넥션 사전 연결, 종료 시 커넥션 풀 정리"""
+    loop_lag_monitor.start()
+    session_store.start()
+    await warmup_llm_clients()
+    yield
+    await loop_lag_monitor.stop()
+    await session_store.stop()
+    # 진행 중인 인제스트 완료 대기는 이벤트 루프 밖에서
+    await asyncio.to_thread(shutdown_ingest_executor)
+    shutdown_pdf_pool()
+    shutdown_history_summarizer()
+    close_history_backend()
+    close_session_catalog()
+    await close_llm_clients()
+
+
 # FastAPI 앱 생성
 app = FastAPI(
     title="SM-AI Backend",
     description="Soundmind AI System Backend API",
-    version="0.1.2"
+    version="0.1.2",
+    lifespan=lifespan
 )
 
 # ============================================
@@ -54,8 +89,43 @@ async def health_check():
     """헬스 체크 엔드포인트"""
     return {"status": "healthy"}
 
+@app.get("/metrics/llm-clients")
+async def llm_client_metrics():
+    """공유 LLM 클라이언트 및 커넥션 풀 상태"""
+    return get_llm_client_stats()
+
+@app.get("/metrics/loop-lag")
+async def loop_lag_metrics():
+    """이벤트 루프 지연 통계 (블로킹 작업 감지용)"""
+    return loop_lag_monitor.stats()
+
+@app.get("/metrics/embeddings")
+async def embedding_metrics():
+    """임베딩 스케줄러 처리량 및 동시성 상태"""
+    return get_embedding_scheduler_stats()
+
+@app.get("/metrics/sessions")
+async def session_metrics():
+    """채팅 세션 저장소 상태 (세션 수, 보관 바이트, 제거/만료 횟수)"""
+    return get_session_stats()
+
+@app.get("/metrics/chat-history")
+async def chat_history_metrics():
+    """대화 히스토리 요약 실행기 상태"""
+    return get_history_stats()
+
+@app.get("/metrics/ingest")
+async def ingest_metrics():
+    """RAG 인제스트 실행기 상태"""
+    return get_ingest_stats()
+
+@app.get("/metrics/server")
+async def server_metrics():
+    """응답한 워커 프로세스 정보 (pid, 워커 번호, 이벤트 루프 종류)"""
+    return get_server_stats()
+
 # ============================================
-# 서버 실행 (개발용)
+# 서버 실행 (개발용, 운영 환경은 python -m app.server)
 # ============================================
 
 if __name__ == "__main__":
@@ -0,0 +1,361 @@
+# ============================================
+# Modular RAG - YAML 정의 검색 파이프라인 (DAG)
+# ============================================
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+import yaml
+from langchain_core.documents import Document
+
+from app.config import MODULAR_RAG_STAGE_CACHE_SIZE, RAG_TOP_K, RAG_RRF_K
+from app.advanced_rag import expand_queries
+from app.lexical_index import reciprocal_rank_fusion, tokenize
+
+# 파이프라인에서 항상 사용할 수 있는 입력
+QUESTION_INPUT = "question"
+
+# ============================================
+# 파이프라인 정의 로드
+# ============================================
+
+# (pipeline_file, mtime) -> 파싱된 정의
+_pipeline_cache: Dict[str, tuple] = {}
+
+
+def load_pipeline(pipeline_file: str) -> dict:
+    """
+    파이프라인 YAML 로드 및 검증 (파일 수정 시 다시 로드)
+
+    Args:
+        pipeline_file: 파이프라인 파일 경로 (예: "prompts/rag/pipelines/02-fast.yaml")
+
+    Returns:
+        dict: {"stages": {id: stage}, "order": [id, ...], "output": generate 입력 stage id}
+
+    Raises:
+        ValueError: 정의가 올바르지 않은 경우
+    """
+    mtime = os.stat(pipeline_file).st_mtime_ns
+    cached = _pipeline_cache.get(pipeline_file)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    with open(pipeline_file, "r", encoding="utf-8") as f:
+        data = yaml.safe_load(f) or {}
+
+    stages: Dict[str, dict] = {}
+    for stage in data.get("stages", []):
+        stage_id, stage_type = stage.get("id"), stage.get("type")
+        if not stage_id or stage_id == QUESTION_INPUT or stage_id in stages:
+            raise ValueError(f"Invalid or duplicate stage id: {stage_id}")
+        if stage_type != "generate" and stage_type not in STAGE_TYPES:
+            raise ValueError(f"Unknown stage type: {stage_type}")
+        stages[stage_id] = {
+            "id": stage_id,
+            "type": stage_type,
+            "inputs": list(stage.get("inputs", [QUESTION_INPUT])),
+            "params": dict(stage.get("params") or {}),
+        }
+
+    generate = [s for s in stages.values() if s["type"] == "generate"]
+    if len(generate) != 1 or len(generate[0]["inputs"]) != 1:
+        raise ValueError("Pipeline must have exactly one generate stage with one input")
+
+    pipeline = {
+        "stages": {k: v for k, v in stages.items() if v["type"] != "generate"},
+        "order": _topological_order(stages),
+        "output": generate[0]["inputs"][0],
+    }
+    _pipeline_cache[pipeline_file] = (mtime, pipeline)
+    return pipeline
+
+
+def _topological_order(stages: Dict[str, dict]) -> List[str]:
+    order, state = [], {}
+
+    def visit(stage_id: str) -> None:
+        if stage_id == QUESTION_INPUT:
+            return
+        if stage_id not in stages:
+            raise ValueError(f"Unknown stage input: {stage_id}")
+        if state.get(stage_id) == "visiting":
+            raise ValueError(f"Pipeline has a cycle at stage: {stage_id}")
+        if state.get(stage_id) == "done":
+            return
+        state[stage_id] = "visiting"
+        for dep in stages[stage_id]["inputs"]:
+            visit(dep)
+        state[stage_id] = "done"
+        if stages[stage_id]["type"] != "generate":
+            order.append(stage_id)
+
+    for stage_id in stages:
+        visit(stage_id)
+    return order
+
+
+# ============================================
+# Stage 결과 캐시 (입력 해시 기반 LRU)
+# ============================================
+
+_stage_cache: "OrderedDict[str, Any]" = OrderedDict()
+_stage_cache_lock = threading.Lock()
+_stage_cache_stats = {"hits": 0, "misses": 0}
+
+
+def _fingerprint(value: Any) -> Any:
+    if isinstance(value, Document):
+        return [
+            value.metadata.get("source"),
+            value.metadata.get("page"),
+            hashlib.sha256(value.page_content.encode("utf-8")).hexdigest(),
+        ]
+    if isinstance(value, (list, tuple)):
+        return [_fingerprint(v) for v in value]
+    return value
+
+
+def _stage_cache_key(stage: dict, inputs: List[Any], scope: Any, question: Optional[str] = None) -> str:
+    payload = json.dumps(
+        [stage["type"], stage["params"], _fingerprint(inputs), scope, question],
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get_stage_cache_stats() -> dict:
+    """
+    Stage 결과 캐시 통계 조회
+    """
+    with _stage_cache_lock:
+        return {"size": len(_stage_cache), "max_size": MODULAR_RAG_STAGE_CACHE_SIZE, **_stage_cache_stats}
+
+
+# ============================================
+# Stage 구현
+# ============================================
+# 모든 stage 는 async (inputs, params, ctx) -> output 형태입니다.
+# ctx: {"question": str, "retriever": 검색기}
+
+
+def _as_queries(value: Any) -> List[str]:
+    return [value] if isinstance(value, str) else [q for q in value if isinstance(q, str)]
+
+
+def _as_documents(inputs: List[Any]) -> List[List[Document]]:
+    return [value for value in inputs if isinstance(value, list)]
+
+
+def _fuse(rankings: List[List[Document]], k: int) -> List[Document]:
+    doc_ids: Dict[tuple, int] = {}
+    docs: List[Document] = []
+    id_rankings = []
+    for ranking in rankings:
+        ids = []
+        for doc in ranking:
+            key = (doc.metadata.get("source"), doc.metadata.get("page"), doc.page_content)
+            if key not in doc_ids:
+                doc_ids[key] = len(docs)
+                docs.append(doc)
+            ids.append(doc_ids[key])
+        id_rankings.append(ids)
+    return [docs[i] for i in reciprocal_rank_fusion(id_rankings, k=k, rrf_k=RAG_RRF_K)]
+
+
+async def _rewrite_stage(inputs: List[Any], params: dict, ctx: dict) -> List[str]:
+    """질문을 검색 질의 여러 개로 재작성"""
+    return await expand_queries(inputs[0], params.get("num_queries", 2))
+
+
+async def _retrieve_stage(inputs: List[Any], params: dict, ctx: dict) -> List[Document]:
+    """질의(들) 동시 검색 후 RRF 융합"""
+    retriever = ctx["retriever"]
+    k = params.get("k", RAG_TOP_K)
+    queries = [q for value in inputs for q in _as_queries(value)]
+    index = getattr(retriever, "index", None)
+
+    async def search(query: str) -> List[Document]:
+        if index is not None:
+            kwargs = {"mode": params["mode"]} if "mode" in params else {}
+            search_filter = getattr(retriever, "search_filter", None)
+            if search_filter is not None:
+                kwargs["search_filter"] = search_filter
+            return await asyncio.to_thread(index.similarity_search, query, k, **kwargs)
+        return await retriever.ainvoke(query)
+
+    results = await asyncio.gather(*(search(q) for q in queries))
+    return _fuse(list(results), k)
+
+
+async def _fuse_stage(inputs: List[Any], params: dict, ctx: dict) -> List[Document]:
+    """여러 검색 결과 병합 (중복 제거 + RRF)"""
+    return _fuse(_as_documents(inputs), params.get("k", RAG_TOP_K))
+
+
+async def _filter_stage(inputs: List[Any], params: dict, ctx: dict) -> List[Document]:
+    """질문과 어휘가 거의 겹치지 않는 청크 제거"""
+    question_terms = set(tokenize(ctx["question"]))
+    min_overlap = params.get("min_overlap", 0.0)
+    max_docs = params.get("max_docs")
+
+    kept = []
+    for docs in _as_documents(inputs):
+        for doc in docs:
+            if question_terms:
+                overlap = len(question_terms & set(tokenize(doc.page_content))) / len(question_terms)
+                if overlap < min_overlap:
+                    continue
+            kept.append(doc)
+
+    # 모두 걸러지면 원래 순위 상위 문서 유지
+    if not kept:
+        kept = [doc for docs in _as_documents(inputs) for doc in docs][:1]
+    return kept[:max_docs] if max_docs else kept
+
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?。])\s+|\n+")
+
+
+async def _compress_stage(inputs: List[Any], params: dict, ctx: dict) -> List[Document]:
+    """질문 어휘가 포함된 문장 위주로 청크를 줄여 전체 길이 제한"""
+    question_terms = set(tokenize(ctx["question"]))
+    max_chars = params.get("max_chars", 4000)
+    min_sentence_overlap = params.get("min_sentence_overlap", 1)
+
+    compressed, used = [], 0
+    for docs in _as_documents(inputs):
+        for doc in docs:
+            sentences = [s for s in _SENTENCE_SPLIT.split(doc.page_content) if s.strip()]
+            relevant = [
+                s for s in sentences
+                if len(question_terms & set(tokenize(s))) >= min_sentence_overlap
+            ]
+            text = "\n".join(relevant or sentences)
+            remaining = max_chars - used
+            if remaining <= 0:
+                break
+            text = text[:remaining]
+            used += len(text)
+            compressed.append(Document(page_content=text, metadata=doc.metadata))
+    return compressed
+
+
+STAGE_TYPES: Dict[str, Callable] = {
+    "rewrite": _rewrite_stage,
+    "retrieve": _retrieve_stage,
+    "fuse": _fuse_stage,
+    "filter": _filter_stage,
+    "compress": _compress_stage,
+}
+
+# 문서 인덱스 내용에 따라 결과가 달라지는 stage (캐시 키에 인덱스 식별자 포함)
+_INDEX_DEPENDENT = {"retrieve"}
+
+# 입력과 별개로 ctx["question"] 을 읽는 stage (캐시 키에 질문 포함)
+_QUESTION_DEPENDENT = {"filter", "compress"}
+
+
+# ============================================
+# 파이프라인 실행
+# ============================================
+
+
+def _index_scope(retriever) -> Any:
+    index = getattr(retriever, "index", None)
+    if index is None:
+        return id(retriever)
+    # 인덱싱 중에는 청크 수가 바뀌므로 함께 포함
+    search_filter = getattr(retriever, "search_filter", None)
+    return [
+        getattr(index, "index_key", None) or id(index),
+        index.chunk_count,
+        search_filter.cache_scope() if search_filter is not None else "",
+    ]
+
+
+async def run_pipeline(
+    question: str,
+    pipeline_file: str,
+    retriever,
+    timings: Optional[Dict[str, Any]] = None,
+) -> List[Document]:
+    """
+    파이프라인 DAG 실행 후 generate stage 입력(context) 반환
+
+    각 stage 는 입력 stage 가 끝나는 즉시 시작되므로 서로 의존하지 않는
+    분기는 동시에 실행됩니다. stage 결과는 (stage 정의, 입력 해시)로 캐싱됩니다.
+
+    Args:
+        question: 사용자 질문
+        pipeline_file: 파이프라인 파일 경로
+        retriever: 검색기
+        timings: stage 별 소요 시간/캐시 여부를 기록할 dict (선택)
+
+    Returns:
+        list[Document]: 답변 생성에 사용할 문서
+    """
+    pipeline = load_pipeline(pipeline_file)
+    timings = timings if timings is not None else {}
+    stage_timings = timings.setdefault("stages", {})
+    ctx = {"question": question, "retriever": retriever}
+    scope = _index_scope(retriever)
+    start = time.perf_counter()
+
+    tasks: Dict[str, asyncio.Task] = {}
+
+    async def run_stage(stage: dict) -> Any:
+        inputs = []
+        for dep in stage["inputs"]:
+            inputs.append(question if dep == QUESTION_INPUT else await tasks[dep])
+
+        t = time.perf_counter()
+        key = _stage_cache_key(
+            stage,
+            inputs,
+            scope if stage["type"] in _INDEX_DEPENDENT else None,
+            question if stage["type"] in _QUESTION_DEPENDENT else None,
+        )
+        with _stage_cache_lock:
+            cached = key in _stage_cache
+            if cached:
+                _stage_cache.move_to_end(key)
+                result = _stage_cache[key]
+                _stage_cache_stats["hits"] += 1
+            else:
+                _stage_cache_stats["misses"] += 1
+
+        if not cached:
+            result = await STAGE_TYPES[stage["type"]](inputs, stage["params"], ctx)
+            with _stage_cache_lock:
+                _stage_cache[key] = result
+                while len(_stage_cache) > MODULAR_RAG_STAGE_CACHE_SIZE:
+                    _stage_cache.popitem(last=False)
+
+        stage_timings[stage["id"]] = {
+            "ms": (time.perf_counter() - t) * 1000,
+            "cached": cached,
+        }
+        return result
+
+    for stage_id in pipeline["order"]:
+        tasks[stage_id] = asyncio.ensure_future(run_stage(pipeline["stages"][stage_id]))
+
+    try:
+        output = await tasks[pipeline["output"]] if pipeline["output"] != QUESTION_INPUT else question
+        await asyncio.gather(*tasks.values())
+    finally:
+        for task in tasks.values():
+            task.cancel()
+
+    timings["context_total_ms"] = (time.perf_counter() - start) * 1000
+    return output
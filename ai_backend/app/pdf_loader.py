@@ -0,0 +1,135 @@
+# ============================================
+# PDF Loader - 페이지 단위 병렬 PDF 텍스트 추출
+# ============================================
+
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterator, List, Optional, Tuple
+
+import pdfplumber
+from langchain_core.documents import Document
+
+from app.config import PDF_EXTRACT_WORKERS, PDF_PARALLEL_MIN_PAGES
+
+# 워커당 페이지 범위 개수 (범위가 잘게 나뉠수록 진행률 보고가 촘촘해짐)
+_RANGES_PER_WORKER = 4
+
+# ============================================
+# 프로세스 풀 (프로세스 전역)
+# ============================================
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # 스레드가 있는 서버 프로세스에서 fork 하지 않도록 spawn 사용
+            _pool = ProcessPoolExecutor(
+                max_workers=PDF_EXTRACT_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def shutdown_pdf_pool() -> None:
+    """
+    페이지 추출 프로세스 풀 종료 (서버 종료 시 호출)
+    """
+    global _pool
+    with _pool_lock:
+        pool = _pool
+        _pool = None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+# ============================================
+# 페이지 추출
+# ============================================
+
+
+def _extract_page_range(file_path: str, start: int, end: int) -> List[Tuple[int, str]]:
+    """
+    [start, end) 페이지 텍스트 추출 (워커 프로세스에서 실행)
+    """
+    with pdfplumber.open(file_path) as pdf:
+        return [(i, pdf.pages[i].extract_text()) for i in range(start, end)]
+
+
+def _page_ranges(total_pages: int, workers: int) -> List[Tuple[int, int]]:
+    n_ranges = max(1, min(total_pages, workers * _RANGES_PER_WORKER))
+    step = -(-total_pages // n_ranges)
+    return [(start, min(start + step, total_pages)) for start in range(0, total_pages, step)]
+
+
+def iter_pdf_pages(
+    file_path: str,
+    max_workers: int = PDF_EXTRACT_WORKERS,
+    on_pages: Optional[Callable[[int, int], None]] = None,
+) -> Iterator[Document]:
+    """
+    PDF 페이지별 Document 를 페이지 순서대로 생성
+
+    모든 페이지 범위를 프로세스 풀에 먼저 제출한 뒤 앞쪽 범위부터 결과를
+    내보내므로, 뒤쪽 페이지가 추출되는 동안 앞쪽 페이지를 바로 처리할 수 있습니다.
+    page_content 와 metadata 는 PDFPlumberLoader(file_path).load() 결과와 동일합니다.
+
+    Args:
+        file_path: PDF 파일 경로
+        max_workers: 사용할 워커 수 (1 이하면 현재 프로세스에서 순차 추출)
+        on_pages: 페이지 추출 진행 콜백 (완료 페이지 수, 전체 페이지 수)
+
+    Yields:
+        Document: 페이지 Document
+    """
+    with pdfplumber.open(file_path) as pdf:
+        total_pages = len(pdf.pages)
+        doc_metadata = {
+            k: v for k, v in pdf.metadata.items() if type(v) in [str, int]
+        }
+
+    ranges = _page_ranges(total_pages, max(1, max_workers)) if total_pages else []
+
+    if max_workers <= 1 or total_pages < PDF_PARALLEL_MIN_PAGES:
+        results = (_extract_page_range(file_path, start, end) for start, end in ranges)
+    else:
+        pool = _get_pool()
+        futures = [pool.submit(_extract_page_range, file_path, start, end) for start, end in ranges]
+        results = (future.result() for future in futures)
+
+    done = 0
+    for pages in results:
+        done += len(pages)
+        if on_pages:
+            on_pages(done, total_pages)
+        for i, text in pages:
+            yield Document(
+                page_content=text + "\n",
+                metadata=dict(
+                    {
+                        "source": file_path,
+                        "file_path": file_path,
+                        "page": i,
+                        "total_pages": total_pages,
+                    },
+                    **doc_metadata,
+                ),
+            )
+
+
+def load_pdf_pages(
+    file_path: str,
+    max_workers: int = PDF_EXTRACT_WORKERS,
+    on_pages: Optional[Callable[[int, int], None]] = None,
+) -> List[Document]:
+    """
+    PDF 페이지별 Document 전체 로드 (iter_pdf_pages 결과를 리스트로 반환)
+
+    Returns:
+        list[Document]: 페이지 순서의 Document 리스트
+    """
+    return list(iter_pdf_pages(file_path, max_workers=max_workers, on_pages=on_pages))
@@ -0,0 +1,210 @@
+# ============================================
+# Providers - 임베딩 / LLM 백엔드 (OpenAI 또는 오프라인)
+# ============================================
+
+import asyncio
+import hashlib
+import math
+import time
+from collections import Counter
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+import numpy as np
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+
+from app.config import (
+    LLM_BACKEND,
+    EMBEDDING_BACKEND,
+    EMBEDDING_MODEL,
+    LOCAL_EMBEDDING_DIM,
+    FAKE_LLM_TTFT_MS,
+    FAKE_LLM_TOKENS_PER_SEC,
+    FAKE_LLM_RESPONSE_TOKENS,
+)
+from app.lexical_index import tokenize
+
+LLM_BACKENDS = ["openai", "fake"]
+EMBEDDING_BACKENDS = ["openai", "local"]
+
+# fake LLM 응답에 질문 단어와 섞어 쓰는 고정 어휘
+_FILLER_WORDS = (
+    "the document describes this topic in detail and the relevant section "
+    "explains how the procedure works step by step"
+).split()
+
+# ============================================
+# 로컬 임베딩
+# ============================================
+
+
+class HashingEmbeddings(Embeddings):
+    """
+    해싱 기반 TF 임베딩 (API 호출 없음, 항상 같은 입력에 같은 벡터)
+
+    BM25 와 같은 토큰화 결과를 blake2b 해시로 dim 차원에 부호와 함께 사상하고,
+    sublinear TF (1 + log tf) 가중치를 적용한 뒤 L2 정규화합니다.
+    코퍼스 전체의 IDF 는 인덱스마다 달라지므로 사용하지 않습니다.
+    """
+
+    def __init__(self, dim: int = LOCAL_EMBEDDING_DIM):
+        self.dim = dim
+
+    def _bucket(self, term: str) -> tuple:
+        digest = hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        return value % self.dim, 1.0 if (value >> 63) & 1 else -1.0
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for term, tf in Counter(tokenize(text)).items():
+            position, sign = self._bucket(term)
+            vector[position] += sign * (1.0 + math.log(tf))
+        norm = float(np.linalg.norm(vector))
+        if norm > 0:
+            vector /= norm
+        return vector.tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+# ============================================
+# Fake 스트리밍 LLM
+# ============================================
+
+
+class FakeStreamingChatModel(BaseChatModel):
+    """
+    지연 시간을 흉내내는 결정적 스트리밍 채팅 모델
+
+    첫 토큰까지 ttft_ms 만큼 기다린 뒤 tokens_per_sec 속도로 response_tokens 개의
+    토큰을 내보냅니다. 응답 내용은 마지막 메시지로만 결정되므로 같은 입력에는
+    항상 같은 응답을 반환합니다.
+    """
+
+    model_name: str = "fake"
+    temperature: float = 0.0
+    ttft_ms: float = FAKE_LLM_TTFT_MS
+    tokens_per_sec: float = FAKE_LLM_TOKENS_PER_SEC
+    response_tokens: int = FAKE_LLM_RESPONSE_TOKENS
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-streaming"
+
+    def _tokens(self, messages: List[BaseMessage]) -> List[str]:
+        prompt = str(messages[-1].content) if messages else ""
+        words = [w for w in prompt.split() if w.isalnum()][:16] or _FILLER_WORDS
+        seed = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest(), 16)
+        tokens = []
+        for i in range(self.response_tokens):
+            pool = words if (seed >> (i % 64)) & 1 else _FILLER_WORDS
+            word = pool[(seed + i) % len(pool)]
+            tokens.append(word if i == 0 else f" {word}")
+        return tokens
+
+    def _delay(self, index: int) -> float:
+        if index == 0:
+            return self.ttft_ms / 1000
+        return 1.0 / self.tokens_per_sec if self.tokens_per_sec > 0 else 0.0
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        tokens = self._tokens(messages)
+        time.sleep(sum(self._delay(i) for i in range(len(tokens))))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="".join(tokens)))])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        tokens = self._tokens(messages)
+        await asyncio.sleep(sum(self._delay(i) for i in range(len(tokens))))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="".join(tokens)))])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        for i, token in enumerate(self._tokens(messages)):
+            time.sleep(self._delay(i))
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        for i, token in enumerate(self._tokens(messages)):
+            await asyncio.sleep(self._delay(i))
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                await run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+
+# ============================================
+# 백엔드 선택
+# ============================================
+
+
+def create_chat_model(model: str, temperature: float, **openai_kwargs) -> BaseChatModel:
+    """
+    LLM_BACKEND 설정에 맞는 채팅 모델 생성
+
+    Args:
+        model: LLM 모델명
+        temperature: 생성 온도
+        **openai_kwargs: ChatOpenAI 추가 인자 (http_client 등, fake 백엔드는 무시)
+    """
+    if LLM_BACKEND == "fake":
+        return FakeStreamingChatModel(model_name=model, temperature=temperature)
+    if LLM_BACKEND == "openai":
+        return ChatOpenAI(model=model, temperature=temperature, **openai_kwargs)
+    raise ValueError(f"Invalid LLM_BACKEND '{LLM_BACKEND}'. Choose one of {LLM_BACKENDS}")
+
+
+def create_provider_embeddings() -> Embeddings:
+    """
+    EMBEDDING_BACKEND 설정에 맞는 임베딩 모델 생성 (캐시/스케줄러 적용 전)
+    """
+    if EMBEDDING_BACKEND == "local":
+        return HashingEmbeddings()
+    if EMBEDDING_BACKEND == "openai":
+        # 재시도는 스케줄러가 담당하므로 클라이언트 자체 재시도는 끔
+        return OpenAIEmbeddings(model=EMBEDDING_MODEL, max_retries=0)
+    raise ValueError(
+        f"Invalid EMBEDDING_BACKEND '{EMBEDDING_BACKEND}'. Choose one of {EMBEDDING_BACKENDS}"
+    )
+
+
+def uses_remote_llm() -> bool:
+    """LLM 백엔드가 외부 Provider 에 연결하는지 여부 (커넥션 사전 연결 판단용)"""
+    return LLM_BACKEND == "openai"
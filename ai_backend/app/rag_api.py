@@ -5,11 +5,43 @@
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 import os
 import json
-from app.chain_factory import create_rag_retriever, create_rag_chain, get_available_prompts
-from app.config import FILES_DIR
+import tempfile
+import time
+import asyncio
+from app.chain_factory import (
+    create_document_index,
+    create_session_index,
+    ingest_document,
+    load_document_index,
+    create_rag_chain,
+    get_available_prompts,
+)
+from app.config import (
+    FILES_DIR,
+    ANSWER_CACHE_ENABLED,
+    RAG_CHUNK_SIZE,
+    RAG_CHUNK_OVERLAP,
+    EMBEDDING_MODEL,
+)
+from app.index_store import compute_content_index_key, index_exists
+from app.document_registry import document_registry
+from app.index_cache import index_cache
+from app.session_catalog import session_catalog
+from app.answer_cache import answer_cache, make_bucket_key, split_for_replay
+from app.session_index import SearchFilter
+from app.embedding_cache import get_embedding_store
+from app.modular_rag import get_stage_cache_stats
+from app.ingest_executor import submit_ingest, IngestQueueFullError
+from app.ingest_jobs import (
+    create_job,
+    create_completed_job,
+    get_job,
+    set_job_status,
+    make_progress_callback,
+)
 
 router = APIRouter()
 
@@ -17,8 +49,105 @@ router = APIRouter()
 # 세션별 Retriever 저장소
 # ============================================
 
+# session_id -> SessionIndex (세션에 업로드된 모든 문서)
 retriever_store = {}
 
+# 실행 중인 인제스트 작업 Task (GC 방지용 참조)
+_ingest_tasks = set()
+
+# 세션 문서 목록 변경과 SessionCatalog 동기화 직렬화
+_catalog_lock = asyncio.Lock()
+
+
+def _open_shared_document(index_key: str, embeddings, job_id: Optional[str] = None) -> Optional[dict]:
+    """
+    디스크에 저장된 공유 문서 인덱스 참조 획득 (다른 워커가 인제스트한 문서, 블로킹)
+
+    디스크에서 연 항목은 인제스트가 끝난 상태이므로 future 는 None 으로 두고,
+    job_id 는 문서를 인제스트한 워커의 작업 ID (SessionCatalog 기록) 를 사용합니다.
+
+    Returns:
+        dict: 레지스트리 항목 (아직 디스크에 인덱스가 없으면 None)
+    """
+    if document_registry.get(index_key) is None and not index_exists(index_key):
+        # 다른 워커에서 아직 인제스트 중
+        return None
+    entry, created = document_registry.acquire(
+        index_key,
+        lambda: load_document_index(index_key, embeddings) or create_document_index(embeddings),
+    )
+    if created:
+        if not entry["index"].complete:
+            # 다른 워커에서 아직 인제스트 중
+            document_registry.discard(index_key)
+            return None
+        entry["job_id"] = job_id
+        index_cache.track(entry["index"])
+    return entry
+
+
+def _sync_session_index(session_index, revision: int, documents: List[dict]) -> None:
+    """
+    SessionCatalog 문서 목록을 워커의 세션 인덱스에 반영 (블로킹)
+
+    다른 워커에서 삭제된 문서는 제거하고, 추가된 문서는 디스크 인덱스를
+    memory-map 으로 열어 붙입니다. 인제스트 중이라 붙이지 못한 문서가 있으면
+    revision 을 기록하지 않아 다음 요청에서 다시 시도합니다.
+    """
+    wanted = {doc["document_id"] for doc in documents}
+    for document_id in session_index.document_ids():
+        if document_id not in wanted:
+            session_index.remove_document(document_id)
+
+    pending = False
+    for doc in documents:
+        if session_index.get_document(doc["document_id"]) is not None:
+            continue
+        entry = _open_shared_document(doc["index_key"], session_index.embeddings, doc["job_id"])
+        if entry is None:
+            pending = True
+            continue
+        session_index.add_document(
+            entry["index"], doc["filename"], doc["file_path"], doc["job_id"],
+            registry_key=doc["index_key"], document_id=doc["document_id"],
+        )
+    session_index.catalog_revision = None if pending else revision
+
+
+async def _session_index(session_id: str):
+    """
+    세션 인덱스 조회
+
+    RAG_SESSION_CATALOG=sqlite 이면 다른 워커가 올리거나 지운 문서를 반영하므로
+    요청이 어느 워커로 가도 같은 문서 목록으로 검색합니다.
+    """
+    session_index = retriever_store.get(session_id)
+    if session_catalog is None:
+        return session_index
+
+    revision = await asyncio.to_thread(session_catalog.revision, session_id)
+    if session_index is not None and session_index.catalog_revision == revision:
+        return session_index
+    if session_index is None and revision == 0:
+        return None
+
+    async with _catalog_lock:
+        revision, documents = await asyncio.to_thread(session_catalog.documents, session_id)
+        session_index = retriever_store.get(session_id)
+        if session_index is None:
+            if not documents:
+                return None
+            session_index = create_session_index()
+        if session_index.catalog_revision != revision:
+            await asyncio.to_thread(_sync_session_index, session_index, revision, documents)
+        if not documents:
+            if retriever_store.get(session_id) is session_index:
+                del retriever_store[session_id]
+            return None
+        # 다른 워커에서 인제스트 중인 문서만 있으면 빈 인덱스 (질의는 409 로 재시도 안내)
+        retriever_store[session_id] = session_index
+        return session_index
+
 # ============================================
 # 데이터 모델
 # ============================================
@@ -30,6 +159,13 @@ class RAGQueryRequest(BaseModel):
     model: str = "gpt-4o"
     prompt_file: str
     temperature: Optional[float] = 0.0
+    rag_mode: Optional[str] = "naive"
+    pipeline_file: Optional[str] = None
+    use_cache: Optional[bool] = True
+    # 검색 대상 제한 (문서 id 목록, 페이지 범위는 1부터 양끝 포함)
+    document_ids: Optional[List[str]] = None
+    page_start: Optional[int] = None
+    page_end: Optional[int] = None
 
 
 class RAGUploadResponse(BaseModel):
@@ -38,6 +174,9 @@ class RAGUploadResponse(BaseModel):
     filename: str
     session_id: str
     file_path: str
+    job_id: str
+    status: str
+    document_id: str
 
 
 # ============================================
@@ -50,10 +189,14 @@ async def upload_pdf(
     file: UploadFile = File(...)
 ):
     """
-    PDF 파일 업로드 및 임베딩 처리
-
-    업로드된 PDF 파일을 저장하고, 벡터 DB로 변환하여
-    세션에 연결된 retriever를 생성합니다.
+    PDF 파일 업로드 및 임베딩 작업 시작
+
+    업로드된 PDF 파일을 저장하고 인제스트 작업을 백그라운드로 시작한 뒤
+    즉시 job_id를 반환합니다. 진행 상황은 /jobs/{job_id} 로 조회하며,
+    세션에는 즉시 retriever가 연결되며, 앞쪽 페이지부터 인덱싱되는 대로 질의할 수 있습니다.
+    같은 세션에 여러 PDF 를 올리면 기존 문서에 추가되며, 같은 파일명은 교체됩니다.
+    다른 세션이 이미 올린 PDF(내용 기준)이면 인제스트 없이 공유 인덱스를 참조하고,
+    진행 중인 인제스트가 있으면 그 job_id 를 반환합니다.
     """
     try:
         # 파일 확장자 확인
@@ -63,36 +206,173 @@ async def upload_pdf(
                 detail="Only PDF files are supported"
             )
 
-        # 파일 저장 디렉토리 생성
-        os.makedirs(FILES_DIR, exist_ok=True)
-
-        # 파일 저장
-        file_path = os.path.join(FILES_DIR, file.filename)
-        with open(file_path, "wb") as f:
-            content = await file.read()
-            f.write(content)
+        # 공유 문서 레지스트리 키 (PDF 내용 해시 + 분할/임베딩 설정)
+        content = await file.read()
+        index_key = await asyncio.to_thread(
+            compute_content_index_key, content, RAG_CHUNK_SIZE, RAG_CHUNK_OVERLAP, EMBEDDING_MODEL
+        )
 
-        # Retriever 생성 (RAG 1~5단계)
-        retriever = create_rag_retriever(file_path)
+        # 파일 저장 (내용 해시 경로, 원본 파일명은 표시용으로만 사용)
+        file_path = await asyncio.to_thread(_save_upload, content, index_key)
+        session_index = await _session_index(session_id) or create_session_index()
+        entry, created = document_registry.acquire(
+            index_key, lambda: create_document_index(session_index.embeddings)
+        )
 
-        # 세션에 저장
-        retriever_store[session_id] = {
-            "retriever": retriever,
-            "filename": file.filename,
-            "file_path": file_path
-        }
+        if created:
+            # 인제스트 작업 생성 및 제출 (RAG 1~5단계, 이벤트 루프 밖에서 실행)
+            job = create_job(session_id, file.filename)
+            try:
+                entry["future"] = submit_ingest(_run_ingest_job, job["job_id"], file_path, entry["index"])
+            except IngestQueueFullError as e:
+                set_job_status(job["job_id"], "failed", error=str(e))
+                document_registry.discard(index_key)
+                raise
+            entry["job_id"] = job["job_id"]
+            status = job["status"]
+            message = "File uploaded, processing started"
+        else:
+            # 이미 인덱싱되었거나 인덱싱 중인 문서 재사용
+            job = get_job(entry["job_id"]) if entry["job_id"] is not None else None
+            if job is None:
+                # 작업 기록 없이 디스크에서 연 인덱스이거나 완료된 작업 기록이 정리된 경우:
+                # 조회 가능한 완료 상태 작업으로 응답 (진행 중인 작업은 정리되지 않음)
+                job = create_completed_job(session_id, file.filename)
+                entry["job_id"] = job["job_id"]
+            status = job["status"]
+            message = "File uploaded, reusing shared document index"
+
+        # 세션에 문서 추가 (첫 청크가 인덱싱되는 즉시 질의 가능)
+        async with _catalog_lock:
+            document_id = session_index.add_document(
+                entry["index"], file.filename, file_path, entry["job_id"], registry_key=index_key
+            )
+            retriever_store[session_id] = session_index
+            if session_catalog is not None:
+                # 다른 워커는 인덱싱이 끝나 디스크에 저장된 뒤 이 문서를 붙임
+                session_index.catalog_revision = None
+                await asyncio.to_thread(
+                    session_catalog.add, session_id, document_id, index_key,
+                    file.filename, file_path, entry["job_id"],
+                )
+
+        task = asyncio.create_task(
+            _finish_ingest_job(
+                entry["job_id"], entry["future"], session_id, session_index, document_id,
+                index_key, owner=created
+            )
+        )
+        _ingest_tasks.add(task)
+        task.add_done_callback(_ingest_tasks.discard)
 
         return RAGUploadResponse(
-            message="File uploaded and processed successfully",
+            message=message,
             filename=file.filename,
             session_id=session_id,
-            file_path=file_path
+            file_path=file_path,
+            job_id=entry["job_id"],
+            status=status,
+            document_id=document_id
         )
 
+    except HTTPException:
+        raise
+    except IngestQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _save_upload(content: bytes, index_key: str) -> str:
+    """
+    업로드 PDF 를 FILES_DIR/<index_key>.pdf 에 저장 (블로킹)
+
+    같은 이름의 다른 PDF 가 인제스트 전에 파일을 덮어쓰지 않도록 내용 해시로 경로를 정하고,
+    임시 파일에 쓴 뒤 os.replace 로 교체하여 읽는 쪽이 쓰다 만 파일을 보지 않게 합니다.
+
+    Returns:
+        str: 저장된 파일 경로
+    """
+    os.makedirs(FILES_DIR, exist_ok=True)
+    file_path = os.path.join(FILES_DIR, f"{index_key}.pdf")
+    if os.path.exists(file_path):
+        # 같은 내용의 PDF 가 이미 저장됨
+        return file_path
+    fd, tmp_path = tempfile.mkstemp(dir=FILES_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return file_path
+
+
+def _run_ingest_job(job_id: str, file_path: str, index):
+    """
+    인제스트 스레드에서 실행되는 작업 본문
+    """
+    set_job_status(job_id, "running")
+    return ingest_document(file_path, index, progress=make_progress_callback(job_id))
+
+
+async def _finish_ingest_job(
+    job_id: str,
+    future,
+    session_id: str,
+    session_index,
+    document_id: str,
+    index_key: str,
+    owner: bool = True,
+):
+    """
+    인제스트 완료 대기 후 작업 상태 갱신 (실패 시 세션에서 문서 제거)
+
+    같은 공유 인덱스를 참조하는 업로드마다 호출되며, 작업 상태 갱신과
+    레지스트리 정리는 인제스트를 시작한 업로드(owner)만 수행합니다.
+    """
+    try:
+        if future is not None:
+            # 디스크에서 연 항목 (future 없음) 은 이미 인제스트 완료
+            await future
+    except Exception as e:
+        if owner:
+            set_job_status(job_id, "failed", error=str(e))
+            document_registry.discard(index_key)
+        async with _catalog_lock:
+            session_index.remove_document(document_id)
+            if session_catalog is not None:
+                session_index.catalog_revision = None
+                await asyncio.to_thread(session_catalog.remove, session_id, document_id)
+            if len(session_index) == 0 and retriever_store.get(session_id) is session_index:
+                del retriever_store[session_id]
+        return
+
+    if owner:
+        set_job_status(job_id, "completed")
+        # 인덱싱이 끝난 인덱스는 메모리 예산 관리 대상 (크기 계산은 docstore 순회)
+        entry = document_registry.get(index_key)
+        if entry is not None:
+            await asyncio.to_thread(index_cache.track, entry["index"])
+
+
+@router.get("/jobs/{job_id}")
+async def get_ingest_job(job_id: str):
+    """
+    인제스트 작업 진행 상황 조회
+
+    단계별(pages_parsed, chunks_split, chunks_embedded, index_built)
+    진행 개수와 전체 진행률을 반환합니다.
+    """
+    job = get_job(job_id)
+
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return job
+
+
 @router.post("/query")
 async def rag_query(request: RAGQueryRequest):
     """
@@ -103,36 +383,122 @@ async def rag_query(request: RAGQueryRequest):
     """
     try:
         # Retriever 가져오기
-        session_data = retriever_store.get(request.session_id)
+        index = await _session_index(request.session_id)
 
-        if not session_data:
+        if index is None:
             raise HTTPException(
                 status_code=400,
                 detail="No file uploaded for this session. Please upload a PDF file first."
             )
 
-        retriever = session_data["retriever"]
+        # 아직 인덱싱된 청크가 없으면 잠시 후 재시도
+        if index.chunk_count == 0:
+            raise HTTPException(
+                status_code=409,
+                detail="Document is still being indexed. Please try again shortly."
+            )
+
+        # 문서/페이지 범위 필터
+        search_filter = SearchFilter(
+            document_ids=tuple(request.document_ids) if request.document_ids is not None else None,
+            page_start=request.page_start,
+            page_end=request.page_end,
+        )
+        try:
+            index.validate_filter(search_filter)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        retriever = index.as_retriever(search_filter=None if search_filter.is_empty else search_filter)
+
+        # 답변 캐시 조회 (인덱싱이 끝난 문서만 대상)
+        cache_bucket = None
+        question_embedding = None
+        if (
+            ANSWER_CACHE_ENABLED
+            and request.use_cache
+            and index.complete
+            and index.index_key
+        ):
+            cache_bucket = make_bucket_key(
+                index.index_key,
+                request.prompt_file,
+                request.model,
+                request.rag_mode,
+                request.pipeline_file,
+                search_filter.cache_scope(),
+            )
+            start = time.perf_counter()
+            question_embedding = await index.embeddings.aembed_query(request.question)
+            cached = answer_cache.lookup(cache_bucket, question_embedding)
+            if cached is not None:
+                lookup_ms = (time.perf_counter() - start) * 1000
+                return StreamingResponse(
+                    _replay_cached_answer(cached, request.rag_mode, lookup_ms),
+                    media_type="text/event-stream",
+                    headers={
+                        "Cache-Control": "no-cache",
+                        "Connection": "keep-alive",
+                    }
+                )
 
         # Chain 생성 (RAG 6~8단계)
-        chain = create_rag_chain(
-            prompt_file=request.prompt_file,
-            retriever=retriever,
-            model=request.model,
-            temperature=request.temperature
-        )
+        timings = {}
+
+        # 검색할 문서 인덱스 고정 (메모리 예산 초과로 내려간 인덱스는 디스크에서 다시 로드)
+        document_indexes = index.indexes()
+        spilled = any(not i.resident for i in document_indexes)
+        start = time.perf_counter()
+        pinned = await asyncio.to_thread(index_cache.acquire, document_indexes)
+        if spilled:
+            timings["index_reload_ms"] = (time.perf_counter() - start) * 1000
+
+        try:
+            chain = create_rag_chain(
+                prompt_file=request.prompt_file,
+                retriever=retriever,
+                model=request.model,
+                temperature=request.temperature,
+                rag_mode=request.rag_mode,
+                timings=timings,
+                pipeline_file=request.pipeline_file
+            )
+        except (ValueError, FileNotFoundError) as e:
+            index_cache.release(pinned)
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception:
+            index_cache.release(pinned)
+            raise
 
         # 스트리밍 응답
         async def generate():
             try:
+                start = time.perf_counter()
+                answer = []
                 async for chunk in chain.astream(request.question):
+                    if "first_token_ms" not in timings:
+                        timings["first_token_ms"] = (time.perf_counter() - start) * 1000
+                    answer.append(chunk)
                     yield f"data: {json.dumps({'token': chunk})}\n\n"
 
+                # 완성된 답변만 캐시에 저장
+                if cache_bucket is not None:
+                    answer_cache.store(cache_bucket, request.question, question_embedding, "".join(answer))
+                    timings["cache"] = "miss"
+
+                # 단계별 소요 시간
+                timings["total_ms"] = (time.perf_counter() - start) * 1000
+                yield f"data: {json.dumps({'timings': {'rag_mode': request.rag_mode, **timings}})}\n\n"
+
                 # 스트리밍 종료 신호
                 yield "data: [DONE]\n\n"
 
             except Exception as e:
                 yield f"data: {json.dumps({'error': str(e)})}\n\n"
 
+            finally:
+                index_cache.release(pinned)
+
         return StreamingResponse(
             generate(),
             media_type="text/event-stream",
@@ -142,10 +508,28 @@ async def rag_query(request: RAGQueryRequest):
             }
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def _replay_cached_answer(cached: dict, rag_mode: str, lookup_ms: float):
+    """캐시된 답변을 스트리밍 응답과 같은 SSE 형식으로 재생"""
+    for chunk in split_for_replay(cached["answer"]):
+        yield f"data: {json.dumps({'token': chunk})}\n\n"
+
+    timings = {
+        "rag_mode": rag_mode,
+        "cache": "hit",
+        "cache_similarity": round(cached["similarity"], 4),
+        "cache_lookup_ms": lookup_ms,
+        "total_ms": lookup_ms,
+    }
+    yield f"data: {json.dumps({'timings': timings})}\n\n"
+    yield "data: [DONE]\n\n"
+
+
 @router.get("/prompts")
 async def list_rag_prompts():
     """
@@ -158,35 +542,151 @@ async def list_rag_prompts():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/pipelines")
+async def list_rag_pipelines():
+    """
+    사용 가능한 Modular RAG 파이프라인 파일 목록 조회
+    """
+    try:
+        pipelines = get_available_prompts("pipeline")
+        return {"pipelines": pipelines}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/cache/pipeline-stages")
+async def pipeline_stage_cache_stats():
+    """
+    Modular RAG stage 결과 캐시 통계 조회
+    """
+    return get_stage_cache_stats()
+
+
+@router.get("/cache/answers")
+async def answer_cache_stats():
+    """
+    RAG 답변 시맨틱 캐시 통계 조회 (항목 수, 적중률 등)
+    """
+    return answer_cache.stats()
+
+
+@router.delete("/cache/answers")
+async def clear_answer_cache():
+    """
+    RAG 답변 시맨틱 캐시 비우기
+    """
+    answer_cache.clear()
+    return {"message": "Answer cache cleared"}
+
+
+@router.get("/documents/registry")
+async def document_registry_stats():
+    """
+    세션 간 공유 문서 인덱스 현황 조회 (참조 수, 중복 제거 횟수, 워커 간 세션 문서 목록)
+    """
+    return {
+        **document_registry.stats(),
+        "catalog": session_catalog.stats() if session_catalog is not None else {"catalog": "memory"},
+    }
+
+
+@router.get("/cache/indexes")
+async def index_cache_stats():
+    """
+    문서 인덱스 메모리 예산 현황 조회 (메모리 상주 바이트, spill/reload 횟수, reload 지연)
+    """
+    return index_cache.stats()
+
+
+@router.get("/cache/embeddings")
+async def embedding_cache_stats():
+    """
+    청크 임베딩 캐시 통계 조회
+    """
+    return get_embedding_store().stats()
+
+
 @router.get("/session/{session_id}/document")
 async def get_session_document(session_id: str):
     """
-    세션에 업로드된 문서 정보 조회
+    세션에 업로드된 문서 정보 조회 (가장 최근 문서 + 전체 문서 수)
     """
-    session_data = retriever_store.get(session_id)
+    index = await _session_index(session_id)
+    documents = index.list_documents() if index else []
 
-    if not session_data:
+    if not documents:
         return {
             "session_id": session_id,
             "has_document": False,
             "filename": None
         }
 
+    latest = documents[-1]
+
     return {
         "session_id": session_id,
         "has_document": True,
-        "filename": session_data["filename"],
-        "file_path": session_data["file_path"]
+        "filename": latest["filename"],
+        "file_path": latest["file_path"],
+        "job_id": latest["job_id"],
+        "document_id": latest["document_id"],
+        "document_count": len(documents),
+        "indexing": latest["indexing"]
+    }
+
+
+@router.get("/session/{session_id}/documents")
+async def list_session_documents(session_id: str):
+    """
+    세션에 업로드된 전체 문서 목록 조회
+    """
+    index = await _session_index(session_id)
+
+    return {
+        "session_id": session_id,
+        "documents": index.list_documents() if index else [],
+        "indexing": index.status() if index is not None else None
+    }
+
+
+@router.delete("/session/{session_id}/documents/{document_id}")
+async def delete_session_document(session_id: str, document_id: str):
+    """
+    세션에서 문서 하나 제거 (다른 문서의 인덱스는 그대로 유지)
+    """
+    index = await _session_index(session_id)
+
+    async with _catalog_lock:
+        removed = index is not None and index.remove_document(document_id)
+        if session_catalog is not None:
+            if index is not None:
+                index.catalog_revision = None
+            removed = await asyncio.to_thread(session_catalog.remove, session_id, document_id) or removed
+
+    if not removed:
+        raise HTTPException(status_code=404, detail="Document not found")
+
+    return {
+        "message": "Document removed successfully",
+        "session_id": session_id,
+        "document_id": document_id
     }
 
 
 @router.delete("/session/{session_id}")
 async def delete_rag_session(session_id: str):
     """
-    RAG 세션 삭제 (retriever 제거)
+    RAG 세션 삭제 (retriever 제거, 공유 문서 인덱스 참조 반환)
     """
-    if session_id in retriever_store:
-        del retriever_store[session_id]
+    async with _catalog_lock:
+        index = retriever_store.pop(session_id, None)
+        if index is not None:
+            index.clear()
+        removed = index is not None
+        if session_catalog is not None:
+            removed = await asyncio.to_thread(session_catalog.clear, session_id) or removed
+
+    if removed:
         return {"message": "RAG session deleted successfully", "session_id": session_id}
     else:
         return {"message": "RAG session not found", "session_id": session_id}
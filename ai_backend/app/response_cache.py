@@ -0,0 +1,235 @@
+# ============================================
+# Response Cache - temperature 0 채팅 응답 캐시
+# ============================================
+
+import abc
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from langchain_core.messages import BaseMessage
+
+from app.config import (
+    RESPONSE_CACHE_BACKEND,
+    RESPONSE_CACHE_MAX_ENTRIES,
+    RESPONSE_CACHE_PATH,
+)
+
+# 지원하는 저장소 종류 ("none" 이면 캐시 비활성화)
+RESPONSE_CACHE_BACKENDS = ["none", "memory", "sqlite"]
+
+
+def history_digest(messages: Iterable[BaseMessage]) -> str:
+    """대화 히스토리 내용(역할 + 본문) 해시"""
+    digest = hashlib.sha256()
+    for message in messages:
+        digest.update(message.type.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(str(message.content).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def make_response_key(
+    prompt_file: str,
+    task: Optional[str],
+    model: str,
+    history: str,
+    message: str,
+) -> str:
+    """
+    (prompt_file, task, model, history digest, message) 캐시 키
+
+    프롬프트 파일이 수정되면 이전 응답을 재사용하지 않도록 mtime 을 함께 포함합니다.
+    """
+    mtime = os.stat(prompt_file).st_mtime_ns
+    payload = json.dumps(
+        [prompt_file, mtime, task or "", model, history, message],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ============================================
+# 저장소
+# ============================================
+
+
+class ResponseStore(abc.ABC):
+    """응답 캐시 저장소 인터페이스"""
+
+    backend = "none"
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    @abc.abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """캐시된 응답 조회 (없으면 None)"""
+
+    @abc.abstractmethod
+    def put(self, key: str, answer: str) -> None:
+        """응답 저장 (max_entries 초과 시 오래된 항목 제거)"""
+
+    @abc.abstractmethod
+    def clear(self) -> None:
+        """모든 항목 삭제"""
+
+    @abc.abstractmethod
+    def __len__(self) -> int:
+        """저장된 항목 수"""
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend,
+            "entries": len(self),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+        }
+
+
+class MemoryResponseStore(ResponseStore):
+    """프로세스 메모리 LRU 저장소"""
+
+    backend = "memory"
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES):
+        super().__init__(max_entries)
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            answer = self._entries.get(key)
+            if answer is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return answer
+
+    def put(self, key: str, answer: str) -> None:
+        with self._lock:
+            self._entries[key] = answer
+            self._entries.move_to_end(key)
+            self.stores += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteResponseStore(ResponseStore):
+    """
+    디스크 SQLite 저장소
+
+    서버를 재시작해도 응답이 유지되며, 항목 수가 max_entries 를 넘으면
+    마지막 사용 시각이 가장 오래된 항목부터 삭제합니다.
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, path: str = RESPONSE_CACHE_PATH, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES):
+        super().__init__(max_entries)
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " answer TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT answer FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, answer: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, answer, created_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, answer, now, now),
+            )
+            self.stores += 1
+            count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            if count > self.max_entries:
+                excess = count - self.max_entries
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    " SELECT key FROM responses ORDER BY last_used LIMIT ?)",
+                    (excess,),
+                )
+                self.evictions += excess
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def create_response_store(backend: str = RESPONSE_CACHE_BACKEND) -> Optional[ResponseStore]:
+    """
+    설정된 종류의 응답 캐시 저장소 생성
+
+    Returns:
+        ResponseStore 또는 None ("none" 인 경우)
+    """
+    if backend not in RESPONSE_CACHE_BACKENDS:
+        raise ValueError(
+            f"Invalid RESPONSE_CACHE_BACKEND '{backend}'. "
+            f"Choose one of {RESPONSE_CACHE_BACKENDS}"
+        )
+    if backend == "memory":
+        return MemoryResponseStore()
+    if backend == "sqlite":
+        return SQLiteResponseStore()
+    return None
+
+
+# 프로세스 전체에서 공유하는 응답 캐시 (비활성화 시 None)
+response_store = create_response_store()
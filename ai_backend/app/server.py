@@ -0,0 +1,343 @@
+# ============================================
+# Server - 운영용 멀티 워커 실행 (prefork)
+# ============================================
+"""
+운영 서버 진입점
+
+    python -m app.server
+    SERVER_WORKERS=4 SERVER_PORT=8000 python -m app.server
+
+마스터 프로세스가 listen 소켓을 열고 무거운 라이브러리 (langchain, openai, FAISS,
+pdfplumber 등) 를 먼저 import 한 뒤 워커를 fork 합니다. 워커들은 import 된 모듈
+메모리를 copy-on-write 로 공유하고 같은 소켓에서 연결을 받으므로, 워커마다 import
+비용을 다시 치르지 않습니다. 앱 모듈 (app.main) 은 sqlite 연결 등 프로세스별 상태를
+import 시점에 만들기 때문에 fork 이후 각 워커에서 로드합니다.
+
+SIGTERM / SIGINT 를 받으면 워커들에 SIGTERM 을 보내고, 워커는 새 연결을 받지 않은 채
+진행 중인 요청을 SERVER_GRACEFUL_TIMEOUT 까지 마친 뒤 lifespan 종료 처리 (히스토리
+기록 flush 등) 를 실행합니다. 비정상 종료한 워커는 다시 띄웁니다.
+"""
+
+import asyncio
+import importlib
+import importlib.util
+import os
+import select
+import signal
+import sys
+import time
+from typing import Dict, Optional
+
+import uvicorn
+
+from app.config import (
+    SERVER_HOST,
+    SERVER_PORT,
+    SERVER_BACKLOG,
+    SERVER_WORKERS,
+    SERVER_LOOP,
+    SERVER_HTTP,
+    SERVER_PRELOAD,
+    SERVER_GRACEFUL_TIMEOUT,
+    SERVER_KEEPALIVE_TIMEOUT,
+    SERVER_LOG_LEVEL,
+    SERVER_ACCESS_LOG,
+    HISTORY_BACKEND,
+    RAG_SESSION_CATALOG,
+)
+
+SERVER_LOOPS = ["auto", "uvloop", "asyncio"]
+SERVER_HTTPS = ["auto", "httptools", "h11"]
+
+# fork 전에 마스터에서 import 할 라이브러리 (app.main import 시간의 대부분)
+_PRELOAD_MODULES = (
+    "numpy",
+    "faiss",
+    "fastapi",
+    "fastapi.middleware.cors",
+    "pydantic",
+    "httpx",
+    "openai",
+    "langchain_core.language_models.chat_models",
+    "langchain_core.runnables",
+    "langchain_core.prompts",
+    "langchain_core.output_parsers",
+    "langchain_openai",
+    "langchain_community.vectorstores",
+    "langchain_community.docstore.base",
+    "langchain_text_splitters",
+    "pdfplumber",
+    "tiktoken",
+    "redis",
+    "uvloop",
+    "httptools",
+)
+
+# lifespan 종료 처리 (히스토리 flush, 실행기 종료) 에 graceful timeout 이후 추가로 주는 시간 (초)
+_SHUTDOWN_MARGIN = 15.0
+
+# 워커 생존 확인 주기 (초)
+_POLL_INTERVAL = 0.2
+
+# 현재 프로세스의 워커 정보 (python -m app.server 로 실행한 워커에서 설정)
+_worker: Dict[str, object] = {"worker_id": None, "workers": None, "master_pid": None, "http": None}
+_started_at = time.time()
+
+
+def resolve_loop(loop: str = SERVER_LOOP) -> str:
+    """"auto" 를 실제 사용할 이벤트 루프 이름으로 변환"""
+    if loop not in SERVER_LOOPS:
+        raise ValueError(f"Invalid SERVER_LOOP '{loop}'. Choose one of {SERVER_LOOPS}")
+    if loop == "auto":
+        return "uvloop" if importlib.util.find_spec("uvloop") is not None else "asyncio"
+    return loop
+
+
+def resolve_http(http: str = SERVER_HTTP) -> str:
+    """"auto" 를 실제 사용할 HTTP 파서 이름으로 변환"""
+    if http not in SERVER_HTTPS:
+        raise ValueError(f"Invalid SERVER_HTTP '{http}'. Choose one of {SERVER_HTTPS}")
+    if http == "auto":
+        return "httptools" if importlib.util.find_spec("httptools") is not None else "h11"
+    return http
+
+
+def preload_modules() -> float:
+    """
+    워커가 공유할 라이브러리 import (설치되지 않은 선택 패키지는 건너뜀)
+
+    Returns:
+        float: 소요 시간 (초)
+    """
+    start = time.perf_counter()
+    for name in _PRELOAD_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+    return time.perf_counter() - start
+
+
+class _WorkerServer(uvicorn.Server):
+    """lifespan startup 까지 끝나면 마스터에 준비 완료를 알리는 uvicorn 서버"""
+
+    def __init__(self, config: uvicorn.Config, ready_fd: int):
+        super().__init__(config)
+        self._ready_fd = ready_fd
+
+    async def startup(self, sockets=None) -> None:
+        await super().startup(sockets=sockets)
+        if not self.should_exit:
+            os.write(self._ready_fd, b"%d\n" % os.getpid())
+
+
+class PreforkServer:
+    """
+    listen 소켓을 공유하는 uvicorn 워커 프로세스들을 fork 하고 관리하는 마스터
+    """
+
+    def __init__(
+        self,
+        workers: int = SERVER_WORKERS,
+        host: str = SERVER_HOST,
+        port: int = SERVER_PORT,
+        loop: str = SERVER_LOOP,
+        http: str = SERVER_HTTP,
+        preload: bool = SERVER_PRELOAD,
+        graceful_timeout: float = SERVER_GRACEFUL_TIMEOUT,
+    ):
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.loop = resolve_loop(loop)
+        self.http = resolve_http(http)
+        self.preload = preload
+        self.graceful_timeout = graceful_timeout
+        self.config = uvicorn.Config(
+            "app.main:app",
+            host=host,
+            port=port,
+            backlog=SERVER_BACKLOG,
+            loop=self.loop,
+            http=self.http,
+            lifespan="on",
+            timeout_keep_alive=SERVER_KEEPALIVE_TIMEOUT,
+            timeout_graceful_shutdown=graceful_timeout,
+            log_level=SERVER_LOG_LEVEL,
+            access_log=SERVER_ACCESS_LOG,
+        )
+        # pid -> 워커 번호 / 준비 완료한 워커 pid
+        self._children: Dict[int, int] = {}
+        self._ready = set()
+        self._stopping = False
+        self._exit_code = 0
+        self.startup_s: Optional[float] = None
+        self.preload_s = 0.0
+        self.restarts = 0
+
+    # ----------------------------------------
+    # 워커
+    # ----------------------------------------
+
+    def _spawn(self, worker_id: int) -> None:
+        pid = os.fork()
+        if pid:
+            self._children[pid] = worker_id
+            return
+
+        # 워커 프로세스 (마스터의 시그널 처리를 되돌리고 uvicorn 에 맡김)
+        code = 0
+        try:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            os.close(self._ready_r)
+            _worker.update(
+                worker_id=worker_id,
+                workers=self.workers,
+                master_pid=os.getppid(),
+                http=self.http,
+            )
+            global _started_at
+            _started_at = time.time()
+            _WorkerServer(self.config, self._ready_w).run(sockets=[self._socket])
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else 1
+        except BaseException as e:
+            print(f"[ERROR] worker {worker_id} crashed: {e}", file=sys.stderr)
+            code = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(code)
+
+    def _read_ready(self, timeout: float) -> None:
+        readable, _, _ = select.select([self._ready_r], [], [], timeout)
+        if not readable:
+            return
+        data = os.read(self._ready_r, 4096)
+        for pid in data.split():
+            self._ready.add(int(pid))
+        if self.startup_s is None and len(self._ready) >= self.workers:
+            self.startup_s = time.perf_counter() - self._started
+            print(
+                f"[INFO] {self.workers} worker(s) ready in {self.startup_s:.2f}s "
+                f"(preload {self.preload_s:.2f}s, loop={self.loop}, http={self.http})",
+                flush=True,
+            )
+
+    def _reap(self) -> None:
+        while self._children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self._children.clear()
+                return
+            if pid == 0:
+                return
+            worker_id = self._children.pop(pid, None)
+            if worker_id is None:
+                continue
+            booted = pid in self._ready
+            self._ready.discard(pid)
+            if self._stopping:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            if not booted:
+                # 시작 중 실패 (설정 오류 등) 는 다시 띄워도 반복되므로 서버 전체 종료
+                print(f"[ERROR] worker {worker_id} failed to boot (exit {code}), shutting down", file=sys.stderr)
+                self._exit_code = 1
+                self.stop()
+                continue
+            print(f"[WARN] worker {worker_id} (pid {pid}) exited with {code}, restarting", file=sys.stderr)
+            self.restarts += 1
+            self._spawn(worker_id)
+
+    # ----------------------------------------
+    # 시작 / 종료
+    # ----------------------------------------
+
+    def _warn_unshared_state(self) -> None:
+        if self.workers <= 1:
+            return
+        if HISTORY_BACKEND == "memory":
+            print("[WARN] HISTORY_BACKEND=memory: chat history is not shared between workers", file=sys.stderr)
+        if RAG_SESSION_CATALOG == "memory":
+            print("[WARN] RAG_SESSION_CATALOG=memory: RAG sessions are not shared between workers", file=sys.stderr)
+
+    def stop(self, *_) -> None:
+        """워커들에 SIGTERM 을 보내 진행 중인 요청을 마치고 종료하도록 함"""
+        if self._stopping:
+            return
+        self._stopping = True
+        for pid in list(self._children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def _drain(self) -> None:
+        deadline = time.monotonic() + self.graceful_timeout + _SHUTDOWN_MARGIN
+        while self._children and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(_POLL_INTERVAL)
+        for pid in list(self._children):
+            print(f"[WARN] worker pid {pid} did not stop in time, killing", file=sys.stderr)
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+        self._children.clear()
+
+    def run(self) -> int:
+        """
+        워커를 띄우고 종료 시그널을 받을 때까지 관리
+
+        Returns:
+            int: 종료 코드 (워커 시작 실패 시 1)
+        """
+        self._started = time.perf_counter()
+        self._warn_unshared_state()
+        self._socket = self.config.bind_socket()
+        if self.preload:
+            self.preload_s = preload_modules()
+        self._ready_r, self._ready_w = os.pipe()
+
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        for worker_id in range(self.workers):
+            self._spawn(worker_id)
+
+        while not self._stopping:
+            try:
+                self._read_ready(_POLL_INTERVAL)
+            except InterruptedError:
+                pass
+            self._reap()
+
+        self._drain()
+        self._socket.close()
+        return self._exit_code
+
+
+def get_server_stats() -> dict:
+    """
+    현재 워커 프로세스 정보 (pid, 워커 번호, 이벤트 루프 종류, 가동 시간)
+    """
+    loop = asyncio.get_running_loop()
+    return {
+        "pid": os.getpid(),
+        **_worker,
+        "loop": f"{type(loop).__module__}.{type(loop).__name__}",
+        "uptime_s": round(time.time() - _started_at, 1),
+    }
+
+
+def main() -> None:
+    sys.exit(PreforkServer().run())
+
+
+if __name__ == "__main__":
+    # python -m 으로 실행하면 이 파일은 __main__ 으로 로드되므로, 워커 정보가
+    # app.main 에서 import 하는 app.server 모듈에 기록되도록 그 모듈을 통해 실행
+    from app.server import main as _main
+
+    _main()
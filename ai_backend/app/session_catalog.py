@@ -0,0 +1,240 @@
+# ============================================
+# Session Catalog - 워커 간 공유되는 세션별 문서 목록
+# ============================================
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from app.config import RAG_SESSION_CATALOG, RAG_SESSION_CATALOG_PATH
+
+RAG_SESSION_CATALOGS = ["memory", "sqlite"]
+
+
+class SessionCatalog:
+    """
+    세션 ID -> 업로드된 문서 (문서 id, 인덱스 키, 파일명) 목록 (SQLite, WAL)
+
+    uvicorn 워커 프로세스마다 retriever_store 가 따로 있으므로, 한 워커에서 올린
+    문서를 다른 워커가 찾을 수 있도록 세션의 문서 목록만 공유합니다. 인덱스 자체는
+    디스크 인덱스를 각 워커가 memory-map 으로 열어 페이지 캐시를 공유합니다.
+    세션별 revision 은 문서가 추가/삭제될 때마다 증가하며, 워커는 자신이 반영한
+    revision 과 다를 때만 문서 목록을 다시 읽습니다. 인제스트 작업 상태도 함께 기록하여
+    작업을 실행하지 않는 워커에서도 /jobs/{job_id} 를 조회할 수 있습니다.
+    """
+
+    def __init__(self, path: str = RAG_SESSION_CATALOG_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            " session_id TEXT NOT NULL,"
+            " document_id TEXT NOT NULL,"
+            " index_key TEXT NOT NULL,"
+            " filename TEXT NOT NULL,"
+            " file_path TEXT NOT NULL,"
+            " job_id TEXT,"
+            " created_at REAL NOT NULL,"
+            " PRIMARY KEY (session_id, document_id)) WITHOUT ROWID"
+        )
+        # 세션이 비워져도 revision 은 남겨 다시 올린 문서와 이전 목록이 같은 revision 이 되지 않게 함
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS revisions ("
+            " session_id TEXT PRIMARY KEY,"
+            " revision INTEGER NOT NULL) WITHOUT ROWID"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " job_id TEXT PRIMARY KEY,"
+            " job TEXT NOT NULL,"
+            " finished_at REAL)"
+        )
+        self._conn.commit()
+        self.reads = 0
+        self.writes = 0
+
+    def _bump(self, session_id: str) -> int:
+        # 호출자가 self._lock 보유, 트랜잭션 안에서 호출
+        self._conn.execute(
+            "INSERT INTO revisions (session_id, revision) VALUES (?, 1)"
+            " ON CONFLICT (session_id) DO UPDATE SET revision = revision + 1",
+            (session_id,),
+        )
+        return self._conn.execute(
+            "SELECT revision FROM revisions WHERE session_id = ?", (session_id,)
+        ).fetchone()[0]
+
+    def add(
+        self,
+        session_id: str,
+        document_id: str,
+        index_key: str,
+        filename: str,
+        file_path: str,
+        job_id: Optional[str] = None,
+    ) -> int:
+        """
+        문서 추가 (같은 파일명 또는 같은 인덱스 키의 기존 문서는 교체, SessionIndex 와 동일)
+
+        Returns:
+            int: 변경 후 세션 revision
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM documents WHERE session_id = ? AND (filename = ? OR index_key = ?)",
+                (session_id, filename, index_key),
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO documents"
+                " (session_id, document_id, index_key, filename, file_path, job_id, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (session_id, document_id, index_key, filename, file_path, job_id, time.time()),
+            )
+            self.writes += 1
+            return self._bump(session_id)
+
+    def remove(self, session_id: str, document_id: str) -> bool:
+        """문서 하나 제거"""
+        with self._lock, self._conn:
+            removed = self._conn.execute(
+                "DELETE FROM documents WHERE session_id = ? AND document_id = ?",
+                (session_id, document_id),
+            ).rowcount
+            if removed:
+                self.writes += 1
+                self._bump(session_id)
+            return bool(removed)
+
+    def clear(self, session_id: str) -> bool:
+        """세션의 모든 문서 제거"""
+        with self._lock, self._conn:
+            removed = self._conn.execute(
+                "DELETE FROM documents WHERE session_id = ?", (session_id,)
+            ).rowcount
+            if removed:
+                self.writes += 1
+                self._bump(session_id)
+            return bool(removed)
+
+    def revision(self, session_id: str) -> int:
+        """세션 revision (문서가 한 번도 없었으면 0)"""
+        with self._lock:
+            self.reads += 1
+            row = self._conn.execute(
+                "SELECT revision FROM revisions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return row[0] if row else 0
+
+    def documents(self, session_id: str) -> Tuple[int, List[dict]]:
+        """
+        세션 문서 목록 (업로드 순서)
+
+        Returns:
+            (revision, documents): 목록과 같은 시점의 revision
+        """
+        with self._lock:
+            self.reads += 1
+            self._conn.execute("BEGIN")
+            try:
+                row = self._conn.execute(
+                    "SELECT revision FROM revisions WHERE session_id = ?", (session_id,)
+                ).fetchone()
+                rows = self._conn.execute(
+                    "SELECT document_id, index_key, filename, file_path, job_id FROM documents"
+                    " WHERE session_id = ? ORDER BY created_at",
+                    (session_id,),
+                ).fetchall()
+            finally:
+                self._conn.execute("COMMIT")
+        documents = [
+            {
+                "document_id": document_id,
+                "index_key": index_key,
+                "filename": filename,
+                "file_path": file_path,
+                "job_id": job_id,
+            }
+            for document_id, index_key, filename, file_path, job_id in rows
+        ]
+        return (row[0] if row else 0), documents
+
+    # ----------------------------------------
+    # 인제스트 작업 상태
+    # ----------------------------------------
+
+    def put_job(self, job: dict) -> None:
+        """인제스트 작업 상태 기록 (ingest_jobs 스냅샷)"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs (job_id, job, finished_at) VALUES (?, ?, ?)",
+                (job["job_id"], json.dumps(job), job.get("finished_at")),
+            )
+
+    def get_job(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT job FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def prune_jobs(self, keep: int) -> None:
+        """완료/실패한 작업 중 최근 keep 개만 남김"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM jobs WHERE finished_at IS NOT NULL AND job_id NOT IN ("
+                " SELECT job_id FROM jobs WHERE finished_at IS NOT NULL"
+                " ORDER BY finished_at DESC LIMIT ?)",
+                (keep,),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            sessions, documents = self._conn.execute(
+                "SELECT COUNT(DISTINCT session_id), COUNT(*) FROM documents"
+            ).fetchone()
+            return {
+                "catalog": "sqlite",
+                "path": self.path,
+                "sessions": sessions,
+                "documents": documents,
+                "reads": self.reads,
+                "writes": self.writes,
+            }
+
+
+def create_session_catalog(catalog: str = RAG_SESSION_CATALOG) -> Optional[SessionCatalog]:
+    """
+    설정된 종류의 세션 문서 목록 저장소 생성
+
+    Returns:
+        SessionCatalog 또는 None ("memory" 인 경우, 워커 프로세스별 retriever_store 만 사용)
+    """
+    if catalog not in RAG_SESSION_CATALOGS:
+        raise ValueError(
+            f"Invalid RAG_SESSION_CATALOG '{catalog}'. "
+            f"Choose one of {RAG_SESSION_CATALOGS}"
+        )
+    if catalog == "sqlite":
+        return SessionCatalog()
+    return None
+
+
+# 프로세스 전체에서 공유하는 세션 문서 목록 (memory 인 경우 None)
+session_catalog = create_session_catalog()
+
+
+def close_session_catalog() -> None:
+    """세션 문서 목록 저장소 연결 종료 (서버 종료 시 호출)"""
+    if session_catalog is not None:
+        session_catalog.close()
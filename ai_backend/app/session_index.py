@@ -0,0 +1,348 @@
+# ============================================
+# Session Index - 세션 단위 다중 문서 인덱스
+# ============================================
+
+import hashlib
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+
+from app.config import RAG_RETRIEVAL_MODE, RAG_TOP_K, RAG_FETCH_K, RAG_RRF_K
+from app.document_index import DocumentIndex
+from app.document_registry import document_registry
+from app.lexical_index import CorpusStats, reciprocal_rank_fusion
+
+# 전역 청크 id = 문서 번호 << _POSITION_BITS | 문서 내 위치
+_POSITION_BITS = 40
+
+
+@dataclass(frozen=True)
+class SearchFilter:
+    """
+    검색 대상 제한 조건
+
+    document_ids: 검색할 문서 id (None 이면 전체 문서)
+    page_start / page_end: 페이지 범위 (1부터, 양끝 포함, None 이면 제한 없음)
+    """
+    document_ids: Optional[Tuple[str, ...]] = None
+    page_start: Optional[int] = None
+    page_end: Optional[int] = None
+
+    @property
+    def is_empty(self) -> bool:
+        return self.document_ids is None and self.page_start is None and self.page_end is None
+
+    def cache_scope(self) -> str:
+        """답변/stage 캐시 키에 포함할 문자열"""
+        if self.is_empty:
+            return ""
+        docs = ",".join(sorted(self.document_ids)) if self.document_ids is not None else "*"
+        return f"{docs}:{self.page_start or ''}-{self.page_end or ''}"
+
+
+class SessionIndex:
+    """
+    한 세션에 업로드된 여러 문서를 하나의 인덱스처럼 검색
+
+    문서마다 DocumentIndex 를 하나씩 두고 추가/삭제 시 다른 문서를 다시 인덱싱하지
+    않습니다. 검색은 질의 임베딩 1회 + 문서별 벡터 검색 결과를 거리로 병합하고,
+    BM25 는 모든 문서의 통계를 합산해 하나의 코퍼스처럼 점수를 매깁니다.
+    문서/페이지 필터는 문서별 위치 bitmap 으로 검색 전에 적용합니다.
+    문서 인덱스는 DocumentRegistry 에서 세션 간 공유되므로, 세션에서 문서를
+    제거할 때는 인덱스를 직접 수정하지 않고 참조만 반환합니다.
+    """
+
+    def __init__(self, embeddings: Embeddings):
+        self.embeddings = embeddings
+        self._documents: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.RLock()
+        # 문서 번호 (전역 청크 id 상위 비트, 삭제 후에도 재사용하지 않음)
+        self._next_slot = 0
+        # 반영한 SessionCatalog revision (None 이면 다음 사용 시 문서 목록 다시 확인)
+        self.catalog_revision: Optional[int] = None
+
+    # ----------------------------------------
+    # 문서 추가 / 삭제
+    # ----------------------------------------
+
+    def add_document(
+        self,
+        index: DocumentIndex,
+        filename: str,
+        file_path: str,
+        job_id: Optional[str] = None,
+        registry_key: Optional[str] = None,
+        document_id: Optional[str] = None,
+    ) -> str:
+        """
+        문서 인덱스 추가 (같은 파일명 또는 같은 내용의 기존 문서는 교체)
+
+        Args:
+            index: 문서 인덱스
+            filename: 업로드 파일명
+            file_path: 저장된 파일 경로
+            job_id: 인제스트 작업 id
+            registry_key: DocumentRegistry 참조 키 (제거 시 참조 반환)
+            document_id: 문서 id (다른 워커가 올린 문서를 붙일 때, 없으면 새로 생성)
+
+        Returns:
+            str: 문서 id
+        """
+        document_id = document_id or uuid.uuid4().hex[:12]
+        with self._lock:
+            for existing_id, entry in list(self._documents.items()):
+                if existing_id == document_id or entry["filename"] == filename or entry["index"] is index:
+                    self._drop(existing_id)
+            self._documents[document_id] = {
+                "document_id": document_id,
+                "index": index,
+                "filename": filename,
+                "file_path": file_path,
+                "job_id": job_id,
+                "registry_key": registry_key,
+                "slot": self._next_slot,
+            }
+            self._next_slot += 1
+        return document_id
+
+    def _drop(self, document_id: str) -> bool:
+        # 호출자가 self._lock 보유
+        entry = self._documents.pop(document_id, None)
+        if entry is None:
+            return False
+        document_registry.release(entry["registry_key"])
+        return True
+
+    def remove_document(self, document_id: str) -> bool:
+        with self._lock:
+            return self._drop(document_id)
+
+    def clear(self) -> None:
+        """
+        모든 문서 제거 (세션 삭제 시 공유 인덱스 참조 반환)
+        """
+        with self._lock:
+            for document_id in list(self._documents):
+                self._drop(document_id)
+
+    def document_ids(self) -> List[str]:
+        with self._lock:
+            return list(self._documents)
+
+    def get_document(self, document_id: str) -> Optional[dict]:
+        with self._lock:
+            return self._documents.get(document_id)
+
+    def list_documents(self) -> List[dict]:
+        """
+        문서 목록 (업로드 순서, 인덱싱 상태 포함)
+        """
+        with self._lock:
+            entries = list(self._documents.values())
+        return [
+            {
+                "document_id": entry["document_id"],
+                "filename": entry["filename"],
+                "file_path": entry["file_path"],
+                "job_id": entry["job_id"],
+                "indexing": entry["index"].status(),
+            }
+            for entry in entries
+        ]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._documents)
+
+    def indexes(self) -> List[DocumentIndex]:
+        """세션이 참조하는 문서 인덱스 (검색 전 IndexMemoryCache 고정용)"""
+        with self._lock:
+            return [entry["index"] for entry in self._documents.values()]
+
+    # ----------------------------------------
+    # 상태
+    # ----------------------------------------
+
+    def _entries(self) -> List[dict]:
+        with self._lock:
+            return list(self._documents.values())
+
+    @property
+    def chunk_count(self) -> int:
+        return sum(entry["index"].chunk_count for entry in self._entries())
+
+    @property
+    def complete(self) -> bool:
+        entries = self._entries()
+        return bool(entries) and all(entry["index"].complete for entry in entries)
+
+    @property
+    def index_key(self) -> Optional[str]:
+        """문서 인덱스 키 조합 (하나라도 키가 없으면 None)"""
+        keys = [entry["index"].index_key for entry in self._entries()]
+        if not keys or any(key is None for key in keys):
+            return None
+        return hashlib.sha256("\0".join(sorted(keys)).encode("utf-8")).hexdigest()
+
+    def status(self) -> dict:
+        """
+        세션 전체 인덱싱 상태 (문서별 상태 합산)
+        """
+        statuses = [entry["index"].status() for entry in self._entries()]
+        return {
+            "complete": bool(statuses) and all(s["complete"] for s in statuses),
+            "documents": len(statuses),
+            "indexed_chunks": sum(s["indexed_chunks"] for s in statuses),
+            "vector_bytes": sum(s["vector_bytes"] for s in statuses),
+        }
+
+    # ----------------------------------------
+    # 검색
+    # ----------------------------------------
+
+    def validate_filter(self, search_filter: Optional[SearchFilter]) -> None:
+        if search_filter is None or search_filter.document_ids is None:
+            return
+        with self._lock:
+            unknown = [d for d in search_filter.document_ids if d not in self._documents]
+        if unknown:
+            raise ValueError(f"Unknown document_ids: {unknown}")
+
+    def _targets(self, search_filter: Optional[SearchFilter]) -> List[Tuple[dict, Optional[np.ndarray]]]:
+        # (문서, 위치 bitmap) - bitmap 이 None 이면 문서 전체
+        targets = []
+        for entry in self._entries():
+            index = entry["index"]
+            if index.chunk_count == 0:
+                continue
+            mask = None
+            if search_filter is not None:
+                if (
+                    search_filter.document_ids is not None
+                    and entry["document_id"] not in search_filter.document_ids
+                ):
+                    continue
+                if search_filter.page_start is not None or search_filter.page_end is not None:
+                    # API 페이지 번호는 1부터, 청크 메타데이터는 0부터
+                    mask = index.page_mask(
+                        search_filter.page_start - 1 if search_filter.page_start is not None else None,
+                        search_filter.page_end - 1 if search_filter.page_end is not None else None,
+                    )
+                    if not mask.any():
+                        continue
+            targets.append((entry, mask))
+        return targets
+
+    def _dense_ranking(self, embedding: List[float], fetch_k: int, targets) -> List[int]:
+        hits = []
+        for entry, mask in targets:
+            distances, positions = entry["index"].dense_search(embedding, fetch_k, mask)
+            base = entry["slot"] << _POSITION_BITS
+            hits.extend((d, base | p) for d, p in zip(distances, positions))
+        if not hits:
+            return []
+        reverse = not targets[0][0]["index"].lower_distance_is_better
+        hits.sort(key=lambda hit: hit[0], reverse=reverse)
+        return [gid for _, gid in hits[:fetch_k]]
+
+    def _lexical_ranking(self, query: str, fetch_k: int, targets) -> List[int]:
+        # 검색 대상과 무관하게 세션 전체 문서를 하나의 코퍼스로 보고 IDF 계산
+        corpus = CorpusStats.merge(entry["index"].lexical.corpus_stats(query) for entry in self._entries())
+        ids, scores = [], []
+        for entry, mask in targets:
+            doc_scores = entry["index"].lexical_scores(query, corpus)
+            if mask is not None:
+                keep = np.zeros(doc_scores.size, dtype=bool)
+                keep[: min(len(mask), doc_scores.size)] = mask[: doc_scores.size]
+                doc_scores[~keep] = 0
+            positions = np.flatnonzero(doc_scores > 0)
+            ids.append((entry["slot"] << _POSITION_BITS) | positions.astype(np.int64))
+            scores.append(doc_scores[positions])
+        if not ids:
+            return []
+        ids = np.concatenate(ids)
+        scores = np.concatenate(scores)
+        order = np.argsort(-scores, kind="stable")[:fetch_k]
+        return [int(i) for i in ids[order]]
+
+    def _resolve(self, global_ids: List[int], targets) -> List[Document]:
+        entries = {entry["slot"]: entry for entry, _ in targets}
+        docs = []
+        for gid in global_ids:
+            entry = entries[gid >> _POSITION_BITS]
+            doc = entry["index"].documents_at([gid & ((1 << _POSITION_BITS) - 1)])[0]
+            docs.append(Document(
+                page_content=doc.page_content,
+                metadata={
+                    **doc.metadata,
+                    "document_id": entry["document_id"],
+                    "filename": entry["filename"],
+                },
+            ))
+        return docs
+
+    def similarity_search(
+        self,
+        query: str,
+        k: int = RAG_TOP_K,
+        mode: str = RAG_RETRIEVAL_MODE,
+        search_filter: Optional[SearchFilter] = None,
+    ) -> List[Document]:
+        """
+        세션의 모든 (또는 필터로 선택한) 문서에서 질의 검색
+
+        Args:
+            query: 질의
+            k: 반환할 청크 수
+            mode: "hybrid" (BM25 + 벡터 RRF 융합) 또는 "dense"
+            search_filter: 문서/페이지 범위 제한
+
+        Returns:
+            list[Document]: 상위 k 개 청크 (metadata 에 document_id, filename 포함)
+        """
+        targets = self._targets(search_filter)
+        if not targets:
+            return []
+        embedding = self.embeddings.embed_query(query)
+
+        if mode != "hybrid":
+            return self._resolve(self._dense_ranking(embedding, k, targets), targets)
+
+        fetch_k = max(k, RAG_FETCH_K)
+        global_ids = reciprocal_rank_fusion(
+            [
+                self._dense_ranking(embedding, fetch_k, targets),
+                self._lexical_ranking(query, fetch_k, targets),
+            ],
+            k=k,
+            rrf_k=RAG_RRF_K,
+        )
+        return self._resolve(global_ids, targets)
+
+    def as_retriever(
+        self,
+        k: int = RAG_TOP_K,
+        search_filter: Optional[SearchFilter] = None,
+    ) -> "SessionIndexRetriever":
+        return SessionIndexRetriever(index=self, k=k, search_filter=search_filter)
+
+
+class SessionIndexRetriever(BaseRetriever):
+    """SessionIndex 검색기 (필터 조건을 함께 보관)"""
+
+    index: Any
+    k: int = RAG_TOP_K
+    search_filter: Optional[Any] = None
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        return self.index.similarity_search(query, k=self.k, search_filter=self.search_filter)
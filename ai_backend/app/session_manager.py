@@ -2,20 +2,257 @@
 # Session Manager - 세션 관리
 # ============================================
 
-from langchain_community.chat_message_histories import ChatMessageHistory
-from typing import Dict
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from app.chat_memory import WindowedChatHistory
+from app.config import SESSION_TTL, SESSION_MAX_BYTES, SESSION_SWEEP_INTERVAL
+from app.history_backend import HistoryBackend, history_backend
 
 # ============================================
-# 세션 저장소 (메모리 기반)
+# 세션 저장소 (메모리 + 선택적 영속 저장소)
 # ============================================
 
-session_store: Dict[str, ChatMessageHistory] = {}
+
+class SessionStore:
+    """
+    세션 ID -> 대화 히스토리 저장소 (유휴 만료 + 메모리 예산 LRU)
+
+    마지막 사용 후 ttl 초가 지난 세션은 주기적인 정리 작업에서 제거되고,
+    전체 히스토리 크기(메시지 본문 기준 근사치)가 max_bytes 를 넘으면
+    가장 오래 사용되지 않은 세션부터 제거합니다. 방금 사용한 세션은 예산을
+    넘더라도 제거하지 않습니다.
+
+    backend (HistoryBackend) 가 있으면 메모리는 캐시 역할만 합니다. 히스토리 변경은
+    backend 에 비동기로 기록되고, 메모리에 없는 세션은 처음 사용할 때 backend 에서
+    불러오며, 다른 워커가 기록한 세션은 다음 사용 시 다시 불러옵니다. 만료/예산 초과로
+    메모리에서 빠져도 저장된 히스토리는 남고, remove() 할 때만 삭제됩니다.
+    """
+
+    def __init__(
+        self,
+        ttl: float = SESSION_TTL,
+        max_bytes: int = SESSION_MAX_BYTES,
+        sweep_interval: float = SESSION_SWEEP_INTERVAL,
+        backend: Optional[HistoryBackend] = None,
+    ):
+        self.backend = backend
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        self._lock = threading.Lock()
+        self._sessions: "OrderedDict[str, dict]" = OrderedDict()
+        self._bytes = 0
+        self._task: Optional[asyncio.Task] = None
+        self.created = 0
+        self.removed = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.loads = 0
+        self.load_errors = 0
+
+    def get(self, session_id: str, refresh: bool = True) -> WindowedChatHistory:
+        """
+        세션 히스토리 조회 (없으면 생성 또는 영속 저장소에서 로드, 사용 시각 갱신)
+
+        저장소 I/O 를 할 수 있으므로 이벤트 루프에서는 asyncio.to_thread 로 호출합니다.
+        refresh=False 이면 메모리에 있는 세션은 저장소 revision 확인 없이 반환합니다.
+        """
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None:
+                entry["last_access"] = time.time()
+                self._sessions.move_to_end(session_id)
+                history = entry["history"]
+        if entry is not None:
+            if refresh and self.backend is not None:
+                self._refresh(session_id, history)
+            return history
+
+        # 저장소 I/O 는 lock 밖에서 수행
+        history = WindowedChatHistory()
+        state = self._load(session_id)
+        if state is not None:
+            history.restore(state["summary"], state["base"], state["messages"])
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                history.on_resize = lambda delta, h=history: self._on_resize(session_id, h, delta)
+                if self.backend is not None:
+                    history.on_change = lambda op, b=self.backend: b.enqueue(session_id, op)
+                entry = {"history": history, "bytes": history.nbytes, "last_access": 0.0}
+                self._sessions[session_id] = entry
+                self._bytes += entry["bytes"]
+                self.created += 1
+                self._evict_over_budget(keep=session_id)
+            # 동시에 같은 세션을 만든 요청이 있으면 먼저 등록된 쪽을 사용
+            entry["last_access"] = time.time()
+            self._sessions.move_to_end(session_id)
+            return entry["history"]
+
+    def _load(self, session_id: str) -> Optional[dict]:
+        if self.backend is None:
+            return None
+        try:
+            state = self.backend.load(session_id)
+        except Exception as e:
+            # 저장소 장애 시에도 대화는 계속 (이 세션은 빈 히스토리로 시작)
+            print(f"[WARN] history load failed for session {session_id}: {e}")
+            with self._lock:
+                self.load_errors += 1
+            return None
+        if state is not None:
+            with self._lock:
+                self.loads += 1
+        return state
+
+    def _refresh(self, session_id: str, history: WindowedChatHistory) -> None:
+        # 다른 워커가 이 세션에 기록했으면 메모리 사본을 저장소 내용으로 교체
+        try:
+            if self.backend.is_current(session_id):
+                return
+        except Exception as e:
+            print(f"[WARN] history revision check failed for session {session_id}: {e}")
+            return
+        try:
+            state = self.backend.load(session_id)
+        except Exception as e:
+            print(f"[WARN] history reload failed for session {session_id}: {e}")
+            return
+        if state is None:
+            # 다른 워커에서 세션이 삭제됨
+            history.restore("", 0, [])
+        else:
+            history.restore(state["summary"], state["base"], state["messages"])
+
+    def _on_resize(self, session_id: str, history: WindowedChatHistory, delta: int) -> None:
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            # 이미 제거된 (또는 같은 id 로 새로 만들어진) 세션의 변화량은 무시
+            if entry is None or entry["history"] is not history:
+                return
+            entry["bytes"] += delta
+            self._bytes += delta
+            self._evict_over_budget(keep=session_id)
+
+    def _drop(self, session_id: str, deleted: bool = False) -> None:
+        # 호출자가 self._lock 보유. 만료/예산 초과로 빠지는 세션은 스트리밍 중인 턴이
+        # 유실되지 않도록 backend 기록을 유지 (삭제하는 세션은 기록도 중단)
+        entry = self._sessions.pop(session_id)
+        entry["history"].detach(keep_journal=self.backend is not None and not deleted)
+        self._bytes -= entry["bytes"]
+        if self.backend is not None:
+            self.backend.forget(session_id)
+
+    def _evict_over_budget(self, keep: str) -> None:
+        # 호출자가 self._lock 보유
+        if self.max_bytes <= 0:
+            return
+        while self._bytes > self.max_bytes and len(self._sessions) > 1:
+            oldest = next(iter(self._sessions))
+            if oldest == keep:
+                break
+            self._drop(oldest)
+            self.evictions += 1
+
+    def remove(self, session_id: str) -> bool:
+        """세션 제거 (진행 중인 요약 작업 결과와 저장된 히스토리도 삭제)"""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None:
+                self._drop(session_id, deleted=True)
+        if entry is None and not (self.backend is not None and self.backend.exists(session_id)):
+            return False
+        if entry is not None:
+            entry["history"].clear()
+        if self.backend is not None:
+            self.backend.delete(session_id)
+        with self._lock:
+            self.removed += 1
+        return True
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """
+        유휴 만료된 세션 제거
+
+        Returns:
+            int: 제거한 세션 수
+        """
+        if self.ttl <= 0:
+            return 0
+        now = time.time() if now is None else now
+        with self._lock:
+            expired = []
+            # LRU 순서이므로 만료되지 않은 세션을 만나면 중단
+            for session_id, entry in self._sessions.items():
+                if now - entry["last_access"] <= self.ttl:
+                    break
+                expired.append(session_id)
+            for session_id in expired:
+                self._drop(session_id)
+            self.expirations += len(expired)
+        return len(expired)
+
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            if session_id in self._sessions:
+                return True
+        return self.backend is not None and self.backend.exists(session_id)
+
+    def ids(self) -> list:
+        with self._lock:
+            return list(self._sessions.keys())
+
+    # ----------------------------------------
+    # 주기적 정리 작업
+    # ----------------------------------------
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            self.sweep()
+
+    def start(self) -> None:
+        if self._task is None and self.sweep_interval > 0:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                "created": self.created,
+                "removed": self.removed,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "loads": self.loads,
+                "load_errors": self.load_errors,
+                "backend": self.backend.stats() if self.backend is not None else {"backend": "memory"},
+            }
+
+
+# 프로세스 전체에서 공유하는 세션 저장소
+session_store = SessionStore(backend=history_backend)
 
 # ============================================
 # 세션 관리 함수
 # ============================================
 
-def get_session_history(session_id: str) -> ChatMessageHistory:
+def get_session_history(session_id: str) -> WindowedChatHistory:
     """
     세션 ID로 대화 히스토리 가져오기
 
@@ -23,16 +260,31 @@ def get_session_history(session_id: str) -> ChatMessageHistory:
         session_id: 세션 ID
 
     Returns:
-        ChatMessageHistory: 대화 히스토리 객체
+        WindowedChatHistory: 대화 히스토리 객체 (최근 대화 + 이전 대화 요약)
     """
-    if session_id not in session_store:
-        session_store[session_id] = ChatMessageHistory()
-    return session_store[session_id]
+    return session_store.get(session_id)
+
+
+def get_cached_session_history(session_id: str) -> WindowedChatHistory:
+    """
+    Chain (RunnableWithMessageHistory) 용 세션 히스토리 조회
+
+    Chain 은 이벤트 루프에서 히스토리를 조회하므로 저장소 revision 확인을 생략합니다.
+    요청 처리 시작 시 asyncio.to_thread(get_session_history, ...) 로 세션을 불러오고
+    갱신해 두어야 합니다.
+
+    Args:
+        session_id: 세션 ID
+
+    Returns:
+        WindowedChatHistory: 대화 히스토리 객체
+    """
+    return session_store.get(session_id, refresh=False)
 
 
 def clear_session(session_id: str) -> bool:
     """
-    세션 초기화
+    세션 초기화 (히스토리를 비우고 저장소에서 제거)
 
     Args:
         session_id: 세션 ID
@@ -40,10 +292,7 @@ def clear_session(session_id: str) -> bool:
     Returns:
         bool: 성공 여부
     """
-    if session_id in session_store:
-        session_store[session_id].clear()
-        return True
-    return False
+    return session_store.remove(session_id)
 
 
 def get_all_sessions() -> list:
@@ -53,7 +302,7 @@ def get_all_sessions() -> list:
     Returns:
         list: 세션 ID 리스트
     """
-    return list(session_store.keys())
+    return session_store.ids()
 
 
 def session_exists(session_id: str) -> bool:
@@ -67,3 +316,10 @@ def session_exists(session_id: str) -> bool:
         bool: 존재 여부
     """
     return session_id in session_store
+
+
+def get_session_stats() -> dict:
+    """
+    세션 저장소 상태 (세션 수, 보관 바이트, 제거/만료 횟수)
+    """
+    return session_store.stats()
@@ -0,0 +1,141 @@
+# ============================================
+# Vector Index - FAISS 인덱스 종류 선택 및 압축
+# ============================================
+
+import math
+
+import faiss
+import numpy as np
+
+from app.config import (
+    RAG_INDEX_TYPE,
+    INDEX_SQ8_MIN_CHUNKS,
+    INDEX_IVFPQ_MIN_CHUNKS,
+    INDEX_IVF_NPROBE,
+    INDEX_PQ_DIMS_PER_CODE,
+)
+
+# 지원하는 인덱스 종류 ("auto" 는 청크 수로 선택)
+INDEX_TYPES = ["auto", "flat", "sq8", "ivfpq"]
+
+# PQ 코드북(256 중심점) 학습에 필요한 최소 벡터 수 (FAISS 권장치)
+_PQ_MIN_TRAIN = 39 * 256
+
+# IVF 클러스터당 최소 학습 벡터 수
+_IVF_MIN_POINTS_PER_LIST = 39
+
+# 학습에 사용할 최대 벡터 수 (초과 시 무작위 샘플로 학습)
+_MAX_TRAIN_VECTORS = 32768
+
+
+def choose_index_type(num_vectors: int, index_type: str = RAG_INDEX_TYPE) -> str:
+    """
+    청크 수에 맞는 인덱스 종류 선택
+
+    "ivfpq" 를 지정했더라도 PQ 코드북을 학습하기에 벡터가 부족하면 "sq8" 을 사용합니다.
+
+    Args:
+        num_vectors: 인덱스에 들어갈 벡터 수
+        index_type: INDEX_TYPES 중 하나
+
+    Returns:
+        str: "flat", "sq8" 또는 "ivfpq"
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Invalid index_type '{index_type}'. Choose one of {INDEX_TYPES}")
+
+    if index_type == "auto":
+        if num_vectors >= max(INDEX_IVFPQ_MIN_CHUNKS, _PQ_MIN_TRAIN):
+            return "ivfpq"
+        if num_vectors >= INDEX_SQ8_MIN_CHUNKS:
+            return "sq8"
+        return "flat"
+
+    if index_type == "ivfpq" and num_vectors < _PQ_MIN_TRAIN:
+        return "sq8"
+    return index_type
+
+
+def detect_index_type(index: faiss.Index) -> str:
+    """FAISS 인덱스 객체의 종류 이름"""
+    if isinstance(index, faiss.IndexFlat):
+        return "flat"
+    if isinstance(index, faiss.IndexScalarQuantizer):
+        return "sq8"
+    if isinstance(index, faiss.IndexIVFPQ):
+        return "ivfpq"
+    return type(index).__name__
+
+
+def _pq_subquantizers(dim: int) -> int:
+    # 차원을 나누어 떨어지게 하는 서브벡터 수 중 목표치 이하의 최댓값
+    m = max(1, dim // max(1, INDEX_PQ_DIMS_PER_CODE))
+    while dim % m:
+        m -= 1
+    return m
+
+
+def _ivf_nlist(num_vectors: int) -> int:
+    return max(1, min(int(4 * math.sqrt(num_vectors)), num_vectors // _IVF_MIN_POINTS_PER_LIST))
+
+
+def _flat_index(dim: int, metric: int) -> faiss.Index:
+    return faiss.IndexFlatIP(dim) if metric == faiss.METRIC_INNER_PRODUCT else faiss.IndexFlatL2(dim)
+
+
+def configure_search(index: faiss.Index) -> faiss.Index:
+    """검색 파라미터 적용 (IVF 계열은 nprobe 설정)"""
+    if isinstance(index, faiss.IndexIVF):
+        index.nprobe = min(INDEX_IVF_NPROBE, index.nlist)
+    return index
+
+
+def build_index(vectors: np.ndarray, index_type: str, metric: int = faiss.METRIC_L2) -> faiss.Index:
+    """
+    벡터로 지정한 종류의 FAISS 인덱스 생성 (필요하면 학습 후 추가)
+
+    Args:
+        vectors: (n, dim) float32 벡터
+        index_type: "flat", "sq8" 또는 "ivfpq"
+        metric: faiss.METRIC_L2 또는 faiss.METRIC_INNER_PRODUCT
+
+    Returns:
+        faiss.Index: 벡터가 추가된 인덱스 (위치 i = vectors[i])
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    num_vectors, dim = vectors.shape
+
+    if index_type == "flat":
+        index = _flat_index(dim, metric)
+    elif index_type == "sq8":
+        index = faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_8bit, metric)
+    elif index_type == "ivfpq":
+        index = faiss.IndexIVFPQ(
+            _flat_index(dim, metric), dim, _ivf_nlist(num_vectors), _pq_subquantizers(dim), 8, metric
+        )
+    else:
+        raise ValueError(f"Invalid index_type '{index_type}'. Choose one of {INDEX_TYPES[1:]}")
+
+    if not index.is_trained:
+        train = vectors
+        if num_vectors > _MAX_TRAIN_VECTORS:
+            rng = np.random.default_rng(0)
+            train = vectors[rng.choice(num_vectors, _MAX_TRAIN_VECTORS, replace=False)]
+        index.train(train)
+    index.add(vectors)
+    return configure_search(index)
+
+
+def index_nbytes(index: faiss.Index) -> int:
+    """
+    인덱스가 메모리에 보관하는 벡터 관련 바이트 수 (근사치)
+
+    벡터 코드 + IVF id 목록 + 중심점/코드북 크기의 합입니다.
+    """
+    if isinstance(index, faiss.IndexIVFPQ):
+        codebook = index.pq.M * index.pq.ksub * index.pq.dsub * 4
+        coarse = index.quantizer.ntotal * index.d * 4
+        return index.ntotal * (index.code_size + 8) + codebook + coarse
+    if isinstance(index, faiss.IndexFlatCodes):
+        return index.ntotal * index.code_size
+    return len(faiss.serialize_index(index))
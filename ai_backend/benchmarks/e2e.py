@@ -0,0 +1,741 @@
+# ============================================
+# Benchmark - Chat / RAG 엔드포인트 End-to-End
+# ============================================
+#
+# OpenAI 호환 mock 서버와 백엔드 서버를 각각 별도 프로세스로 띄운 뒤
+# /chat/stream, /chat/message, /rag/upload, /rag/query 를 동시성 단계별로 호출하여
+# 첫 토큰 지연(TTFT), 토큰 간 지연(ITL), 초당 요청 수, 인제스트 pages/s,
+# 서버 최대 RSS 를 측정합니다. 결과 JSON 에는 git 커밋이 기록되므로
+# --baseline 으로 이전 결과와 비교할 수 있습니다.
+#
+# 사용법 (ai_backend 디렉토리에서):
+#   python -m benchmarks.e2e
+#   python -m benchmarks.e2e --concurrency 1 8 32 --requests 8 --output e2e.json
+#   python -m benchmarks.e2e --baseline e2e.json --output e2e-new.json
+#   python -m benchmarks.e2e --scenarios chat_stream rag_query --ttft-ms 100
+#   python -m benchmarks.e2e --scenarios chat_stream --history-backend redis
+#   python -m benchmarks.e2e --server prefork --workers 4 --history-backend sqlite
+#
+# 서버는 임시 CACHE_DIR 로 실행되므로 디스크 캐시 없이 매번 같은 조건에서 측정합니다.
+# OpenAI 임베딩 클라이언트는 tiktoken 인코딩 파일이 필요하므로, 오프라인 환경에서
+# 인코딩 파일이 캐시되어 있지 않으면 --embedding-backend local 을 사용하세요.
+# --history-backend redis 는 Redis 대신 benchmarks.resp_server 를 띄워 사용합니다.
+# --server prefork 는 운영 진입점 (python -m app.server) 으로 실행하며, 워커가 2 이상이면
+# 세션이 워커 간에 이어지도록 RAG_SESSION_CATALOG=sqlite 로 실행합니다 (히스토리는
+# --history-backend sqlite/redis 필요). 시작 시간과 idle PSS (공유 페이지를 프로세스 수로
+# 나눈 메모리) 로 uvicorn --workers (spawn) 와 비교할 수 있습니다.
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import httpx
+import numpy as np
+
+SCENARIOS = ["chat_stream", "chat_message", "rag_upload", "rag_query"]
+
+CHAT_PROMPT = "prompts/chatbot/01-general.yaml"
+RAG_PROMPT = "prompts/rag/01-pdf-rag.yaml"
+API_PREFIX = "/api/v1"
+
+# 비교 시 표시할 지표 (높을수록 좋은 지표는 True)
+_COMPARE_METRICS = {
+    "rps": True,
+    "pages_per_sec": True,
+    "ttft_p50_ms": False,
+    "itl_p50_ms": False,
+    "latency_p95_ms": False,
+    "peak_rss_mb": False,
+}
+
+_WORDS = (
+    "policy refund shipping warranty account invoice delivery customer service "
+    "product return exchange payment order status support contract period "
+    "section clause term notice request approval document record"
+).split()
+
+# ============================================
+# 테스트 입력 생성
+# ============================================
+
+
+def make_pdf(pages: int, seed: int, lines_per_page: int = 40) -> bytes:
+    """
+    텍스트만 있는 PDF 생성 (외부 패키지 없이 PDF 객체를 직접 작성)
+
+    seed 마다 내용이 달라지므로 문서 레지스트리의 중복 제거에 걸리지 않습니다.
+    """
+    rng = np.random.default_rng(seed)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # 페이지 목록 (페이지 객체 번호가 정해진 뒤 작성)
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_ids = []
+    for page in range(pages):
+        lines = [f"Document {seed} page {page + 1}"]
+        for _ in range(lines_per_page - 1):
+            lines.append(" ".join(rng.choice(_WORDS, size=12)))
+        text = "".join(f"({line}) Tj T* " for line in lines)
+        stream = f"BT /F1 10 Tf 12 TL 50 780 Td {text}ET".encode("ascii")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{i} 0 R" for i in page_ids).encode("ascii")
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, pages)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def make_question(seed: int) -> str:
+    rng = np.random.default_rng(seed)
+    return "What does the document say about " + " and ".join(rng.choice(_WORDS, size=3)) + "?"
+
+
+# ============================================
+# 프로세스 관리 / RSS 측정
+# ============================================
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _children(pid: int) -> List[int]:
+    # /proc/<pid>/task/*/children 으로 하위 프로세스 전체 탐색 (PDF 추출 워커 포함)
+    found, stack = [], [pid]
+    while stack:
+        current = stack.pop()
+        try:
+            tasks = os.listdir(f"/proc/{current}/task")
+        except OSError:
+            continue
+        for task in tasks:
+            try:
+                with open(f"/proc/{current}/task/{task}/children") as f:
+                    kids = [int(k) for k in f.read().split()]
+            except OSError:
+                continue
+            found.extend(kids)
+            stack.extend(kids)
+    return found
+
+
+def _status_kb(pid: int, field: str) -> int:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def process_tree_rss_mb(pid: int) -> float:
+    """서버 프로세스와 모든 하위 프로세스의 현재 RSS 합 (MB, Linux 전용)"""
+    return sum(_status_kb(p, "VmRSS") for p in [pid, *_children(pid)]) / 1024
+
+
+def _pss_kb(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def process_tree_pss_mb(pid: int) -> float:
+    """
+    프로세스 트리의 PSS 합 (MB, Linux 전용)
+
+    워커끼리 공유하는 페이지 (fork 후 copy-on-write, memory-map 한 인덱스) 를 한 번만
+    세므로, 워커 수만큼 중복 계산되는 RSS 합보다 실제 메모리 사용량에 가깝습니다.
+    """
+    return sum(_pss_kb(p) for p in [pid, *_children(pid)]) / 1024
+
+
+class RSSSampler:
+    """
+    측정 구간 동안 프로세스 트리 RSS 를 주기적으로 샘플링하여 최댓값 기록
+
+    서버 프로세스 자체의 최댓값은 커널이 기록하는 VmHWM 으로도 확인합니다.
+    """
+
+    def __init__(self, pid: int, interval: float = 0.05):
+        self.pid = pid
+        self.interval = interval
+        self.peak_mb = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        while True:
+            self.peak_mb = max(self.peak_mb, process_tree_rss_mb(self.pid))
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        self.peak_mb = process_tree_rss_mb(self.pid)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> float:
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self.peak_mb = max(self.peak_mb, process_tree_rss_mb(self.pid))
+        return round(self.peak_mb, 1)
+
+
+def _wait_ready(url: str, proc: subprocess.Popen, timeout: float) -> float:
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        if proc.poll() is not None:
+            raise RuntimeError(f"process exited with code {proc.returncode} before {url} was ready")
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return time.perf_counter() - start
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.05)
+    raise RuntimeError(f"{url} not ready after {timeout}s")
+
+
+def _stop(proc: subprocess.Popen) -> None:
+    if proc.poll() is None:
+        proc.terminate()
+        try:
+            proc.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+
+
+def start_mock_server(args, port: int) -> subprocess.Popen:
+    cmd = [
+        sys.executable, "-m", "benchmarks.mock_openai",
+        "--port", str(port),
+        "--ttft-ms", str(args.ttft_ms),
+        "--tokens-per-sec", str(args.tokens_per_sec),
+        "--response-tokens", str(args.response_tokens),
+        "--embedding-ms", str(args.embedding_ms),
+    ]
+    proc = subprocess.Popen(cmd)
+    _wait_ready(f"http://127.0.0.1:{port}/v1/models", proc, timeout=60)
+    return proc
+
+
+def start_resp_server(port: int, timeout: float = 30) -> subprocess.Popen:
+    proc = subprocess.Popen([sys.executable, "-m", "benchmarks.resp_server", "--port", str(port)])
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"RESP server exited with code {proc.returncode}")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return proc
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError(f"RESP server not ready after {timeout}s")
+
+
+def server_env(args, mock_port: int, cache_dir: str, redis_port: Optional[int] = None) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.update({
+        "OPENAI_API_KEY": "mock",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{mock_port}/v1",
+        "LLM_BACKEND": "openai",
+        "EMBEDDING_BACKEND": args.embedding_backend,
+        "CACHE_DIR": cache_dir,
+        "RESPONSE_CACHE_BACKEND": "none",
+        "ANSWER_CACHE_ENABLED": "false",
+        "LANGSMITH_TRACING": "false",
+        "HISTORY_BACKEND": args.history_backend,
+    })
+    if redis_port is not None:
+        env["HISTORY_REDIS_URL"] = f"redis://127.0.0.1:{redis_port}/0"
+    if args.workers > 1:
+        env["RAG_SESSION_CATALOG"] = "sqlite"
+    return env
+
+
+def start_app_server(args, port: int, env: Dict[str, str]):
+    """
+    백엔드 서버 실행
+
+    Returns:
+        (process, startup_s): startup_s 는 실행부터 모든 워커가 /health 에 응답할 때까지 걸린 시간
+    """
+    if args.server == "prefork":
+        cmd = [sys.executable, "-m", "app.server"]
+        env = {
+            **env,
+            "SERVER_HOST": "127.0.0.1",
+            "SERVER_PORT": str(port),
+            "SERVER_WORKERS": str(args.workers),
+            "SERVER_LOG_LEVEL": "warning",
+            "SERVER_ACCESS_LOG": "false",
+        }
+    else:
+        cmd = [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", "127.0.0.1",
+            "--port", str(port),
+            "--log-level", "warning",
+            "--no-access-log",
+        ]
+        if args.workers > 1:
+            cmd += ["--workers", str(args.workers)]
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, env=env)
+    _wait_ready(f"http://127.0.0.1:{port}/health", proc, timeout=120)
+    _wait_workers(f"http://127.0.0.1:{port}/metrics/server", proc, args.workers, timeout=120)
+    return proc, time.perf_counter() - start
+
+
+def _wait_workers(url: str, proc: subprocess.Popen, workers: int, timeout: float) -> None:
+    # 워커마다 /metrics/server 응답 pid 가 다르므로, 서로 다른 pid 가 워커 수만큼 보일 때까지 대기
+    deadline = time.perf_counter() + timeout
+    seen = set()
+    while len(seen) < workers:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited with code {proc.returncode} before all workers were ready")
+        if time.perf_counter() > deadline:
+            raise RuntimeError(f"only {len(seen)}/{workers} workers ready after {timeout}s")
+        try:
+            # 새 연결마다 다른 워커가 받을 수 있도록 keep-alive 없이 요청
+            seen.add(httpx.get(url, timeout=1.0, headers={"Connection": "close"}).json()["pid"])
+        except (httpx.HTTPError, ValueError, KeyError):
+            time.sleep(0.05)
+
+
+# ============================================
+# 요청 실행
+# ============================================
+
+
+async def stream_request(client: httpx.AsyncClient, path: str, payload: dict) -> dict:
+    """
+    SSE 요청 1회 실행 후 토큰 도착 시각 기록
+
+    Returns:
+        {"latency", "ttft", "itl": [...], "tokens", "error"} (시간 단위 ms)
+    """
+    start = time.perf_counter()
+    arrivals = []
+    error = None
+    try:
+        async with client.stream("POST", path, json=payload) as response:
+            if response.status_code != 200:
+                await response.aread()
+                error = f"HTTP {response.status_code}"
+            else:
+                async for line in response.aiter_lines():
+                    if not line.startswith("data: "):
+                        continue
+                    data = line[len("data: "):]
+                    if data == "[DONE]":
+                        break
+                    event = json.loads(data)
+                    if "error" in event:
+                        error = event["error"]
+                        break
+                    if event.get("token"):
+                        arrivals.append(time.perf_counter())
+    except httpx.HTTPError as e:
+        error = repr(e)
+
+    end = time.perf_counter()
+    if error is None and not arrivals:
+        error = "no tokens"
+    return {
+        "latency": (end - start) * 1000,
+        "ttft": (arrivals[0] - start) * 1000 if arrivals else None,
+        "itl": [(b - a) * 1000 for a, b in zip(arrivals, arrivals[1:])],
+        "tokens": len(arrivals),
+        "error": error,
+    }
+
+
+async def message_request(client: httpx.AsyncClient, path: str, payload: dict) -> dict:
+    start = time.perf_counter()
+    error = None
+    try:
+        response = await client.post(path, json=payload)
+        if response.status_code != 200:
+            error = f"HTTP {response.status_code}"
+    except httpx.HTTPError as e:
+        error = repr(e)
+    return {"latency": (time.perf_counter() - start) * 1000, "error": error}
+
+
+async def upload_document(client: httpx.AsyncClient, session_id: str, pdf: bytes, filename: str) -> dict:
+    """
+    PDF 업로드 후 인제스트 완료까지 대기
+
+    Returns:
+        {"latency", "pages", "error"} (latency 는 업로드부터 completed 까지, ms)
+    """
+    start = time.perf_counter()
+    try:
+        response = await client.post(
+            f"{API_PREFIX}/rag/upload",
+            data={"session_id": session_id},
+            files={"file": (filename, pdf, "application/pdf")},
+        )
+        if response.status_code != 200:
+            return {"latency": None, "pages": 0, "error": f"HTTP {response.status_code}"}
+        job_id = response.json()["job_id"]
+        while True:
+            job = (await client.get(f"{API_PREFIX}/rag/jobs/{job_id}")).json()
+            if job["status"] == "completed":
+                pages = job["stages"]["pages_parsed"]["done"]
+                return {"latency": (time.perf_counter() - start) * 1000, "pages": pages, "error": None}
+            if job["status"] == "failed":
+                return {"latency": None, "pages": 0, "error": job.get("error", "failed")}
+            await asyncio.sleep(0.05)
+    except httpx.HTTPError as e:
+        return {"latency": None, "pages": 0, "error": repr(e)}
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    values = [v for v in values if v is not None]
+    return round(float(np.percentile(values, q)), 2) if values else None
+
+
+def summarize(results: List[dict], wall_s: float) -> dict:
+    ok = [r for r in results if r["error"] is None]
+    summary = {
+        "requests": len(results),
+        "errors": len(results) - len(ok),
+        "wall_s": round(wall_s, 3),
+        "rps": round(len(ok) / wall_s, 2) if wall_s > 0 else None,
+        "latency_p50_ms": _percentile([r["latency"] for r in ok], 50),
+        "latency_p95_ms": _percentile([r["latency"] for r in ok], 95),
+    }
+    if ok and "ttft" in ok[0]:
+        itl = [gap for r in ok for gap in r["itl"]]
+        summary.update({
+            "ttft_p50_ms": _percentile([r["ttft"] for r in ok], 50),
+            "ttft_p95_ms": _percentile([r["ttft"] for r in ok], 95),
+            "itl_p50_ms": _percentile(itl, 50),
+            "itl_p95_ms": _percentile(itl, 95),
+            "tokens_per_request": round(sum(r["tokens"] for r in ok) / len(ok), 1),
+        })
+    if ok and "pages" in ok[0]:
+        pages = sum(r["pages"] for r in ok)
+        summary.update({
+            "pages": pages,
+            "pages_per_sec": round(pages / wall_s, 2) if wall_s > 0 else None,
+        })
+    errors = sorted({str(r["error"]) for r in results if r["error"] is not None})
+    if errors:
+        summary["error_samples"] = errors[:3]
+    return summary
+
+
+# ============================================
+# 시나리오
+# ============================================
+
+
+async def _run_workers(concurrency: int, requests: int, call) -> tuple:
+    # 워커 concurrency 개가 각자 requests 회씩 순차 호출
+    async def worker(w: int) -> List[dict]:
+        return [await call(w, i) for i in range(requests)]
+
+    start = time.perf_counter()
+    per_worker = await asyncio.gather(*(worker(w) for w in range(concurrency)))
+    return [r for rs in per_worker for r in rs], time.perf_counter() - start
+
+
+async def run_level(client: httpx.AsyncClient, args, concurrency: int, scenarios: List[str], pid: int) -> List[dict]:
+    rows = []
+    tag = f"c{concurrency}"
+
+    async def measure(name: str, coro) -> None:
+        sampler = RSSSampler(pid)
+        sampler.start()
+        results, wall_s = await coro
+        rows.append({
+            "scenario": name,
+            "concurrency": concurrency,
+            **summarize(results, wall_s),
+            "peak_rss_mb": await sampler.stop(),
+        })
+        print(_format_row(rows[-1]), flush=True)
+
+    def chat_payload(w: int, i: int) -> dict:
+        return {
+            "session_id": f"bench-chat-{tag}-{w}",
+            "message": make_question(concurrency * 1000 + w * 100 + i),
+            "prompt_file": CHAT_PROMPT,
+            "model": args.model,
+            "use_cache": False,
+        }
+
+    if "chat_stream" in scenarios:
+        await measure("chat_stream", _run_workers(
+            concurrency, args.requests,
+            lambda w, i: stream_request(client, f"{API_PREFIX}/chat/stream", chat_payload(w, i)),
+        ))
+
+    if "chat_message" in scenarios:
+        await measure("chat_message", _run_workers(
+            concurrency, args.requests,
+            lambda w, i: message_request(client, f"{API_PREFIX}/chat/message", chat_payload(w, i)),
+        ))
+
+    # rag_query 는 업로드된 세션이 필요하므로 rag_upload 를 건너뛰어도 업로드는 수행
+    rag_sessions = [f"bench-rag-{tag}-{w}" for w in range(concurrency)]
+    if "rag_upload" in scenarios or "rag_query" in scenarios:
+        pdfs = [make_pdf(args.pages, seed=concurrency * 1000 + w) for w in range(concurrency)]
+
+        async def upload_all():
+            start = time.perf_counter()
+            results = await asyncio.gather(*(
+                upload_document(client, session_id, pdf, f"bench-{session_id}.pdf")
+                for session_id, pdf in zip(rag_sessions, pdfs)
+            ))
+            return list(results), time.perf_counter() - start
+
+        if "rag_upload" in scenarios:
+            await measure("rag_upload", upload_all())
+        else:
+            await upload_all()
+
+    if "rag_query" in scenarios:
+        await measure("rag_query", _run_workers(
+            concurrency, args.requests,
+            lambda w, i: stream_request(client, f"{API_PREFIX}/rag/query", {
+                "session_id": rag_sessions[w],
+                "question": make_question(concurrency * 1000 + w * 100 + i),
+                "prompt_file": RAG_PROMPT,
+                "model": args.model,
+                "use_cache": False,
+            }),
+        ))
+
+    return rows
+
+
+# ============================================
+# 출력 / 비교
+# ============================================
+
+
+def _fmt(value, width: int = 8) -> str:
+    if value is None:
+        return f"{'-':>{width}}"
+    return f"{value:>{width}.1f}" if isinstance(value, float) else f"{value:>{width}}"
+
+
+_HEADER = (
+    f"{'scenario':<13} {'conc':>4} {'reqs':>5} {'err':>4} {'rps':>8} {'p50 ms':>8} "
+    f"{'p95 ms':>8} {'ttft p50':>8} {'itl p50':>8} {'pages/s':>8} {'rss MB':>8}"
+)
+
+
+def _format_row(row: dict) -> str:
+    return (
+        f"{row['scenario']:<13} {row['concurrency']:>4} {row['requests']:>5} {row['errors']:>4} "
+        f"{_fmt(row['rps'])} {_fmt(row['latency_p50_ms'])} {_fmt(row['latency_p95_ms'])} "
+        f"{_fmt(row.get('ttft_p50_ms'))} {_fmt(row.get('itl_p50_ms'))} "
+        f"{_fmt(row.get('pages_per_sec'))} {_fmt(row['peak_rss_mb'])}"
+    )
+
+
+def compare(report: dict, baseline: dict) -> List[dict]:
+    """
+    같은 (시나리오, 동시성) 행끼리 주요 지표 변화율 계산
+
+    Returns:
+        list[dict]: {"scenario", "concurrency", "metric", "baseline", "current", "change_pct", "regression"}
+    """
+    previous = {(r["scenario"], r["concurrency"]): r for r in baseline.get("results", [])}
+    changes = []
+    for row in report["results"]:
+        old = previous.get((row["scenario"], row["concurrency"]))
+        if old is None:
+            continue
+        for metric, higher_is_better in _COMPARE_METRICS.items():
+            before, after = old.get(metric), row.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before * 100
+            changes.append({
+                "scenario": row["scenario"],
+                "concurrency": row["concurrency"],
+                "metric": metric,
+                "baseline": before,
+                "current": after,
+                "change_pct": round(change, 1),
+                "regression": change < 0 if higher_is_better else change > 0,
+            })
+    return changes
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                               capture_output=True, text=True).stdout.strip()
+        return f"{commit}-dirty" if dirty else commit
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args) -> dict:
+    mock_port, app_port = _free_port(), _free_port()
+    with tempfile.TemporaryDirectory(prefix="sm-ai-bench-") as cache_dir:
+        mock = start_mock_server(args, mock_port)
+        app_proc = resp = None
+        try:
+            redis_port = None
+            if args.history_backend == "redis":
+                redis_port = _free_port()
+                resp = start_resp_server(redis_port)
+            env = server_env(args, mock_port, cache_dir, redis_port)
+            app_proc, startup_s = start_app_server(args, app_port, env)
+            idle_rss_mb = round(process_tree_rss_mb(app_proc.pid), 1)
+            idle_pss_mb = round(process_tree_pss_mb(app_proc.pid), 1)
+            print(
+                f"server ({args.server}, {args.workers} worker(s)) ready in {startup_s:.2f}s, "
+                f"idle RSS {idle_rss_mb} MB, idle PSS {idle_pss_mb} MB\n"
+            )
+            print(_HEADER)
+
+            results = []
+            limits = httpx.Limits(max_connections=max(args.concurrency) * 2)
+            async with httpx.AsyncClient(
+                base_url=f"http://127.0.0.1:{app_port}", timeout=args.timeout, limits=limits
+            ) as client:
+                for concurrency in args.concurrency:
+                    results.extend(await run_level(client, args, concurrency, args.scenarios, app_proc.pid))
+                # 워커가 여럿이면 아래 지표는 응답한 워커 하나의 값
+                loop_lag = (await client.get("/metrics/loop-lag")).json()
+                sessions = (await client.get("/metrics/sessions")).json()
+                server = (await client.get("/metrics/server")).json()
+
+            return {
+                "meta": {
+                    "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                    "git_commit": _git_commit(),
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "cpu_count": os.cpu_count(),
+                    "config": {
+                        "concurrency": args.concurrency,
+                        "requests_per_worker": args.requests,
+                        "pages_per_document": args.pages,
+                        "model": args.model,
+                        "embedding_backend": args.embedding_backend,
+                        "history_backend": args.history_backend,
+                        "server": args.server,
+                        "workers": args.workers,
+                        "mock_ttft_ms": args.ttft_ms,
+                        "mock_tokens_per_sec": args.tokens_per_sec,
+                        "mock_response_tokens": args.response_tokens,
+                        "mock_embedding_ms": args.embedding_ms,
+                    },
+                },
+                "startup_s": round(startup_s, 3),
+                "idle_rss_mb": idle_rss_mb,
+                "idle_pss_mb": idle_pss_mb,
+                "server": {
+                    "mode": args.server,
+                    "workers": args.workers,
+                    "loop": server.get("loop"),
+                    "http": server.get("http"),
+                },
+                "server_peak_rss_mb": round(_status_kb(app_proc.pid, "VmHWM") / 1024, 1),
+                "loop_lag": loop_lag,
+                "history_backend": sessions.get("backend"),
+                "results": results,
+            }
+        finally:
+            if app_proc is not None:
+                _stop(app_proc)
+            if resp is not None:
+                _stop(resp)
+            _stop(mock)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end chat / RAG endpoint benchmark")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=4, help="requests per concurrent worker")
+    parser.add_argument("--pages", type=int, default=20, help="pages per uploaded PDF")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--model", default="gpt-4o")
+    parser.add_argument("--embedding-backend", choices=["openai", "local"], default="openai",
+                        help="openai: embeddings via the mock server, local: in-process hashing embedder")
+    parser.add_argument("--history-backend", choices=["memory", "sqlite", "redis"], default="memory",
+                        help="chat history store (redis: local RESP stand-in)")
+    parser.add_argument("--server", choices=["uvicorn", "prefork"], default="uvicorn",
+                        help="uvicorn: uvicorn CLI (--workers spawns processes), prefork: python -m app.server")
+    parser.add_argument("--workers", type=int, default=1, help="server worker processes")
+    parser.add_argument("--ttft-ms", type=float, default=300.0, help="mock time to first token")
+    parser.add_argument("--tokens-per-sec", type=float, default=50.0, help="mock streaming speed")
+    parser.add_argument("--response-tokens", type=int, default=64)
+    parser.add_argument("--embedding-ms", type=float, default=20.0, help="mock latency per embedding request")
+    parser.add_argument("--timeout", type=float, default=300.0, help="per-request timeout (s)")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--baseline", help="previous results JSON to compare against")
+    args = parser.parse_args()
+    if args.workers > 1 and args.history_backend == "memory" and {"chat_stream", "chat_message"} & set(args.scenarios):
+        parser.error("--workers > 1 needs --history-backend sqlite or redis so chat sessions are shared")
+
+    report = asyncio.run(run(args))
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        report["baseline"] = {
+            "git_commit": baseline.get("meta", {}).get("git_commit"),
+            "changes": compare(report, baseline),
+        }
+        print(f"\nvs baseline {report['baseline']['git_commit']}:")
+        for c in report["baseline"]["changes"]:
+            flag = "  REGRESSION" if c["regression"] and abs(c["change_pct"]) >= 10 else ""
+            print(
+                f"  {c['scenario']:<13} c{c['concurrency']:<4} {c['metric']:<15} "
+                f"{c['baseline']:>9} -> {c['current']:>9} ({c['change_pct']:+.1f}%){flag}"
+            )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
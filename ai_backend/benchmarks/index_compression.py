@@ -0,0 +1,141 @@
+# ============================================
+# Benchmark - 벡터 인덱스 압축 (flat / sq8 / ivfpq)
+# ============================================
+#
+# 인덱스 종류별 10k 청크당 메모리와 flat 인덱스 대비 recall@k 를 측정합니다.
+#
+# 사용법 (ai_backend 디렉토리에서):
+#   python -m benchmarks.index_compression
+#   python -m benchmarks.index_compression --chunks 50000 --k 4 10
+#   python -m benchmarks.index_compression --vectors embeddings.npy --output result.json
+#
+# --vectors 를 주지 않으면 실제 문서 임베딩처럼 군집을 이루는 합성 벡터를 사용합니다.
+
+import argparse
+import json
+import time
+
+import faiss
+import numpy as np
+
+from app.vector_index import build_index, index_nbytes
+
+INDEX_TYPES = ["flat", "sq8", "ivfpq"]
+
+
+def synthetic_vectors(num_vectors: int, dim: int, seed: int = 0) -> np.ndarray:
+    """
+    군집 구조를 가진 단위 벡터 생성
+
+    저차원 군집 중심을 무작위 선형 사상으로 dim 차원에 올린 뒤 잡음을 더해,
+    완전 무작위 벡터보다 실제 문서 임베딩에 가까운 분포를 만듭니다.
+    """
+    rng = np.random.default_rng(seed)
+    intrinsic = min(64, dim)
+    num_clusters = max(1, num_vectors // 50)
+
+    centers = rng.normal(size=(num_clusters, intrinsic))
+    labels = rng.integers(0, num_clusters, size=num_vectors)
+    latent = centers[labels] + 0.35 * rng.normal(size=(num_vectors, intrinsic))
+
+    projection = rng.normal(size=(intrinsic, dim)) / np.sqrt(intrinsic)
+    vectors = latent @ projection + 0.05 * rng.normal(size=(num_vectors, dim))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors.astype(np.float32)
+
+
+def make_queries(vectors: np.ndarray, num_queries: int, seed: int = 1) -> np.ndarray:
+    """저장된 청크 근처의 질의 벡터 (청크 + 잡음)"""
+    rng = np.random.default_rng(seed)
+    picks = rng.choice(len(vectors), size=num_queries, replace=False)
+    queries = vectors[picks] + 0.02 * rng.normal(size=(num_queries, vectors.shape[1]))
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    return queries.astype(np.float32)
+
+
+def recall_at_k(truth: np.ndarray, found: np.ndarray, k: int) -> float:
+    hits = sum(len(set(t[:k]) & set(f[:k])) for t, f in zip(truth, found))
+    return hits / (len(truth) * k)
+
+
+def run(vectors: np.ndarray, queries: np.ndarray, ks: list) -> dict:
+    max_k = max(ks)
+    results = {}
+    truth = None
+
+    for index_type in INDEX_TYPES:
+        start = time.perf_counter()
+        try:
+            index = build_index(vectors, index_type)
+        except RuntimeError as e:
+            results[index_type] = {"error": str(e)}
+            continue
+        build_s = time.perf_counter() - start
+
+        latencies = []
+        found = []
+        for query in queries:
+            start = time.perf_counter()
+            _, positions = index.search(query[None, :], max_k)
+            latencies.append((time.perf_counter() - start) * 1000)
+            found.append(positions[0])
+        found = np.asarray(found)
+        if truth is None:
+            truth = found
+
+        nbytes = index_nbytes(index)
+        results[index_type] = {
+            "build_s": round(build_s, 3),
+            "index_bytes": nbytes,
+            "serialized_bytes": len(faiss.serialize_index(index)),
+            "bytes_per_10k_chunks": round(nbytes * 10000 / len(vectors)),
+            "query_p50_ms": round(float(np.percentile(latencies, 50)), 4),
+            "query_p99_ms": round(float(np.percentile(latencies, 99)), 4),
+            **{f"recall@{k}": round(recall_at_k(truth, found, k), 4) for k in ks},
+        }
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vector index compression benchmark")
+    parser.add_argument("--chunks", type=int, default=10000, help="number of synthetic chunks")
+    parser.add_argument("--dim", type=int, default=1536, help="embedding dimension (text-embedding-ada-002: 1536)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, nargs="+", default=[4, 10])
+    parser.add_argument("--vectors", help=".npy file of real embeddings (overrides --chunks/--dim)")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    if args.vectors:
+        vectors = np.load(args.vectors).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    else:
+        vectors = synthetic_vectors(args.chunks, args.dim)
+    queries = make_queries(vectors, min(args.queries, len(vectors)))
+
+    report = {
+        "chunks": len(vectors),
+        "dim": vectors.shape[1],
+        "queries": len(queries),
+        "source": args.vectors or "synthetic",
+        "results": run(vectors, queries, args.k),
+    }
+
+    print(f"{'type':<6} {'MB/10k':>8} {'build s':>8} {'p50 ms':>8} " + " ".join(f"{'R@' + str(k):>7}" for k in args.k))
+    for index_type, row in report["results"].items():
+        if "error" in row:
+            print(f"{index_type:<6} error: {row['error']}")
+            continue
+        print(
+            f"{index_type:<6} {row['bytes_per_10k_chunks'] / 1e6:>8.2f} {row['build_s']:>8.2f} "
+            f"{row['query_p50_ms']:>8.3f} " + " ".join(f"{row[f'recall@{k}']:>7.3f}" for k in args.k)
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
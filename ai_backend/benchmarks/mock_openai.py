@@ -0,0 +1,205 @@
+# ============================================
+# Benchmark - OpenAI 호환 Mock 서버
+# ============================================
+#
+# /v1/chat/completions (스트리밍 포함), /v1/embeddings, /v1/models 를 흉내내는
+# 로컬 서버입니다. 첫 토큰 지연, 초당 토큰 수, 임베딩 지연을 설정할 수 있어
+# 외부 API 없이 서버 전체 경로(HTTP 클라이언트 풀, SSE 중계 등)를 측정할 수 있습니다.
+#
+# 사용법 (ai_backend 디렉토리에서):
+#   python -m benchmarks.mock_openai --port 9100 --ttft-ms 300 --tokens-per-sec 50
+#   OPENAI_BASE_URL=http://127.0.0.1:9100/v1 uvicorn app.main:app
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import time
+import uuid
+from typing import List, Union
+
+import numpy as np
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+from app.providers import HashingEmbeddings
+
+# 응답 토큰에 쓰는 고정 어휘
+_WORDS = (
+    "the document describes this topic in detail and the relevant section "
+    "explains how the procedure works step by step"
+).split()
+
+
+def _completion_tokens(messages: list, count: int) -> List[str]:
+    # 같은 입력에는 항상 같은 응답 (결정적)
+    prompt = json.dumps(messages, ensure_ascii=False, sort_keys=True)
+    seed = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest(), 16)
+    return [
+        (_WORDS[(seed + i) % len(_WORDS)] if i == 0 else " " + _WORDS[(seed + i) % len(_WORDS)])
+        for i in range(count)
+    ]
+
+
+def _prompt_tokens(messages: list) -> int:
+    return sum(len(str(m.get("content", "")).split()) for m in messages)
+
+
+def create_app(
+    ttft_ms: float = 300.0,
+    tokens_per_sec: float = 50.0,
+    response_tokens: int = 64,
+    embedding_ms: float = 20.0,
+    embedding_dim: int = 1536,
+) -> FastAPI:
+    """
+    Mock 서버 앱 생성
+
+    Args:
+        ttft_ms: 채팅 응답 첫 토큰까지 지연 (ms)
+        tokens_per_sec: 첫 토큰 이후 초당 토큰 수
+        response_tokens: 채팅 응답 토큰 수
+        embedding_ms: 임베딩 요청 1회 지연 (ms, 입력 개수와 무관)
+        embedding_dim: 임베딩 차원
+    """
+    app = FastAPI(title="Mock OpenAI")
+    embedder = HashingEmbeddings(dim=embedding_dim)
+    token_delay = 1.0 / tokens_per_sec if tokens_per_sec > 0 else 0.0
+    stats = {"chat_requests": 0, "embedding_requests": 0, "embedded_inputs": 0}
+
+    @app.get("/v1/models")
+    async def list_models():
+        return {"object": "list", "data": [{"id": "mock", "object": "model", "owned_by": "mock"}]}
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stats["chat_requests"] += 1
+        messages = body.get("messages", [])
+        model = body.get("model", "mock")
+        tokens = _completion_tokens(messages, response_tokens)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+        usage = {
+            "prompt_tokens": _prompt_tokens(messages),
+            "completion_tokens": len(tokens),
+            "total_tokens": _prompt_tokens(messages) + len(tokens),
+        }
+
+        if not body.get("stream"):
+            await asyncio.sleep(ttft_ms / 1000 + token_delay * max(0, len(tokens) - 1))
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "".join(tokens)},
+                    "finish_reason": "stop",
+                }],
+                "usage": usage,
+            }
+
+        include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+
+        def chunk(delta: dict, finish_reason=None) -> str:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            return f"data: {json.dumps(payload)}\n\n"
+
+        async def generate():
+            await asyncio.sleep(ttft_ms / 1000)
+            for i, token in enumerate(tokens):
+                if i:
+                    await asyncio.sleep(token_delay)
+                delta = {"content": token}
+                if i == 0:
+                    delta["role"] = "assistant"
+                yield chunk(delta)
+            yield chunk({}, "stop")
+            if include_usage:
+                payload = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [],
+                    "usage": usage,
+                }
+                yield f"data: {json.dumps(payload)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(generate(), media_type="text/event-stream")
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request):
+        body = await request.json()
+        inputs: Union[str, list] = body.get("input", [])
+        # 문자열 하나, 문자열 목록, 토큰 배열(목록) 모두 허용
+        if isinstance(inputs, str) or (inputs and isinstance(inputs[0], int)):
+            inputs = [inputs]
+        texts = [item if isinstance(item, str) else " ".join(map(str, item)) for item in inputs]
+        stats["embedding_requests"] += 1
+        stats["embedded_inputs"] += len(texts)
+
+        await asyncio.sleep(embedding_ms / 1000)
+        vectors = await asyncio.to_thread(embedder.embed_documents, texts)
+
+        as_base64 = body.get("encoding_format") == "base64"
+        data = [
+            {
+                "object": "embedding",
+                "index": i,
+                "embedding": (
+                    base64.b64encode(np.asarray(vector, dtype="<f4").tobytes()).decode("ascii")
+                    if as_base64 else vector
+                ),
+            }
+            for i, vector in enumerate(vectors)
+        ]
+        tokens = sum(len(text.split()) for text in texts)
+        return {
+            "object": "list",
+            "data": data,
+            "model": body.get("model", "mock"),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="OpenAI 호환 mock 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--ttft-ms", type=float, default=300.0)
+    parser.add_argument("--tokens-per-sec", type=float, default=50.0)
+    parser.add_argument("--response-tokens", type=int, default=64)
+    parser.add_argument("--embedding-ms", type=float, default=20.0)
+    parser.add_argument("--embedding-dim", type=int, default=1536)
+    args = parser.parse_args()
+
+    app = create_app(
+        ttft_ms=args.ttft_ms,
+        tokens_per_sec=args.tokens_per_sec,
+        response_tokens=args.response_tokens,
+        embedding_ms=args.embedding_ms,
+        embedding_dim=args.embedding_dim,
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+# ============================================
+# RESP Server - 로컬 테스트용 Redis 프로토콜 서버
+# ============================================
+"""
+HISTORY_BACKEND=redis 를 Redis 설치 없이 확인하기 위한 최소 구현 (단일 프로세스, 메모리)
+
+RedisHistoryBackend 가 사용하는 명령만 지원합니다:
+PING, SELECT, CLIENT, GET, SET, DEL, EXISTS, INCR, INCRBY, EXPIRE, TTL, RPUSH, LRANGE, LTRIM,
+LLEN, MULTI, EXEC, DISCARD, WATCH, UNWATCH, DBSIZE, FLUSHALL, FLUSHDB
+
+사용 예:
+    python -m benchmarks.resp_server --port 6390
+    HISTORY_BACKEND=redis HISTORY_REDIS_URL=redis://127.0.0.1:6390/0 uvicorn app.main:app
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Dict, List, Optional
+
+
+class RespError(Exception):
+    pass
+
+
+class _Null:
+    pass
+
+
+class _NullArray:
+    pass
+
+
+# nil bulk string / nil array (WATCH 충돌로 EXEC 취소)
+NULL = _Null()
+NULL_ARRAY = _NullArray()
+
+
+def encode(value) -> bytes:
+    if value is NULL or value is None:
+        return b"$-1\r\n"
+    if value is NULL_ARRAY:
+        return b"*-1\r\n"
+    if isinstance(value, RespError):
+        return f"-{value}\r\n".encode()
+    if isinstance(value, bool):
+        return f":{int(value)}\r\n".encode()
+    if isinstance(value, int):
+        return f":{value}\r\n".encode()
+    if isinstance(value, str):
+        # 상태 응답 (+OK, +QUEUED, +PONG)
+        return f"+{value}\r\n".encode()
+    if isinstance(value, bytes):
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+    if isinstance(value, list):
+        return b"*%d\r\n" % len(value) + b"".join(encode(v) for v in value)
+    raise TypeError(f"cannot encode {type(value)}")
+
+
+class Store:
+    """키 -> bytes 또는 list[bytes], 만료 시각과 WATCH 용 버전 관리"""
+
+    def __init__(self):
+        self.data: Dict[bytes, object] = {}
+        self.expires: Dict[bytes, float] = {}
+        self.versions: Dict[bytes, int] = {}
+        self.commands = 0
+
+    def _alive(self, key: bytes) -> bool:
+        deadline = self.expires.get(key)
+        if deadline is not None and deadline <= time.time():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+            self._bump(key)
+        return key in self.data
+
+    def _bump(self, key: bytes) -> None:
+        self.versions[key] = self.versions.get(key, 0) + 1
+
+    def version(self, key: bytes) -> int:
+        self._alive(key)
+        return self.versions.get(key, 0)
+
+    def _get(self, key: bytes, kind: type):
+        if not self._alive(key):
+            return None
+        value = self.data[key]
+        if not isinstance(value, kind):
+            raise RespError("WRONGTYPE Operation against a key holding the wrong kind of value")
+        return value
+
+    def _set(self, key: bytes, value) -> None:
+        self.data[key] = value
+        self._bump(key)
+
+    def execute(self, name: str, args: List[bytes]):
+        self.commands += 1
+        handler = getattr(self, f"cmd_{name}", None)
+        if handler is None:
+            raise RespError(f"ERR unknown command '{name}'")
+        return handler(*args)
+
+    # ----------------------------------------
+    # 명령
+    # ----------------------------------------
+
+    def cmd_ping(self, message: Optional[bytes] = None):
+        return message if message is not None else "PONG"
+
+    def cmd_select(self, index):
+        return "OK"
+
+    def cmd_client(self, *args):
+        return "OK"
+
+    def cmd_get(self, key):
+        value = self._get(key, bytes)
+        return NULL if value is None else value
+
+    def cmd_set(self, key, value, *options):
+        self.expires.pop(key, None)
+        self._set(key, value)
+        return "OK"
+
+    def cmd_del(self, *keys):
+        removed = 0
+        for key in keys:
+            if self._alive(key):
+                del self.data[key]
+                self.expires.pop(key, None)
+                self._bump(key)
+                removed += 1
+        return removed
+
+    def cmd_exists(self, *keys):
+        return sum(1 for key in keys if self._alive(key))
+
+    def cmd_incr(self, key):
+        return self.cmd_incrby(key, b"1")
+
+    def cmd_incrby(self, key, amount):
+        value = self._get(key, bytes)
+        try:
+            number = int(value or b"0") + int(amount)
+        except ValueError:
+            raise RespError("ERR value is not an integer or out of range")
+        self._set(key, str(number).encode())
+        return number
+
+    def cmd_expire(self, key, seconds):
+        if not self._alive(key):
+            return 0
+        self.expires[key] = time.time() + int(seconds)
+        return 1
+
+    def cmd_ttl(self, key):
+        if not self._alive(key):
+            return -2
+        deadline = self.expires.get(key)
+        return -1 if deadline is None else int(deadline - time.time())
+
+    def cmd_rpush(self, key, *values):
+        items = self._get(key, list)
+        if items is None:
+            items = []
+            self.data[key] = items
+        items.extend(values)
+        self._bump(key)
+        return len(items)
+
+    @staticmethod
+    def _range(length: int, start: int, stop: int):
+        if start < 0:
+            start = max(0, length + start)
+        if stop < 0:
+            stop = length + stop
+        return start, min(stop, length - 1)
+
+    def cmd_lrange(self, key, start, stop):
+        items = self._get(key, list) or []
+        first, last = self._range(len(items), int(start), int(stop))
+        return items[first:last + 1] if first <= last else []
+
+    def cmd_ltrim(self, key, start, stop):
+        items = self._get(key, list)
+        if items is not None:
+            first, last = self._range(len(items), int(start), int(stop))
+            kept = items[first:last + 1] if first <= last else []
+            if kept:
+                self._set(key, kept)
+            else:
+                self.cmd_del(key)
+        return "OK"
+
+    def cmd_llen(self, key):
+        return len(self._get(key, list) or [])
+
+    def cmd_dbsize(self):
+        return sum(1 for key in list(self.data) if self._alive(key))
+
+    def cmd_flushall(self, *args):
+        for key in list(self.data):
+            self._bump(key)
+        self.data.clear()
+        self.expires.clear()
+        return "OK"
+
+    cmd_flushdb = cmd_flushall
+
+
+class Connection:
+    """연결별 MULTI 큐와 WATCH 상태"""
+
+    def __init__(self, store: Store):
+        self.store = store
+        self.queue: Optional[List[tuple]] = None
+        self.watched: Dict[bytes, int] = {}
+
+    def handle(self, command: List[bytes]):
+        name = command[0].decode().lower()
+        args = command[1:]
+        if name == "multi":
+            if self.queue is not None:
+                return RespError("ERR MULTI calls can not be nested")
+            self.queue = []
+            return "OK"
+        if name == "discard":
+            self.queue = None
+            self.watched.clear()
+            return "OK"
+        if name == "exec":
+            if self.queue is None:
+                return RespError("ERR EXEC without MULTI")
+            queued, self.queue = self.queue, None
+            watched, self.watched = self.watched, {}
+            if any(self.store.version(key) != version for key, version in watched.items()):
+                return NULL_ARRAY
+            replies = []
+            for queued_name, queued_args in queued:
+                try:
+                    replies.append(self.store.execute(queued_name, queued_args))
+                except TypeError:
+                    replies.append(RespError(f"ERR wrong number of arguments for '{queued_name}' command"))
+                except RespError as e:
+                    replies.append(e)
+            return replies
+        if name == "watch":
+            for key in args:
+                self.watched[key] = self.store.version(key)
+            return "OK"
+        if name == "unwatch":
+            self.watched.clear()
+            return "OK"
+        if self.queue is not None:
+            self.queue.append((name, args))
+            return "QUEUED"
+        try:
+            return self.store.execute(name, args)
+        except TypeError:
+            return RespError(f"ERR wrong number of arguments for '{name}' command")
+        except RespError as e:
+            return e
+
+
+async def _read_command(reader: asyncio.StreamReader) -> Optional[List[bytes]]:
+    line = await reader.readline()
+    if not line:
+        return None
+    if not line.startswith(b"*"):
+        # 인라인 명령 (redis-cli/telnet)
+        return line.strip().split()
+    count = int(line[1:])
+    parts = []
+    for _ in range(count):
+        header = await reader.readline()
+        size = int(header[1:])
+        data = await reader.readexactly(size + 2)
+        parts.append(data[:-2])
+    return parts
+
+
+def create_server_handler(store: Store):
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        connection = Connection(store)
+        try:
+            while True:
+                command = await _read_command(reader)
+                if command is None:
+                    break
+                if not command:
+                    continue
+                writer.write(encode(connection.handle(command)))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    return handle
+
+
+async def serve(host: str, port: int) -> None:
+    store = Store()
+    server = await asyncio.start_server(create_server_handler(store), host, port)
+    print(f"RESP server listening on {host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Minimal in-memory Redis protocol server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6390)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# ============================================
+# 테스트 공통 설정
+# ============================================
+
+import asyncio
+import os
+import tempfile
+import threading
+
+import pytest
+
+# app.config 는 import 시점에 환경 변수를 읽으므로 app 모듈보다 먼저 설정
+os.environ.setdefault("LLM_BACKEND", "fake")
+os.environ.setdefault("EMBEDDING_BACKEND", "local")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("HISTORY_BACKEND", "memory")
+os.environ.setdefault("CACHE_DIR", tempfile.mkdtemp(prefix="sm-ai-test-"))
+
+from benchmarks.resp_server import Store, create_server_handler  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def resp_server_url():
+    """
+    benchmarks.resp_server 를 백그라운드 스레드에서 실행 (Redis 대용)
+
+    Returns:
+        str: redis://127.0.0.1:<port>/0
+    """
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+    state = {}
+
+    async def start():
+        state["server"] = await asyncio.start_server(create_server_handler(Store()), "127.0.0.1", 0)
+        state["port"] = state["server"].sockets[0].getsockname()[1]
+        started.set()
+
+    def run():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(start())
+        loop.run_forever()
+
+    thread = threading.Thread(target=run, name="resp-server", daemon=True)
+    thread.start()
+    assert started.wait(10), "RESP server did not start"
+    yield f"redis://127.0.0.1:{state['port']}/0"
+
+    loop.call_soon_threadsafe(state["server"].close)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
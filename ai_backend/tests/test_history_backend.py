@@ -0,0 +1,218 @@
+# ============================================
+# History Backend 테스트 (SQLite / Redis - benchmarks.resp_server)
+# ============================================
+
+import time
+import uuid
+
+import pytest
+import redis
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app import chat_memory
+from app.chat_memory import WindowedChatHistory
+from app.history_backend import RedisHistoryBackend, SQLiteHistoryBackend
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def make_backend(request, tmp_path):
+    """
+    같은 저장소를 가리키는 새 backend 를 만드는 함수 (워커 / 재시작한 서버 역할)
+    """
+    created = []
+    if request.param == "sqlite":
+        path = str(tmp_path / "history.sqlite3")
+
+        def factory(**kwargs):
+            kwargs.setdefault("flush_interval", 0.01)
+            backend = SQLiteHistoryBackend(path, **kwargs)
+            created.append(backend)
+            return backend
+    else:
+        url = request.getfixturevalue("resp_server_url")
+        prefix = f"test:{uuid.uuid4().hex}:"
+
+        def factory(**kwargs):
+            kwargs.setdefault("flush_interval", 0.01)
+            backend = RedisHistoryBackend(url, prefix, **kwargs)
+            created.append(backend)
+            return backend
+
+    yield factory
+    for backend in created:
+        backend.close(timeout=5)
+
+
+def _turn(i: int):
+    return [HumanMessage(content=f"question {i}"), AIMessage(content=f"answer {i}")]
+
+
+def _contents(state: dict) -> list:
+    return [m.content for m in state["messages"]]
+
+
+def _fake_summary(summary: str, messages) -> str:
+    # LLM 대신 접힌 메시지 앞부분을 이어 붙인 요약
+    return " / ".join(filter(None, [summary] + [m.content.split(" x")[0].split(" y")[0] for m in messages]))
+
+
+def test_append_round_trip(make_backend):
+    backend = make_backend()
+    backend.enqueue("s1", ("append", _turn(0)))
+    backend.enqueue("s1", ("append", _turn(1)))
+    assert backend.flush(5)
+
+    state = make_backend().load("s1")
+    assert state["summary"] == ""
+    assert state["base"] == 0
+    assert _contents(state) == ["question 0", "answer 0", "question 1", "answer 1"]
+    assert isinstance(state["messages"][0], HumanMessage)
+    assert isinstance(state["messages"][1], AIMessage)
+
+
+def test_missing_session_loads_none(make_backend):
+    backend = make_backend()
+    assert backend.load("unknown") is None
+    assert not backend.exists("unknown")
+
+
+def test_fold_round_trip(make_backend):
+    backend = make_backend()
+    backend.enqueue("s1", ("append", _turn(0) + _turn(1)))
+    backend.enqueue("s1", ("fold", "summary of turn 0", 2))
+    backend.enqueue("s1", ("append", _turn(2)))
+    assert backend.flush(5)
+
+    state = make_backend().load("s1")
+    assert state["summary"] == "summary of turn 0"
+    assert state["base"] == 2
+    assert _contents(state) == ["question 1", "answer 1", "question 2", "answer 2"]
+
+
+def test_folds_coalesce_within_batch(make_backend):
+    # 긴 flush 간격 동안 모인 작업은 한 묶음으로 기록 (같은 세션의 fold 는 마지막 것만)
+    backend = make_backend(flush_interval=0.5)
+    backend.enqueue("s1", ("append", _turn(0) + _turn(1) + _turn(2)))
+    backend.enqueue("s1", ("fold", "first", 2))
+    backend.enqueue("s1", ("fold", "second", 4))
+    backend.enqueue("s2", ("append", _turn(9)))
+    assert backend.flush(5)
+    assert backend.stats()["batches"] == 1
+
+    state = make_backend().load("s1")
+    assert state["summary"] == "second"
+    assert state["base"] == 4
+    assert _contents(state) == ["question 2", "answer 2"]
+    assert _contents(make_backend().load("s2")) == ["question 9", "answer 9"]
+
+
+def test_clear_then_append_in_batch(make_backend):
+    backend = make_backend(flush_interval=0.5)
+    backend.enqueue("s1", ("append", _turn(0)))
+    backend.enqueue("s1", ("fold", "old", 2))
+    backend.delete("s1")
+    backend.enqueue("s1", ("append", _turn(1)))
+    assert backend.flush(5)
+
+    state = make_backend().load("s1")
+    assert state["summary"] == ""
+    assert state["base"] == 0
+    assert _contents(state) == ["question 1", "answer 1"]
+
+    backend.delete("s1")
+    assert backend.flush(5)
+    assert make_backend().load("s1") is None
+
+
+def test_revision_detects_other_writer(make_backend):
+    worker_a = make_backend()
+    worker_b = make_backend()
+    # 세션 저장소처럼 처음 사용할 때 load 하여 revision 추적 시작
+    assert worker_a.load("s1") is None
+    worker_a.enqueue("s1", ("append", _turn(0)))
+    assert worker_a.flush(5)
+    assert worker_a.is_current("s1")
+
+    # 다른 워커도 같은 세션을 이어서 기록
+    assert _contents(worker_b.load("s1")) == ["question 0", "answer 0"]
+    worker_b.enqueue("s1", ("append", _turn(1)))
+    assert worker_b.flush(5)
+    assert worker_b.is_current("s1")
+
+    # 뒤처진 워커는 다시 로드해야 최신 상태
+    worker_a.load("s1")
+    worker_a.enqueue("s1", ("append", _turn(2)))
+    assert worker_a.flush(5)
+    assert not worker_b.is_current("s1")
+    assert _contents(worker_b.load("s1"))[-2:] == ["question 2", "answer 2"]
+    assert worker_b.is_current("s1")
+
+
+def test_summarization_fold_round_trip(make_backend, monkeypatch):
+    monkeypatch.setattr(chat_memory, "summarize_messages", _fake_summary)
+    backend = make_backend()
+    history = WindowedChatHistory(token_budget=60, summarize=True)
+    history.on_change = lambda op: backend.enqueue("s1", op)
+
+    for i in range(6):
+        history.add_user_message(f"question {i} " + "x" * 80)
+        history.add_ai_message(f"answer {i} " + "y" * 80)
+        deadline = time.monotonic() + 5
+        while history.status()["summarizing"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+    assert history.summary
+    assert backend.flush(5)
+
+    state = make_backend().load("s1")
+    assert state["summary"] == history.summary
+    assert state["base"] == history._base
+    assert [m.content for m in state["messages"]] == [m.content for m in history._messages]
+
+    restored = WindowedChatHistory(token_budget=60, summarize=False)
+    restored.restore(state["summary"], state["base"], state["messages"])
+    assert [m.content for m in restored.messages] == [m.content for m in history.messages]
+
+
+def test_redis_fold_retries_on_watch_conflict(resp_server_url):
+    prefix = f"test:{uuid.uuid4().hex}:"
+    backend = RedisHistoryBackend(resp_server_url, prefix, flush_interval=0.01)
+    other = redis.Redis.from_url(resp_server_url, decode_responses=True, protocol=2)
+    try:
+        backend.enqueue("s1", ("append", _turn(0) + _turn(1)))
+        assert backend.flush(5)
+        messages_key, _, base_key, _ = backend._keys("s1")
+
+        # WATCH 이후 다른 워커가 메시지 1개를 먼저 접은 상황
+        pipeline = backend._client.pipeline
+        conflicts = []
+
+        def conflicting_pipeline(*args, **kwargs):
+            pipe = pipeline(*args, **kwargs)
+            get = pipe.get
+
+            def get_then_conflict(key):
+                value = get(key)
+                if key == base_key and not conflicts:
+                    conflicts.append(key)
+                    other.ltrim(messages_key, 1, -1)
+                    other.set(base_key, 1)
+                return value
+
+            pipe.get = get_then_conflict
+            return pipe
+
+        backend._client.pipeline = conflicting_pipeline
+        backend.enqueue("s1", ("fold", "folded", 3))
+        assert backend.flush(5)
+        backend._client.pipeline = pipeline
+
+        assert conflicts
+        reader = RedisHistoryBackend(resp_server_url, prefix)
+        state = reader.load("s1")
+        reader.close()
+        assert state["summary"] == "folded"
+        assert state["base"] == 3
+        assert _contents(state) == ["answer 1"]
+    finally:
+        other.close()
+        backend.close(timeout=5)
@@ -4,7 +4,8 @@
 
 import requests
 import json
-from typing import Iterator, Optional
+import time
+from typing import Callable, Iterator, Optional
 
 # ============================================
 # 설정
@@ -112,14 +113,14 @@ def clear_chat_session(session_id: str) -> dict:
 
 def upload_pdf(session_id: str, file) -> dict:
     """
-    PDF 파일 업로드
+    PDF 파일 업로드 (인제스트 작업 시작)
 
     Args:
         session_id: 세션 ID
         file: 업로드할 파일 객체
 
     Returns:
-        dict: 업로드 응답
+        dict: 업로드 응답 (job_id 포함)
     """
     url = f"{BACKEND_URL}{API_PREFIX}/rag/upload"
     files = {"file": file}
@@ -133,12 +134,70 @@ def upload_pdf(session_id: str, file) -> dict:
         raise Exception(f"파일 업로드 실패: {str(e)}")
 
 
+def get_ingest_job(job_id: str) -> dict:
+    """
+    인제스트 작업 진행 상황 조회
+
+    Args:
+        job_id: 작업 ID
+
+    Returns:
+        dict: 작업 상태 (status, stages, progress)
+    """
+    url = f"{BACKEND_URL}{API_PREFIX}/rag/jobs/{job_id}"
+    try:
+        response = requests.get(url, timeout=10)
+        response.raise_for_status()
+        return response.json()
+    except requests.exceptions.RequestException as e:
+        raise Exception(f"작업 상태 조회 실패: {str(e)}")
+
+
+def wait_ingest_job(
+    job_id: str,
+    on_progress: Optional[Callable[[dict], None]] = None,
+    poll_interval: float = 1.0,
+    timeout: float = 3600
+) -> dict:
+    """
+    인제스트 작업 완료까지 대기
+
+    Args:
+        job_id: 작업 ID
+        on_progress: 조회할 때마다 호출되는 콜백 (작업 상태 dict)
+        poll_interval: 조회 간격 (초)
+        timeout: 최대 대기 시간 (초)
+
+    Returns:
+        dict: 완료된 작업 상태
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        job = get_ingest_job(job_id)
+        if on_progress:
+            on_progress(job)
+
+        if job["status"] == "completed":
+            return job
+        if job["status"] == "failed":
+            raise Exception(f"문서 처리 실패: {job.get('error')}")
+        if time.monotonic() > deadline:
+            raise Exception("문서 처리 시간 초과")
+
+        time.sleep(poll_interval)
+
+
 def rag_query_stream(
     session_id: str,
     question: str,
     model: str,
     prompt_file: str,
-    temperature: float = 0.0
+    temperature: float = 0.0,
+    rag_mode: str = "naive",
+    pipeline_file: Optional[str] = None,
+    document_ids: Optional[list] = None,
+    page_start: Optional[int] = None,
+    page_end: Optional[int] = None
 ) -> Iterator[str]:
     """
     RAG 질의 (스트리밍)
@@ -149,6 +208,11 @@ def rag_query_stream(
         model: LLM 모델명
         prompt_file: 프롬프트 파일 경로
         temperature: 생성 온도
+        rag_mode: RAG 방식 ("naive", "advanced", "modular")
+        pipeline_file: Modular RAG 파이프라인 파일 경로
+        document_ids: 검색할 문서 id 목록 (None 이면 세션의 전체 문서)
+        page_start: 검색할 시작 페이지 (1부터, 포함)
+        page_end: 검색할 끝 페이지 (1부터, 포함)
 
     Yields:
         str: 응답 토큰
@@ -159,7 +223,12 @@ def rag_query_stream(
         "question": question,
         "model": model,
         "prompt_file": prompt_file,
-        "temperature": temperature
+        "temperature": temperature,
+        "rag_mode": rag_mode,
+        "pipeline_file": pipeline_file,
+        "document_ids": document_ids,
+        "page_start": page_start,
+        "page_end": page_end
     }
 
     try:
@@ -219,6 +288,45 @@ def check_rag_session(session_id: str) -> dict:
         raise Exception(f"세션 확인 실패: {str(e)}")
 
 
+def list_rag_documents(session_id: str) -> list:
+    """
+    RAG 세션에 업로드된 전체 문서 목록 조회
+
+    Args:
+        session_id: 세션 ID
+
+    Returns:
+        list: 문서 정보 리스트 (document_id, filename, indexing)
+    """
+    url = f"{BACKEND_URL}{API_PREFIX}/rag/session/{session_id}/documents"
+    try:
+        response = requests.get(url, timeout=10)
+        response.raise_for_status()
+        return response.json()["documents"]
+    except requests.exceptions.RequestException as e:
+        raise Exception(f"문서 목록 조회 실패: {str(e)}")
+
+
+def delete_rag_document(session_id: str, document_id: str) -> dict:
+    """
+    RAG 세션에서 문서 하나 제거
+
+    Args:
+        session_id: 세션 ID
+        document_id: 제거할 문서 id
+
+    Returns:
+        dict: 삭제 결과
+    """
+    url = f"{BACKEND_URL}{API_PREFIX}/rag/session/{session_id}/documents/{document_id}"
+    try:
+        response = requests.delete(url, timeout=10)
+        response.raise_for_status()
+        return response.json()
+    except requests.exceptions.RequestException as e:
+        raise Exception(f"문서 삭제 실패: {str(e)}")
+
+
 # ============================================
 # 헬스 체크
 # ============================================
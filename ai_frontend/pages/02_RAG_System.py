@@ -12,6 +12,7 @@ import streamlit as st
 from langchain_core.messages.chat import ChatMessage
 from api_client import (
     upload_pdf,
+    wait_ingest_job,
     rag_query_stream,
     get_rag_prompts,
     health_check
@@ -50,8 +51,12 @@ warning_msg = st.empty()
 
 # UI 구현부-3 : Sidebar
 with st.sidebar:
-    ## 파일 업로더
-    uploade_file = st.file_uploader("문서를 업로드하세요", type=["pdf"])
+    ## 파일 업로더 (여러 문서를 한 세션에 추가)
+    uploade_files = st.file_uploader("문서를 업로드하세요", type=["pdf"], accept_multiple_files=True)
+
+    ## 검색 대상 문서 선택 (업로드된 문서 중)
+    uploaded_docs = st.session_state.get("rag_documents", {})
+    selected_docs = st.multiselect("검색 문서 선택", list(uploaded_docs), default=list(uploaded_docs))
 
     ## 초기 경로 설정 값 (Prompt)
     prompt_files = glob.glob("prompts/rag/*.yaml")
@@ -61,9 +66,20 @@ with st.sidebar:
     selected_api = st.selectbox("Documents Loader 선택", ["PDFPlumberLoader", "UpstageDocumentParseLoader"])
     selected_prompt = st.selectbox("Prompt 선택", prompt_files, index=0)
     selected_rag = st.selectbox("RAG 기술 선택", ["Naive RAG", "Advanced RAG", "Moduler RAG"])
+    selected_pipeline = None
+    if selected_rag == "Moduler RAG":
+        pipeline_files = sorted(glob.glob("prompts/rag/pipelines/*.yaml"))
+        selected_pipeline = st.selectbox("Pipeline 선택", pipeline_files, index=0)
     selected_parser = st.selectbox("OutputParser 선택", ["StrOutputParser"])
     clear_btn = st.button("대화 초기화")
 
+# RAG 기술 → Backend rag_mode 매핑
+RAG_MODES = {
+    "Naive RAG": "naive",
+    "Advanced RAG": "advanced",
+    "Moduler RAG": "modular",
+}
+
 #======================================================================================================================
 
 # 세션 생성 유무 확인 (타임스탬프 기반)
@@ -78,6 +94,14 @@ if "rag_messages" not in st.session_state:
 if "rag_uploaded" not in st.session_state:
     st.session_state["rag_uploaded"] = False
 
+# 업로드된 문서 (파일명 -> document_id)
+if "rag_documents" not in st.session_state:
+    st.session_state["rag_documents"] = {}
+
+# 업로드에 실패한 파일 (rerun 마다 다시 올리지 않도록 기록, 파일을 다시 선택하면 재시도)
+if "rag_failed_uploads" not in st.session_state:
+    st.session_state["rag_failed_uploads"] = set()
+
 # 세션 초기화
 SESSION_ID = st.session_state["rag_session_id"]
 
@@ -86,6 +110,8 @@ if clear_btn:
     st.session_state["rag_session_id"] = ""
     st.session_state["rag_messages"] = []
     st.session_state["rag_uploaded"] = False
+    st.session_state["rag_documents"] = {}
+    st.session_state["rag_failed_uploads"] = set()
     st.success("✓ 대화 기록과 업로드 문서가 초기화되었습니다")
 
 #====================================================================================================================== 
@@ -107,23 +133,51 @@ def add_message(role, message):
 # 구현부-1 : 이전 대화 기록 출력
 print_messages()
 
-# 구현부-2 : 업로드 파일 AI Backend API 처리
-if uploade_file and not st.session_state["rag_uploaded"]:
+# 구현부-2 : 업로드 파일 AI Backend API 처리 (아직 올리지 않은 파일만)
+for uploade_file in uploade_files or []:
+    upload_key = getattr(uploade_file, "file_id", None) or f"{uploade_file.name}:{uploade_file.size}"
+    if uploade_file.name in st.session_state["rag_documents"]:
+        continue
+    if upload_key in st.session_state["rag_failed_uploads"]:
+        continue
+
     with st.spinner(f"📄[{uploade_file.name}] 파일을 업로드 중입니다..."):
 
         try:
             result = upload_pdf(session_id=SESSION_ID, file=uploade_file)
+
+            # 문서 처리 진행률 표시
+            progress_bar = st.progress(0.0, text="📄 문서 처리 중...")
+
+            def show_progress(job):
+                stages = job["stages"]
+                progress_bar.progress(
+                    job["progress"],
+                    text=(
+                        f"📄 페이지 {stages['pages_parsed']['done']} · "
+                        f"청크 {stages['chunks_split']['done']} · "
+                        f"임베딩 {stages['chunks_embedded']['done']}"
+                    )
+                )
+
+            wait_ingest_job(result["job_id"], on_progress=show_progress)
+            progress_bar.empty()
+
             st.session_state["rag_uploaded"] = True
+            st.session_state["rag_documents"][result["filename"]] = result["document_id"]
             st.success(f"✅[{result['filename']}] 업로드 완료")
 
         except Exception as e:
-            st.session_state["rag_uploaded"] = False
+            st.session_state["rag_failed_uploads"].add(upload_key)
             st.error(f"파일 업로드 실패: {str(e)}")
 
 
 # 구현부-3 : 새로운 사용자 입력 처리
 if user_input:
-    if st.session_state.get("rag_uploaded"):
+    if uploaded_docs and not selected_docs:
+        warning_msg.warning("⚠️ 검색할 문서를 한 개 이상 선택해주세요")
+
+    elif st.session_state.get("rag_uploaded"):
 
         # 사용자 메시지 저장 및 표시
         add_message("user", user_input)
@@ -136,7 +190,13 @@ if user_input:
                 question=user_input,
                 model=selected_model,
                 prompt_file=selected_prompt,
-                temperature=0.0
+                temperature=0.0,
+                rag_mode=RAG_MODES[selected_rag],
+                pipeline_file=selected_pipeline,
+                document_ids=(
+                    None if len(selected_docs) == len(uploaded_docs)
+                    else [uploaded_docs[name] for name in selected_docs]
+                )
             )
 
             # AI 메시지 스트리밍 출력